@@ -4,12 +4,13 @@ from datetime import datetime
 
 
 from app.services.admin_services.manage_clerk import create_clerk, edit_clerk, get_clerk, get_clerk_by_id
-from app.services.admin_services.get_live_classes import get_live_classes
+from app.services.admin_services.get_live_classes import get_live_classes, stream_live_classes
 from app.services.admin_services.teacher_leaderboard import get_teacher_leaderboard
 from app.services.admin_services.teacher_defaulters import teacher_defaulters
 from app.services.admin_services.get_extremes import get_extremes
-from app.services.admin_services.get_reports import download_class_report
+from app.services.admin_services.get_reports import download_class_report, get_report_status, stream_report_progress
 from app.services.admin_services.list_metadata import list_metadata
+from app.services.admin_services.worker_metrics import get_worker_metrics, get_password_hashing_metrics
 from app.services.admin_services.program_services import create_program, get_program_by_id, update_program, list_all_programs
 from app.services.admin_services.department_services import create_department, get_department_by_id, update_department, list_all_departments
 from app.models.allModel import (
@@ -71,6 +72,18 @@ async def update_department_route(request: Request, id: str = Path(...), request
 async def get_live_classes_route(request: Request):
     return await get_live_classes(request)
 
+@router.get("/live-classes/stream")
+async def stream_live_classes_route(request: Request):
+    return await stream_live_classes(request)
+
+@router.get("/worker-metrics")
+async def get_worker_metrics_route(request: Request):
+    return await get_worker_metrics(request)
+
+@router.get("/password-hashing-metrics")
+async def get_password_hashing_metrics_route(request: Request):
+    return await get_password_hashing_metrics(request)
+
 @router.get("/teacher-leaderboard")
 async def get_teacher_leaderboard_route(
     request: Request,
@@ -197,3 +210,13 @@ async def download_class_report_api(
         batch_year=batch_year,
         file_type=file_type
     )
+
+
+@router.get("/reports/{job_id}")
+async def get_report_status_api(request: Request, job_id: str):
+    return await get_report_status(request, job_id)
+
+
+@router.get("/reports/{job_id}/stream")
+async def stream_report_progress_api(request: Request, job_id: str):
+    return await stream_report_progress(request, job_id)
@@ -239,9 +239,10 @@ async def get_defaulters_students(
     subject_id: str | None = None,
     program: str | None = None,
     semester: int | None = None,
-    threshold: int = 75
+    threshold: int = 75,
+    cursor: str | None = None
     
 ):
-    return await defaulter_students(request,page,limit,search,subject_id,program,semester,threshold)
+    return await defaulter_students(request,page,limit,search,subject_id,program,semester,threshold,cursor)
 
 
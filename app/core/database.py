@@ -16,6 +16,8 @@ from app.schemas.student_attendance_summary import StudentAttendanceSummary
 from app.schemas.teacher_subject_summary import TeacherSubjectSummary
 from app.schemas.subject_session_stats import SubjectSessionStats
 from app.schemas.session import Session
+from app.schemas.daily_attendance_rollup import DailyAttendanceRollup
+from app.schemas.teacher_daily_stats import TeacherDailyStats
 
 
 
@@ -41,6 +43,8 @@ async def init_db():
         StudentAttendanceSummary,
         TeacherSubjectSummary,
         SubjectSessionStats,  
+        DailyAttendanceRollup,
+        TeacherDailyStats,
         Session,
         FCMToken,
         SwapApproval,
@@ -8,7 +8,8 @@ QUEUE_PRIORITY_CONFIG = {
     settings.embedding_queue: 10,
     settings.session_queue: 10,
     settings.notification_queue: 10,
-    settings.cleanup_queue: 10
+    settings.cleanup_queue: 10,
+    settings.report_queue: 10
 }
 
 async def connect_rabbitmq():
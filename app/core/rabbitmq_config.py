@@ -8,6 +8,7 @@ class RabbitMQSettings(BaseSettings):
     session_queue : str = "session_queue"
     notification_queue : str = "notification_queue"
     cleanup_queue : str = "cleanup_queue"
+    report_queue : str = "report_queue"
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -3,7 +3,9 @@ import uuid
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from beanie import Link
 from bson import DBRef
+from pymongo import UpdateMany
 
 from app.core.database import init_db, close_db
 from app.core.redis import get_redis_client
@@ -11,7 +13,10 @@ from app.utils.publisher import send_to_queue
 from app.core.config import settings
 from app.schemas.session import Session
 from app.schemas.exception_session import ExceptionSession
-from app.schemas.swap_approval import SwapApproval
+from app.schemas.teacher_subject_summary import TeacherSubjectSummary
+from app.utils.attendance_categories import aggregate_category_counts
+from app.utils.link_loader import load_links
+from app.utils.resolved_schedule import get_day_plan
 import logging
 
 logging.basicConfig(
@@ -48,90 +53,80 @@ async def generate_sessions_for_today():
     date_str = str(target_date)
     weekday = now.strftime("%A")
 
-    sessions = await Session.find(Session.day == weekday, Session.is_active == True, fetch_links=True).to_list()
+    # every class with sessions today; each one's resolved day plan
+    # (exceptions applied) is built here once and then shared with the
+    # student endpoints through the cache
+    classes = await Session.get_motor_collection().aggregate([
+        {"$match": {"day": weekday, "is_active": True}},
+        {"$group": {"_id": {
+            "department": "$department",
+            "program": "$program",
+            "semester": "$semester",
+            "academic_year": "$academic_year"
+        }}}
+    ]).to_list(None)
+
     final_jobs = []
 
-    for session in sessions:
+    for group in classes:
+        scope = group["_id"]
         try:
-            session_id = str(session.id)
-
-            exception = await ExceptionSession.find_one(
-                ExceptionSession.session == session.id,
-                ExceptionSession.date == target_date,
-                fetch_links=True
+            plan = await get_day_plan(
+                scope["department"], scope["program"], scope["semester"], scope["academic_year"], target_date
             )
+        except Exception as e:
+            print(f"❌ Error building plan for {scope}: {e}")
+            continue
 
-            # default timing
-            start_time = datetime.strptime(
-                f"{date_str} {session.start_time}", "%Y-%m-%d %H:%M"
-            ).replace(tzinfo=IST)
-
-            # exception handling
-            if exception:
-                action = exception.action.upper()
-
-                # CANCEL
-                if action == "CANCEL":
-                    print(f"🚫 Cancelled {session_id}")
-                    await delete_job_id(redis , session_id, date_str)
-                    continue
+        for entry in plan:
+            # Add exceptions are scheduled below
+            if entry["is_added"]:
+                continue
 
-                # RESCHEDULE
-                if action == "RESCHEDULE":
-                    if exception.swap_id:
-                        swap = await SwapApproval.get(
-                            exception.swap_id.id, fetch_links=True
-                        )
+            session_id = entry["session_id"]
 
-                        if swap.status != "APPROVED":
-                            print(f"⏸️ Pending swap {session_id}")
-                            continue
+            if entry["swap_pending"]:
+                print(f"⏸️ Pending swap {session_id}")
+                continue
 
-                    start_time = datetime.strptime(
-                        f"{date_str} {exception.start_time}",
-                        "%Y-%m-%d %H:%M"
-                    ).replace(tzinfo=IST)
+            start_time = datetime.strptime(
+                f"{date_str} {entry['start_time']}", "%Y-%m-%d %H:%M"
+            ).replace(tzinfo=IST)
 
             job_id = str(uuid.uuid4())
             await store_job_id(redis, session_id, date_str, job_id)
 
-            # subject resolution
-            if isinstance(session.subject, DBRef):
-                subject_id = str(session.subject.id)
-            else:
-                subject_id = str(session.subject.id)
-
             payload = {
                 "session_id": session_id,
                 "date": date_str,
                 "day": weekday,
                 "start_time_timestamp": start_time.timestamp(),
-                "subject": subject_id,
-                "program": session.program,
-                "department": session.department,
-                "semester": session.semester,
-                "academic_year": session.academic_year,
+                "subject": entry["subject_id"],
+                "program": scope["program"],
+                "department": scope["department"],
+                "semester": scope["semester"],
+                "academic_year": scope["academic_year"],
                 "job_id": job_id,
-                "is_exception": bool(exception),
-                "exception_id": str(exception.id) if exception else None,
+                "is_exception": bool(entry["exception_id"]),
+                "exception_id": entry["exception_id"],
             }
 
             final_jobs.append((start_time, payload))
 
-        except Exception as e:
-            print(f"❌ Error {session.id}: {e}")
-
     # ADD exceptions (extra lectures)
     add_exceptions = await ExceptionSession.find(
         ExceptionSession.action == "Add",
-        ExceptionSession.date == target_date,
-        fetch_links=True
+        ExceptionSession.date == target_date
     ).to_list()
+    await load_links(
+        add_exceptions, "swap_id", "created_by",
+        projections={"swap_id": {"status": 1}, "created_by": {"department": 1}}
+    )
 
     for ex in add_exceptions:
         if ex.swap_id:
-            swap = await SwapApproval.get(ex.swap_id.id)
-            if swap.status != "APPROVED":
+            swap = ex.swap_id
+            if isinstance(swap, Link) or swap.status != "APPROVED":
                 continue
 
         start_time = datetime.strptime(
@@ -191,6 +186,33 @@ async def generate_sessions_for_today():
         print(f"📤 Scheduled {payload['session_id']} in {int(delay)}s")
 
 
+# reconciliation
+async def reconcile_category_counts():
+    """
+    The attendance worker moves defaulter / at-risk / top-performer counters
+    incrementally; a nightly $group recount corrects any drift.
+    """
+    print("🔄 Reconciling category counts")
+
+    counts = await aggregate_category_counts()
+
+    operations = [
+        UpdateMany(
+            {"subject": DBRef("subjects", subject_id)},
+            {"$set": {
+                "defaulter_count": defaulter,
+                "at_risk_count": at_risk,
+                "top_performer_count": top_performer,
+            }}
+        )
+        for subject_id, (defaulter, at_risk, top_performer) in counts.items()
+    ]
+
+    if operations:
+        result = await TeacherSubjectSummary.get_motor_collection().bulk_write(operations, ordered=False)
+        print(f"✅ Reconciled {len(operations)} subjects, {result.modified_count} summaries corrected")
+
+
 # runner
 async def main():
     await init_db()
@@ -198,6 +220,7 @@ async def main():
 
     if settings.ENVIRONMENT == "production":
         scheduler.add_job(generate_sessions_for_today, "cron", hour=0, minute=0)
+        scheduler.add_job(reconcile_category_counts, "cron", hour=2, minute=0)
         scheduler.start()
     else:
         await generate_sessions_for_today()
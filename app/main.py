@@ -6,6 +6,7 @@ from app.core.database import init_db, close_db
 from app.core.config import settings
 from app.core.rabbit_setup import setup_rabbitmq
 from app.core.redis import redis_manager
+from app.utils.local_cache import start_local_cache, stop_local_cache
 from app.middleware.auth_middleware import AuthMiddleware  # Make sure you import your middleware
 
 # Routes that do NOT require authentication
@@ -31,12 +32,15 @@ async def lifespan(app: FastAPI):
 
     print("🔌 Connecting to Redis...")
     await redis_manager.connect()
+    start_local_cache()
 
     print("🐰 Setting up RabbitMQ...")
     await setup_rabbitmq()
 
     yield  # app runs here
 
+    await stop_local_cache()
+
     print("🧹 Closing DB connection...")
     await close_db()
     
@@ -1,57 +1,102 @@
-from fastapi import Request
+from collections import OrderedDict
+from typing import Optional, Tuple
+import time
+
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 from jose import jwt, JWTError
-from datetime import datetime
 from app.core.config import settings
+from app.utils.json_encoder import dumps, loads
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, whitelist: list[str] = None):
-        super().__init__(app)
-        self.whitelist = whitelist or []
+# verified tokens kept per process; a hit skips the HMAC and JSON decode
+TOKEN_CACHE_SIZE = 4096
 
-    async def dispatch(self, request: Request, call_next):
 
-        # 1️⃣ Always allow OPTIONS requests (CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
+class AuthMiddleware:
+    """
+    Pure ASGI auth: no per-request task or body stream wrapping like
+    BaseHTTPMiddleware. Verified tokens are remembered (bounded LRU) with
+    their payload and expiry, so a client polling with the same token pays
+    one dict lookup and a small JSON decode per request until the token
+    expires. Payloads are kept serialized so no request can mutate the
+    cached copy another request will get.
+    """
+
+    def __init__(self, app: ASGIApp, whitelist: list[str] = None, cache_size: int = TOKEN_CACHE_SIZE):
+        self.app = app
+        self.whitelist = set(whitelist or [])
+        self.cache_size = cache_size
+        self._tokens: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # 1️⃣ Always allow OPTIONS requests (CORS preflight)
         # 2️⃣ Skip authentication for whitelisted routes
-        if request.url.path in self.whitelist:
-            return await call_next(request)
+        if scope["method"] == "OPTIONS" or scope["path"] in self.whitelist:
+            return await self.app(scope, receive, send)
 
         # 3️⃣ Require Authorization header for all other requests
-        auth_header = request.headers.get("Authorization")
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+
         if not auth_header or not auth_header.startswith("Bearer "):
-            return JSONResponse(
-                status_code=401,
-                content={"status": "fail", "message": "Missing or invalid Authorization header"}
-            )
+            return await self._fail(scope, receive, send, "Missing or invalid Authorization header")
 
         token = auth_header.split(" ")[1]
 
+        payload, error = self._verify(token)
+        if error:
+            return await self._fail(scope, receive, send, error)
+
+        # Save decoded token in request.state
+        scope.setdefault("state", {})["user"] = payload
+
+        # Continue request
+        await self.app(scope, receive, send)
+
+    def _verify(self, token: str) -> Tuple[Optional[dict], Optional[str]]:
+        now = time.time()
+
+        cached = self._tokens.get(token)
+        if cached is not None:
+            frozen, expires_at = cached
+            if now < expires_at:
+                self._tokens.move_to_end(token)
+                return loads(frozen), None
+            del self._tokens[token]
+            return None, "Token expired"
+
         try:
             payload = jwt.decode(
                 token,
                 settings.SECRET_KEY,
                 algorithms=[settings.ALGORITHM]
             )
+        except JWTError:
+            return None, "Invalid or expired token"
 
-            # Check token expiration
-            if datetime.utcnow() > datetime.fromtimestamp(payload["exp"]):
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "fail", "message": "Token expired"}
-                )
+        # Check token expiration
+        expires_at = payload.get("exp")
+        if expires_at is None:
+            return None, "Invalid or expired token"
+        if now >= expires_at:
+            return None, "Token expired"
 
-            # Save decoded token in request.state
-            request.state.user = payload
+        self._tokens[token] = (dumps(payload), expires_at)
+        if len(self._tokens) > self.cache_size:
+            self._tokens.popitem(last=False)
 
-        except JWTError:
-            return JSONResponse(
-                status_code=401,
-                content={"status": "fail", "message": "Invalid or expired token"}
-            )
+        return payload, None
 
-        # Continue request
-        return await call_next(request)
+    @staticmethod
+    async def _fail(scope: Scope, receive: Receive, send: Send, message: str):
+        response = JSONResponse(
+            status_code=401,
+            content={"status": "fail", "message": message}
+        )
+        await response(scope, receive, send)
@@ -1,20 +1,119 @@
-from pydantic import Field
+from pydantic import Field, model_validator
 from typing import Optional
-from datetime import datetime
-from beanie import Document, Indexed, Link
+from datetime import date as dt_date, datetime, time
+from beanie import Document, Indexed, Link, PydanticObjectId
+from bson import DBRef
 from app.schemas.session import Session
 from app.schemas.exception_session import ExceptionSession
 from app.schemas.subject import Subject  
+from app.utils.attendance_bits import pack_bits, popcount, unpack_bits
+
+
+def _ref_id(value):
+    if value is None:
+        return None
+    if isinstance(value, Link):
+        return value.ref.id
+    if isinstance(value, DBRef):
+        return value.id
+    if isinstance(value, dict):
+        return value.get("_id")
+    return getattr(value, "id", None)
+
+
+def _field(obj, name: str):
+    # unfetched links carry nothing but the id
+    if obj is None or isinstance(obj, (Link, DBRef)):
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def build_attendance_context(date: datetime, session=None, exception=None, subject=None) -> dict:
+    """
+    Scheduling facts copied onto the attendance so dashboard pipelines can
+    start with an indexed $match instead of joining sessions / exceptions.
+    Accepts documents or raw dicts.
+
+    session:   the base session (for exceptions, exception.session)
+    subject:   fallback for Add exceptions, which have no base session
+    """
+    teacher = _field(exception, "teacher") or _field(session, "teacher")
+    subject_ref = _field(session, "subject") or _field(exception, "subject")
+    semester = _field(session, "semester") or _field(subject, "semester")
+
+    effective_date = _field(exception, "date") or date
+    if isinstance(effective_date, dt_date) and not isinstance(effective_date, datetime):
+        effective_date = datetime.combine(effective_date, time.min)
+
+    return {
+        "effective_date": effective_date,
+        "start_time": _field(exception, "start_time") or _field(session, "start_time"),
+        "end_time": _field(exception, "end_time") or _field(session, "end_time"),
+        "exception_action": _field(exception, "action"),
+        "teacher_id": _ref_id(teacher),
+        "subject_id": _ref_id(subject_ref),
+        "department": _field(session, "department") or _field(subject, "department"),
+        "program": _field(session, "program") or _field(subject, "program"),
+        "semester": str(semester) if semester is not None else None,
+        "academic_year": _field(session, "academic_year"),
+    }
+
 
 class Attendance(Document):
     session: Optional[Link[Session]] = None
     exception_session: Optional[Link[ExceptionSession]] = None
     date: Indexed(datetime)
-    students: Optional[str] = None
+
+    # packed bitset, one bit per student in roll order (see app.utils.attendance_bits)
+    students: Optional[bytes] = None
+    present_count: int = 0
+    total: int = 0
+
+    # denormalized from the session / exception at write time
+    effective_date: Optional[datetime] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    exception_action: Optional[str] = None
+    teacher_id: Optional[PydanticObjectId] = None
+    subject_id: Optional[PydanticObjectId] = None
+    department: Optional[str] = None
+    program: Optional[str] = None
+    semester: Optional[str] = None
+    academic_year: Optional[str] = None
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-   
+    @model_validator(mode="before")
+    @classmethod
+    def pack_legacy_bitstring(cls, data):
+        # documents written before the bitset migration store "0101..."
+        if isinstance(data, dict) and isinstance(data.get("students"), str):
+            data = dict(data)
+            bitstr = data["students"].strip()
+            data["students"] = pack_bits(bitstr)
+            data["total"] = len(bitstr)
+            data["present_count"] = bitstr.count("1")
+        return data
+
+    def set_students(self, bitstr: str) -> None:
+        """Store a '0101...' string packed, keeping the counters in sync."""
+        self.students = pack_bits(bitstr)
+        self.total = len(bitstr)
+        self.present_count = popcount(self.students)
+
+    def set_context(self, session=None, exception=None, subject=None) -> None:
+        """Refresh the denormalized scheduling fields, see build_attendance_context."""
+        context = build_attendance_context(self.date, session, exception, subject)
+        for name, value in context.items():
+            if value is not None:
+                setattr(self, name, value)
+
+    @property
+    def bitstring(self) -> str:
+        return unpack_bits(self.students, self.total)
 
     class Settings:
         name = "attendances"
@@ -22,6 +121,10 @@ class Attendance(Document):
             ("session", "date"),
             ("session"),
             ("date",),
+            [("effective_date", 1), ("teacher_id", 1)],
+            [("teacher_id", 1), ("effective_date", 1)],
+            [("subject_id", 1), ("effective_date", 1)],
+            [("department", 1), ("program", 1), ("semester", 1), ("academic_year", 1), ("effective_date", 1)],
         ]
 
         async def pre_save(self) -> None:
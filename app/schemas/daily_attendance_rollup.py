@@ -0,0 +1,41 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from typing import Optional
+from pymongo import IndexModel
+
+
+class DailyAttendanceRollup(Document):
+    """
+    One row per (date, department, program, semester, subject, teacher),
+    kept up to date by the attendance stream worker. Dashboards average
+    over sessions as percentage_sum / sessions.
+    """
+    date: datetime
+    department: str
+    program: str
+    semester: int
+    subject_id: PydanticObjectId
+    teacher_id: Optional[PydanticObjectId] = None
+
+    sessions: int = 0
+    present_sum: int = 0
+    total_sum: int = 0
+    percentage_sum: float = 0.0
+
+    class Settings:
+        name = "daily_attendance_rollup"
+        indexes = [
+            IndexModel(
+                [
+                    ("date", 1),
+                    ("department", 1),
+                    ("program", 1),
+                    ("semester", 1),
+                    ("subject_id", 1),
+                    ("teacher_id", 1),
+                ],
+                unique=True
+            ),
+            [("subject_id", 1), ("date", 1)],
+            [("teacher_id", 1), ("date", 1)],
+        ]
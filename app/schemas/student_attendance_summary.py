@@ -1,12 +1,37 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List
+from typing import List, Optional
 from beanie import Document, Indexed, Link
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel
 from app.schemas.subject import Subject  
 from app.schemas.student import Student
 from app.schemas.attendance import Attendance
 
+
+def summary_student_fields(student: Student) -> dict:
+    """Student fields copied onto every summary of that student."""
+    name = " ".join(filter(None, [student.first_name, student.last_name]))
+    return {
+        "department": student.department,
+        "program": student.program,
+        "semester": student.semester,
+        "batch_year": student.batch_year,
+        "roll_number": student.roll_number,
+        "student_name": name,
+        "profile_picture": str(student.profile_picture) if student.profile_picture else None,
+    }
+
+
+def summary_profile_fields(student: Student, subject: Link) -> dict:
+    """Student / subject fields copied onto the summary for the defaulter queries."""
+    return {
+        **summary_student_fields(student),
+        "subject_name": getattr(subject, "subject_name", None),
+        "subject_code": getattr(subject, "subject_code", None),
+    }
+
+
 class StudentAttendanceSummary(Document):
     student: Link[Student] 
     subject: Link[Subject] 
@@ -14,6 +39,21 @@ class StudentAttendanceSummary(Document):
     attended: int
     percentage: float
     sessions_present: List[Link[Attendance]]  
+    # the last few attendances counted in total_classes, so a replayed
+    # update can tell it was already applied (see worker_attendance_stream)
+    counted_sessions: List[Link[Attendance]] = []
+
+    # denormalized from the student / subject for the defaulter queries
+    department: Optional[str] = None
+    program: Optional[str] = None
+    semester: Optional[int] = None
+    batch_year: Optional[int] = None
+    roll_number: Optional[int] = None
+    student_name: Optional[str] = None
+    profile_picture: Optional[str] = None
+    subject_name: Optional[str] = None
+    subject_code: Optional[str] = None
+
     created_at: Indexed(datetime) = datetime.utcnow()  # type: ignore
     updated_at: Indexed(datetime) = datetime.utcnow()  # type: ignore
 
@@ -35,8 +75,23 @@ class StudentAttendanceSummary(Document):
 
     class Settings:
         name = "student_attendance_summary"
+        # Defaulter pages sort on student, so the indexes they use put the
+        # equality fields first and student right after, with no range in
+        # between: one per clerk scope with / without a semester, and for
+        # unscoped pages (admin, teacher) a partial index over the
+        # defaulters only (threshold <= 75, mirrors DEFAULTER_THRESHOLD);
+        # a subject filter picks its page by (subject, student).
+        # Higher thresholds walk (student, subject) in order instead.
         indexes = [
             [("student", 1), ("subject", 1)],
+            [("program", 1), ("department", 1), ("semester", 1), ("student", 1), ("percentage", 1)],
+            [("program", 1), ("department", 1), ("student", 1), ("percentage", 1)],
+            [("subject", 1), ("student", 1), ("percentage", 1)],
+            IndexModel(
+                [("student", 1), ("percentage", 1)],
+                name="defaulters_by_student",
+                partialFilterExpression={"percentage": {"$lt": 75}}
+            ),
         ]
 
         # Automatically update updated_at timestamp on save
@@ -0,0 +1,31 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from typing import Optional
+from pymongo import IndexModel
+
+
+class TeacherDailyStats(Document):
+    """
+    Leaderboard counters per (teacher, date, program). Attendances are
+    folded in by the attendance stream worker, cancellations when the
+    exception is created; a period's stats are a sum over its days.
+    """
+    teacher_id: PydanticObjectId
+    date: datetime
+    program: Optional[str] = None
+
+    conducted: int = 0
+    rescheduled: int = 0
+    cancelled: int = 0
+    present_sum: int = 0
+    total_sum: int = 0
+
+    class Settings:
+        name = "teacher_daily_stats"
+        indexes = [
+            IndexModel(
+                [("teacher_id", 1), ("date", 1), ("program", 1)],
+                unique=True
+            ),
+            [("date", 1), ("program", 1)],
+        ]
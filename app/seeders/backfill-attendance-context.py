@@ -0,0 +1,79 @@
+import asyncio
+from pymongo import UpdateOne
+
+from app.core.database import init_db
+from app.schemas.attendance import Attendance, build_attendance_context
+
+BATCH_SIZE = 1000
+
+# one-off backfill of the denormalized scheduling fields (effective_date,
+# teacher_id, subject_id, department, ...) on attendances written before
+# they existed. Safe to re-run, only documents without effective_date are touched.
+async def run():
+    await init_db()
+
+    collection = Attendance.get_motor_collection()
+    cursor = collection.aggregate([
+        {"$match": {"effective_date": {"$exists": False}}},
+        {"$project": {"date": 1, "session": 1, "exception_session": 1}},
+        {
+            "$lookup": {
+                "from": "exception_sessions",
+                "localField": "exception_session.$id",
+                "foreignField": "_id",
+                "as": "e"
+            }
+        },
+        {"$unwind": {"path": "$e", "preserveNullAndEmptyArrays": True}},
+        {
+            "$lookup": {
+                "from": "sessions",
+                "let": {"sid": {"$ifNull": ["$e.session.$id", "$session.$id"]}},
+                "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$sid"]}}}],
+                "as": "s"
+            }
+        },
+        {"$unwind": {"path": "$s", "preserveNullAndEmptyArrays": True}},
+        {
+            "$lookup": {
+                "from": "subjects",
+                "localField": "e.subject.$id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"department": 1, "program": 1, "semester": 1}}],
+                "as": "sub"
+            }
+        },
+        {"$unwind": {"path": "$sub", "preserveNullAndEmptyArrays": True}},
+    ], batchSize=BATCH_SIZE)
+
+    operations = []
+    updated = 0
+
+    async for doc in cursor:
+        context = build_attendance_context(
+            doc["date"],
+            session=doc.get("s"),
+            exception=doc.get("e"),
+            subject=doc.get("sub")
+        )
+
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {k: v for k, v in context.items() if v is not None}}
+        ))
+
+        if len(operations) >= BATCH_SIZE:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+            print(f"Backfilled {updated} attendances...")
+
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    print(f"Done. Backfilled {updated} attendances")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+import asyncio
+from pymongo import UpdateOne
+
+from app.core.database import init_db
+from app.schemas.student_attendance_summary import StudentAttendanceSummary
+
+BATCH_SIZE = 1000
+
+# Copies student / subject fields onto StudentAttendanceSummary for the
+# defaulter queries. The stream worker refreshes them on every attendance
+# change; re-run this after bulk student edits (renames, semester promotion).
+async def run():
+    await init_db()
+
+    collection = StudentAttendanceSummary.get_motor_collection()
+    cursor = collection.aggregate([
+        {"$project": {"student": 1, "subject": 1}},
+        {
+            "$lookup": {
+                "from": "students",
+                "localField": "student.$id",
+                "foreignField": "_id",
+                "pipeline": [{
+                    "$project": {
+                        "first_name": 1, "last_name": 1, "profile_picture": 1, "roll_number": 1,
+                        "department": 1, "program": 1, "semester": 1, "batch_year": 1
+                    }
+                }],
+                "as": "st"
+            }
+        },
+        {"$unwind": "$st"},
+        {
+            "$lookup": {
+                "from": "subjects",
+                "localField": "subject.$id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"subject_name": 1, "subject_code": 1}}],
+                "as": "sub"
+            }
+        },
+        {"$unwind": {"path": "$sub", "preserveNullAndEmptyArrays": True}},
+    ], batchSize=BATCH_SIZE)
+
+    operations = []
+    updated = 0
+
+    async for doc in cursor:
+        student = doc["st"]
+        subject = doc.get("sub") or {}
+
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {
+                "department": student.get("department"),
+                "program": student.get("program"),
+                "semester": student.get("semester"),
+                "batch_year": student.get("batch_year"),
+                "roll_number": student.get("roll_number"),
+                "student_name": " ".join(filter(None, [student.get("first_name"), student.get("last_name")])),
+                "profile_picture": student.get("profile_picture"),
+                "subject_name": subject.get("subject_name"),
+                "subject_code": subject.get("subject_code"),
+            }}
+        ))
+
+        if len(operations) >= BATCH_SIZE:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+            print(f"Updated {updated} summaries...")
+
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    print(f"Done. Updated {updated} summaries")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+import asyncio
+from pymongo import UpdateOne
+
+from app.core.database import init_db
+from app.schemas.attendance import Attendance
+from app.utils.attendance_bits import pack_bits
+
+BATCH_SIZE = 1000
+
+# one-off migration: Attendance.students "0101..." strings → packed BinData
+# with present_count / total. Safe to re-run, only string values are touched.
+# Start the attendance stream worker once before running it: it enables
+# change stream pre-images, which turn these rewrites into no-op diffs.
+async def run():
+    await init_db()
+
+    collection = Attendance.get_motor_collection()
+    cursor = collection.find(
+        {"students": {"$type": "string"}},
+        {"students": 1}
+    ).batch_size(BATCH_SIZE)
+
+    operations = []
+    migrated = 0
+
+    async for doc in cursor:
+        bitstr = (doc.get("students") or "").strip()
+
+        operations.append(UpdateOne(
+            {"_id": doc["_id"], "students": doc.get("students")},
+            {"$set": {
+                "students": pack_bits(bitstr),
+                "present_count": bitstr.count("1"),
+                "total": len(bitstr),
+            }}
+        ))
+
+        if len(operations) >= BATCH_SIZE:
+            result = await collection.bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+            operations = []
+            print(f"Packed {migrated} attendances...")
+
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+
+    print(f"Done. Packed {migrated} attendances")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+import asyncio
+
+from app.core.database import init_db
+from app.schemas.daily_attendance_rollup import DailyAttendanceRollup
+from app.schemas.subject_session_stats import SubjectSessionStats
+
+# Rebuilds daily_attendance_rollup from subject_session_stats. $out swaps
+# the collection in atomically and keeps its indexes; increments the stream
+# worker applies while this runs are lost, so run it with the worker stopped.
+async def run():
+    await init_db()
+
+    pipeline = [
+        {
+            "$lookup": {
+                "from": "subjects",
+                "localField": "subject.$id",
+                "foreignField": "_id",
+                "pipeline": [
+                    {"$project": {"department": 1, "program": 1, "semester": 1, "teacher_assigned": 1}}
+                ],
+                "as": "sub"
+            }
+        },
+        {"$unwind": "$sub"},
+        {
+            "$lookup": {
+                "from": "attendances",
+                "localField": "session_id.$id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"teacher_id": 1}}],
+                "as": "att"
+            }
+        },
+        {"$unwind": {"path": "$att", "preserveNullAndEmptyArrays": True}},
+        {
+            "$group": {
+                "_id": {
+                    "date": "$date",
+                    "department": "$sub.department",
+                    "program": "$sub.program",
+                    "semester": "$sub.semester",
+                    "subject_id": "$sub._id",
+                    "teacher_id": {"$ifNull": ["$att.teacher_id", "$sub.teacher_assigned.$id"]}
+                },
+                "sessions": {"$sum": 1},
+                "present_sum": {"$sum": "$present_count"},
+                "total_sum": {"$sum": {"$add": ["$present_count", "$absent_count"]}},
+                "percentage_sum": {"$sum": "$percentage_present"}
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "date": "$_id.date",
+                "department": "$_id.department",
+                "program": "$_id.program",
+                "semester": "$_id.semester",
+                "subject_id": "$_id.subject_id",
+                "teacher_id": "$_id.teacher_id",
+                "sessions": 1,
+                "present_sum": 1,
+                "total_sum": 1,
+                "percentage_sum": 1
+            }
+        },
+        {"$out": DailyAttendanceRollup.Settings.name}
+    ]
+
+    await SubjectSessionStats.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+    rows = await DailyAttendanceRollup.get_motor_collection().count_documents({})
+    print(f"Done. Rebuilt daily_attendance_rollup with {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+import asyncio
+
+from app.core.database import init_db
+from app.schemas.attendance import Attendance
+from app.schemas.exception_session import ExceptionSession
+from app.schemas.teacher_daily_stats import TeacherDailyStats
+
+# Rebuilds teacher_daily_stats from attendances (needs the denormalized
+# fields, see backfill-attendance-context.py) and cancelled exceptions.
+# Run it with the attendance stream worker stopped.
+async def run():
+    await init_db()
+
+    collection = TeacherDailyStats.Settings.name
+
+    day = {"$dateTrunc": {"date": {"$ifNull": ["$effective_date", "$date"]}, "unit": "day"}}
+
+    # marked attendances → conducted / rescheduled / present / total
+    await Attendance.get_motor_collection().aggregate([
+        {"$match": {"teacher_id": {"$ne": None}, "total": {"$gt": 0}}},
+        {
+            "$group": {
+                "_id": {"teacher_id": "$teacher_id", "date": day, "program": "$program"},
+                "conducted": {"$sum": 1},
+                "rescheduled": {
+                    "$sum": {"$cond": [{"$eq": ["$exception_action", "Reschedule"]}, 1, 0]}
+                },
+                "present_sum": {"$sum": "$present_count"},
+                "total_sum": {"$sum": "$total"}
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "teacher_id": "$_id.teacher_id",
+                "date": "$_id.date",
+                "program": "$_id.program",
+                "conducted": 1,
+                "rescheduled": 1,
+                "cancelled": {"$literal": 0},
+                "present_sum": 1,
+                "total_sum": 1
+            }
+        },
+        {"$out": collection}
+    ]).to_list(length=None)
+
+    # cancellations, merged into the same (teacher, date, program) rows
+    await ExceptionSession.get_motor_collection().aggregate([
+        {"$match": {"action": "Cancel", "teacher": {"$ne": None}}},
+        {
+            "$lookup": {
+                "from": "sessions",
+                "localField": "session.$id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"program": 1}}],
+                "as": "s"
+            }
+        },
+        {"$unwind": {"path": "$s", "preserveNullAndEmptyArrays": True}},
+        {
+            "$group": {
+                "_id": {"teacher_id": "$teacher.$id", "date": day, "program": "$s.program"},
+                "cancelled": {"$sum": 1}
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "teacher_id": "$_id.teacher_id",
+                "date": "$_id.date",
+                "program": "$_id.program",
+                "cancelled": 1
+            }
+        },
+        {
+            "$merge": {
+                "into": collection,
+                "on": ["teacher_id", "date", "program"],
+                "whenMatched": [{"$set": {"cancelled": "$$new.cancelled"}}],
+                "whenNotMatched": "insert"
+            }
+        }
+    ]).to_list(length=None)
+
+    rows = await TeacherDailyStats.get_motor_collection().count_documents({})
+    print(f"Done. Rebuilt teacher_daily_stats with {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -115,12 +115,13 @@ async def run():
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
             )
+            attendance.set_context(session=ex.session, exception=ex, subject=ex.subject)
             await attendance.insert()
 
-            attendance.students = generate_bitstring(
+            attendance.set_students(generate_bitstring(
                 len(students),
                 random_float(0.6, 0.9)
-            )
+            ))
             await attendance.save()
 
         # ---------------- NORMAL SESSION LOOP ----------------
@@ -227,12 +228,13 @@ async def run():
                     updated_at=datetime.utcnow()
                 )
 
+            attendance.set_context(session=sess, exception=existing_exception)
             await attendance.insert()
 
-            attendance.students = generate_bitstring(
+            attendance.set_students(generate_bitstring(
                 len(students),
                 random_float(0.6, 0.9)
-            )
+            ))
             await attendance.save()
 
         date_cursor += timedelta(days=1)
@@ -4,11 +4,11 @@ from fastapi.responses import JSONResponse
 from app.schemas.department import Department
 from app.schemas.program import Program
 from app.models.allModel import CreateDepartmentRequest, UpdateDepartmentRequest, DepartmentResponse
-from app.core.redis import get_redis_client
-import json
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import emit, tag
+from app.utils.json_encoder import FastJSONResponse
 from beanie import Link
 from bson import ObjectId
-from app.core.redis import get_redis_client
 
 async def create_department(request: Request, dept_data: CreateDepartmentRequest) -> JSONResponse:
     try:
@@ -53,9 +53,7 @@ async def create_department(request: Request, dept_data: CreateDepartmentRequest
         await department.insert()
         
         # Invalidate cache
-        redis = await get_redis_client()
-        await redis.delete("all_departments")
-        await redis.delete("metadata_listing_v2")
+        await emit("departments.changed")
         
         return JSONResponse(
             status_code=201,
@@ -120,9 +118,7 @@ async def update_department(request: Request, id: str, update_data: UpdateDepart
         await department.save()
         
         # Invalidate cache
-        redis = await get_redis_client()
-        await redis.delete("all_departments")
-        await redis.delete("metadata_listing_v2")
+        await emit("departments.changed")
         
         return JSONResponse(status_code=200, content={"success": True, "message": "Department updated successfully"})
     except Exception as e:
@@ -130,24 +126,22 @@ async def update_department(request: Request, id: str, update_data: UpdateDepart
 
 async def list_all_departments(request: Request) -> JSONResponse:
     try:
-        redis = await get_redis_client()
-        cached = await redis.get("all_departments")
-        if cached:
-            return JSONResponse(status_code=200, content={"success": True, "data": json.loads(cached), "cached": True})
-        
-        departments = await Department.find_all(fetch_links=True).to_list()
-        data = [
-            {
-                "id": str(d.id),
-                "full_name": d.full_name,
-                "department_code": d.department_code,
-                "program_id": str(d.program_id.id) if d.program_id else None,
-                "is_active": d.is_active
-            } for d in departments
-        ]
-        
-        await redis.set("all_departments", json.dumps(data), ex=3600)
-        
-        return JSONResponse(status_code=200, content={"success": True, "data": data, "cached": False})
+        data = await _load_departments.raw()
+        return FastJSONResponse(status_code=200, content={"success": True, "data": data})
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
+
+
+# Cache for 1 hour, and 1 minute in process memory
+@cached(key=lambda: "all_departments", ttl=3600, local_ttl=60, tags=lambda: [tag("departments")])
+async def _load_departments() -> List[dict]:
+    departments = await Department.find_all(fetch_links=True).to_list()
+    return [
+        {
+            "id": str(d.id),
+            "full_name": d.full_name,
+            "department_code": d.department_code,
+            "program_id": str(d.program_id.id) if d.program_id else None,
+            "is_active": d.is_active
+        } for d in departments
+    ]
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from app.schemas.subject_session_stats import SubjectSessionStats
+from app.schemas.attendance import Attendance
 
 
 async def get_extremes(
@@ -27,116 +27,42 @@ async def get_extremes(
             # End of the month (current moment or end of day)
             end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
 
+        #filter on the denormalized attendance fields, no joins until the winners are known
         base_pipeline = [
-
-            #filter by date
             {
                 "$match": {
-                    "date": {"$gte": start, "$lte": end}
+                    "effective_date": {"$gte": start, "$lte": end},
+                    "total": {"$gt": 0},
+                    **({"department": department} if department else {}),
+                    **({"program": program} if program else {})
                 }
             },
+            {
+                "$project": {
+                    "effective_date": 1,
+                    "subject_id": 1,
+                    "attendance": {
+                        "$multiply": [{"$divide": ["$present_count", "$total"]}, 100]
+                    }
+                }
+            }
+        ]
+
+        output_pipeline = [
+            {"$limit": 1},
 
             #join subject
             {
                 "$lookup": {
                     "from": "subjects",
-                    "localField": "subject.$id",
+                    "localField": "subject_id",
                     "foreignField": "_id",
-                    "pipeline": [
-                        {
-                            "$project": {
-                                "subject_name": 1,
-                                "program": 1
-                            }
-                        }
-                    ],
+                    "pipeline": [{"$project": {"subject_name": 1}}],
                     "as": "sub"
                 }
             },
             {"$unwind": "$sub"},
 
-            #program filter
-            *(
-                [{"$match": {"sub.program": program}}]
-                if program else []
-            ),
-
-            #join attendance
-            {
-                "$lookup": {
-                    "from": "attendances",
-                    "localField": "session_id.$id",
-                    "foreignField": "_id",
-                    "as": "att"
-                }
-            },
-            {"$unwind": "$att"},
-
-            #join session
-            {
-                "$lookup": {
-                    "from": "sessions",
-                    "localField": "att.session.$id",
-                    "foreignField": "_id",
-                    "pipeline": [
-                        {
-                            "$project": {
-                                "start_time": 1,
-                                "end_time": 1,
-                                "department": 1
-                            }
-                        }
-                    ],
-                    "as": "s"
-                }
-            },
-            {"$unwind": {"path": "$s", "preserveNullAndEmptyArrays": True}},
-
-            #join exception_session
-            {
-                "$lookup": {
-                    "from": "exception_sessions",
-                    "localField": "att.exception_session.$id",
-                    "foreignField": "_id",
-                    "pipeline": [
-                        {
-                            "$project": {
-                                "start_time": 1,
-                                "end_time": 1,
-                                "department": 1
-                            }
-                        }
-                    ],
-                    "as": "e"
-                }
-            },
-            {"$unwind": {"path": "$e", "preserveNullAndEmptyArrays": True}},
-
-            #department filter
-            *(
-                [{
-                    "$match": {
-                        "$or": [
-                            {"s.department": department},
-                            {"e.department": department}
-                        ]
-                    }
-                }]
-                if department else []
-            ),
-
-            #merge times
-            {
-                "$addFields": {
-                    "start_time": {
-                        "$ifNull": ["$s.start_time", "$e.start_time"]
-                    },
-                    "end_time": {
-                        "$ifNull": ["$s.end_time", "$e.end_time"]
-                    }
-                }
-            },
-
             #final output
             {
                 "$project": {
@@ -144,33 +70,29 @@ async def get_extremes(
                     "date": {
                         "$dateToString": {
                             "format": "%d %b",
-                            "date": "$date"
+                            "date": "$effective_date"
                         }
                     },
                     "subject": "$sub.subject_name",
-                    "attendance": {
-                        "$round": ["$percentage_present", 1]
-                    },
-                    
+                    "attendance": {"$round": ["$attendance", 1]}
                 }
             }
         ]
 
-        #highest attendance
-        highest = await SubjectSessionStats.aggregate(
+        #highest and lowest attendance in one pass
+        facets = await Attendance.aggregate(
             base_pipeline + [
-                {"$sort": {"attendance": -1}},
-                {"$limit": 1}
+                {
+                    "$facet": {
+                        "highest": [{"$sort": {"attendance": -1}}, *output_pipeline],
+                        "lowest": [{"$sort": {"attendance": 1}}, *output_pipeline]
+                    }
+                }
             ]
         ).to_list()
 
-        #lowest attendance
-        lowest = await SubjectSessionStats.aggregate(
-            base_pipeline + [
-                {"$sort": {"attendance": 1}},
-                {"$limit": 1}
-            ]
-        ).to_list()
+        highest = facets[0]["highest"] if facets else []
+        lowest = facets[0]["lowest"] if facets else []
 
         result = {
             "success": True,
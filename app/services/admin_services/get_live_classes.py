@@ -1,9 +1,13 @@
+import json
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse
 
 from app.schemas.attendance import Attendance
+from app.utils.live_board import LIVE_BOARD_CHANNEL, read_live_board
+from app.utils.redis_pub_sub import subscribe_to_channel
 
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -24,175 +28,11 @@ async def get_live_classes(request: Request) -> JSONResponse:
 
 
     try:
-        now = datetime.now(tz=IST)
-        current_time_str = now.strftime("%H:%M")
-        # current_time_str = "23:10"
-
-        #date should match stored UTC midnight
-        today_date = datetime.combine(now.date(), datetime.min.time())
-        # today_date = datetime(2025, 6, 11, 0, 0, 0)
-
-        pipeline = [
-            #match today's attendance
-            {
-                "$match": {
-                    "date": today_date
-                }
-            },
-
-            #lookup session
-            {
-                "$lookup": {
-                    "from": "sessions",
-                    "localField": "session.$id",
-                    "foreignField": "_id",
-                    "as": "session_data"
-                }
-            },
-
-            #lookup exception session
-            {
-                "$lookup": {
-                    "from": "exception_sessions",
-                    "localField": "exception_session.$id",
-                    "foreignField": "_id",
-                    "as": "exception_session_data"
-                }
-            },
-
-            #unwind
-            {
-                "$unwind": {
-                    "path": "$session_data",
-                    "preserveNullAndEmptyArrays": True
-                }
-            },
-            {
-                "$unwind": {
-                    "path": "$exception_session_data",
-                    "preserveNullAndEmptyArrays": True
-                }
-            },
-
-            #choose active session
-            {
-                "$addFields": {
-                    "active_session": {
-                        "$cond": {
-                            "if": {"$ifNull": ["$exception_session_data._id", False]},
-                            "then": "$exception_session_data",
-                            "else": "$session_data"
-                        }
-                    }
-                }
-            },
-
-            #filter live sessions
-            {
-                "$match": {
-                    "$expr": {
-                        "$and": [
-                            {"$lte": ["$active_session.start_time", current_time_str]},
-                            {"$gt": ["$active_session.end_time", current_time_str]}
-                        ]
-                    }
-                }
-            },
-
-            #calculate attendance
-            {
-                "$addFields": {
-                    "present_students": {
-                        "$size": {
-                            "$filter": {
-                                "input": {
-                                    "$map": {
-                                        "input": {"$range": [0, {"$strLenCP": "$students"}]},
-                                        "as": "i",
-                                        "in": {
-                                            "$substrCP": ["$students", "$$i", 1]
-                                        }
-                                    }
-                                },
-                                "as": "char",
-                                "cond": {"$eq": ["$$char", "1"]}
-                            }
-                        }
-                    },
-                    "total_students": {"$strLenCP": "$students"}
-                }
-            },
-
-            #lookup subject
-            {
-                "$lookup": {
-                    "from": "subjects",
-                    "localField": "active_session.subject.$id",
-                    "foreignField": "_id",
-                    "as": "subject_data"
-                }
-            },
-            {
-                "$unwind": {
-                    "path": "$subject_data",
-                    "preserveNullAndEmptyArrays": True
-                }
-            },
-
-            #lookup teacher
-            {
-                "$lookup": {
-                    "from": "teachers",
-                    "localField": "active_session.teacher.$id",
-                    "foreignField": "_id",
-                    "as": "teacher_data"
-                }
-            },
-            {
-                "$unwind": {
-                    "path": "$teacher_data",
-                    "preserveNullAndEmptyArrays": True
-                }
-            },
-
-            #remove duplicates (important)
-            {
-                "$group": {
-                    "_id": {
-                        "teacher": "$teacher_data._id",
-                        "start_time": "$active_session.start_time",
-                        "end_time": "$active_session.end_time"
-                    },
-                    "doc": {"$first": "$$ROOT"}
-                }
-            },
-            {
-                "$replaceRoot": {"newRoot": "$doc"}
-            },
-
-            #final output
-            {
-                "$project": {
-                    "_id": 0,
-                    "session_id": {"$toString": "$_id"},
-                    "subject_name": "$subject_data.subject_name",
-                    "teacher_name": {
-                        "$concat": [
-                            {"$ifNull": ["$teacher_data.first_name", ""]},
-                            " ",
-                            {"$ifNull": ["$teacher_data.last_name", ""]}
-                        ]
-                    },
-                    "total_students": 1,
-                    "present_students": 1,
-                    "session_type": {
-                        "$ifNull": ["$subject_data.component", "Lecture"]
-                    }
-                }
-            }
-        ]
+        #live board kept in redis by the session worker / attendance marking
+        results = await read_live_board()
 
-        results = await Attendance.aggregate(pipeline).to_list()
+        if results is None:
+            results = await load_live_classes_from_db()
 
         return JSONResponse(
             status_code=200,
@@ -210,4 +50,131 @@ async def get_live_classes(request: Request) -> JSONResponse:
                 "success": False,
                 "message": f"Error fetching live classes: {str(e)}"
             }
-        )
\ No newline at end of file
+        )
+
+
+async def stream_live_classes(request: Request):
+    """SSE: the current board, then every change the board publishes."""
+
+    if request.state.user.get("role") != "admin":
+        return JSONResponse(
+            status_code=403,
+            content={"success": False, "message": "Access denied"}
+        )
+
+    async def event_generator():
+        async with subscribe_to_channel(LIVE_BOARD_CHANNEL) as pubsub:
+            board = await read_live_board()
+            yield json.dumps({
+                "event": "snapshot",
+                "data": board if board is not None else await load_live_classes_from_db()
+            })
+
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=15.0)
+                if message:
+                    yield message["data"]
+
+    return EventSourceResponse(event_generator(), ping=15)
+
+
+async def load_live_classes_from_db() -> list:
+    """Fallback when today's board is missing from redis."""
+    now = datetime.now(tz=IST)
+    current_time_str = now.strftime("%H:%M")
+    # current_time_str = "23:10"
+
+    #date should match stored UTC midnight
+    today_date = datetime.combine(now.date(), datetime.min.time())
+    # today_date = datetime(2025, 6, 11, 0, 0, 0)
+
+    pipeline = [
+        #match today's live attendance on the denormalized timings
+        {
+            "$match": {
+                "effective_date": today_date,
+                "start_time": {"$lte": current_time_str},
+                "end_time": {"$gt": current_time_str}
+            }
+        },
+
+        #remove duplicates (important)
+        {
+            "$group": {
+                "_id": {
+                    "teacher": "$teacher_id",
+                    "start_time": "$start_time",
+                    "end_time": "$end_time"
+                },
+                "doc": {"$first": "$$ROOT"}
+            }
+        },
+        {
+            "$replaceRoot": {"newRoot": "$doc"}
+        },
+
+        #calculate attendance
+        {
+            "$addFields": {
+                "present_students": {"$ifNull": ["$present_count", 0]},
+                "total_students": {"$ifNull": ["$total", 0]}
+            }
+        },
+
+        #lookup subject
+        {
+            "$lookup": {
+                "from": "subjects",
+                "localField": "subject_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"subject_name": 1, "component": 1}}],
+                "as": "subject_data"
+            }
+        },
+        {
+            "$unwind": {
+                "path": "$subject_data",
+                "preserveNullAndEmptyArrays": True
+            }
+        },
+
+        #lookup teacher
+        {
+            "$lookup": {
+                "from": "teachers",
+                "localField": "teacher_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"first_name": 1, "last_name": 1}}],
+                "as": "teacher_data"
+            }
+        },
+        {
+            "$unwind": {
+                "path": "$teacher_data",
+                "preserveNullAndEmptyArrays": True
+            }
+        },
+
+        #final output
+        {
+            "$project": {
+                "_id": 0,
+                "session_id": {"$toString": "$_id"},
+                "subject_name": "$subject_data.subject_name",
+                "teacher_name": {
+                    "$concat": [
+                        {"$ifNull": ["$teacher_data.first_name", ""]},
+                        " ",
+                        {"$ifNull": ["$teacher_data.last_name", ""]}
+                    ]
+                },
+                "total_students": 1,
+                "present_students": 1,
+                "session_type": {
+                    "$ifNull": ["$subject_data.component", "Lecture"]
+                }
+            }
+        }
+    ]
+
+    return await Attendance.aggregate(pipeline).to_list()
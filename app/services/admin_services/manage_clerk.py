@@ -13,7 +13,7 @@ from bson import ObjectId
 from datetime import datetime
 from fastapi.encoders import jsonable_encoder
 from app.utils.publisher import send_to_queue
-from app.utils.redis_key_deletion import invalidate_redis_keys
+from app.utils.cache_tags import cache_set, emit, tag
 from app.utils.security import get_password_hash
 import logging
 
@@ -77,7 +77,7 @@ async def edit_clerk(request: Request, clerk_id: str, body: UpdateAcademicScopes
     # save to DB
     await clerk.save()
     
-    invalidate_redis_keys("clerks:profile:*")
+    await emit("clerk.updated", clerk_id=clerk.id)
     
     # send email notification
     try:
@@ -130,7 +130,6 @@ async def create_clerk(request, request_model: CreateClerkRequest):
 
     try:
         
-        redis = await get_redis_client()
         existing_clerk = await Clerk.find_one(Clerk.email == request_model.email)
 
         if existing_clerk:
@@ -146,7 +145,7 @@ async def create_clerk(request, request_model: CreateClerkRequest):
         pin = str(random.randint(100000, 999999))
 
         #hash pin
-        hashed_pin = get_password_hash(pin)
+        hashed_pin = await get_password_hash(pin)
 
         #build academic scopes
         scopes = [
@@ -170,12 +169,7 @@ async def create_clerk(request, request_model: CreateClerkRequest):
 
         await clerk.insert()
         
-        await invalidate_redis_keys("clerks:*")
-
-        #clear redis cache for all departments
-        for scope in scopes:
-            cache_key = f"clerks:{scope.department_id}"
-            await redis.delete(cache_key)
+        await emit("clerk.created")
 
         #send email task
         await send_to_queue(
@@ -348,10 +342,11 @@ async def get_clerk(
     }
 
     #store in redis
-    await redis.setex(
+    await cache_set(
         cache_key,
+        json.dumps(final_response),
         86400,
-        json.dumps(final_response)
+        tags=[tag("clerks")]
     )
 
     print(f"📥 Saved to Redis: {cache_key}")
@@ -3,8 +3,9 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from app.schemas.program import Program
 from app.models.allModel import CreateProgramRequest, UpdateProgramRequest, ProgramResponse
-from app.core.redis import get_redis_client
-import json
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import emit, tag
+from app.utils.json_encoder import FastJSONResponse
 from bson import ObjectId
 
 async def create_program(request: Request, program_data: CreateProgramRequest) -> JSONResponse:
@@ -38,9 +39,7 @@ async def create_program(request: Request, program_data: CreateProgramRequest) -
         await program.insert()
         
         # Invalidate cache
-        redis = await get_redis_client()
-        await redis.delete("all_programs")
-        await redis.delete("metadata_listing_v2")
+        await emit("programs.changed")
         
         return JSONResponse(
             status_code=201,
@@ -90,9 +89,7 @@ async def update_program(request: Request, id: str, update_data: UpdateProgramRe
         await program.save()
         
         # Invalidate cache
-        redis = await get_redis_client()
-        await redis.delete("all_programs")
-        await redis.delete("metadata_listing_v2")
+        await emit("programs.changed")
         
         return JSONResponse(status_code=200, content={"success": True, "message": "Program updated successfully"})
     except Exception as e:
@@ -101,24 +98,22 @@ async def update_program(request: Request, id: str, update_data: UpdateProgramRe
 
 async def list_all_programs(request: Request) -> JSONResponse:
     try:
-        redis = await get_redis_client()
-        cached = await redis.get("all_programs")
-        if cached:
-            return JSONResponse(status_code=200, content={"success": True, "data": json.loads(cached), "cached": True})
-        
-        programs = await Program.find_all().to_list()
-        data = [
-            {
-                "id": str(p.id),
-                "program_code": p.program_code,
-                "full_name": p.full_name,
-                "duration_years": p.duration_years,
-                "is_active": p.is_active
-            } for p in programs
-        ]
-        
-        await redis.set("all_programs", json.dumps(data), ex=3600) # Cache for 1 hour
-        
-        return JSONResponse(status_code=200, content={"success": True, "data": data, "cached": False})
+        data = await _load_programs.raw()
+        return FastJSONResponse(status_code=200, content={"success": True, "data": data})
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
+
+
+# Cache for 1 hour, and 1 minute in process memory
+@cached(key=lambda: "all_programs", ttl=3600, local_ttl=60, tags=lambda: [tag("programs")])
+async def _load_programs() -> List[dict]:
+    programs = await Program.find_all().to_list()
+    return [
+        {
+            "id": str(p.id),
+            "program_code": p.program_code,
+            "full_name": p.full_name,
+            "duration_years": p.duration_years,
+            "is_active": p.is_active
+        } for p in programs
+    ]
@@ -1,10 +1,9 @@
 from datetime import datetime, timedelta, timezone
-import json
 from typing import Optional
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from app.schemas.attendance import Attendance
-from app.core.redis import get_redis_client
+from app.schemas.teacher_daily_stats import TeacherDailyStats
+from app.utils.teacher_daily_stats import day_bucket
 
 
 async def get_teacher_leaderboard(
@@ -17,8 +16,6 @@ async def get_teacher_leaderboard(
 ) -> JSONResponse:
 
     try:
-        redis = await get_redis_client()
-
         #always use timezone aware datetime
         now = datetime.now(timezone.utc)
 
@@ -30,10 +27,8 @@ async def get_teacher_leaderboard(
             # end = datetime(2025, 10, 18, tzinfo=timezone.utc)
 
         elif period == "monthly":
-            #start = now - timedelta(days=30)
-            #end = now
-            start = datetime(2025, 5, 31, tzinfo=timezone.utc)
-            end = datetime(2025, 7, 31, tzinfo=timezone.utc)
+            start = now - timedelta(days=30)
+            end = now
 
         elif period == "custom":
             start = start_date or datetime(2000, 1, 1, tzinfo=timezone.utc)
@@ -43,57 +38,34 @@ async def get_teacher_leaderboard(
             start = now - timedelta(days=30)
             end = now
 
+        #day buckets, the granularity the counters are stored at
+        start = day_bucket(start)
+        end = day_bucket(end)
+
         #min sessions logic
         min_sessions = 0 if period == "weekly" else 10
 
-        #cache key (important fix)
-        cache_key = f"leaderboard:{department}:{program}:{period}:{start.isoformat()}:{end.isoformat()}"
-
-        cached = await redis.get(cache_key)
-        if cached:
-            return JSONResponse(status_code=200, content=json.loads(cached))
-
+        #not cached: it sums a few pre-aggregated rows per teacher, and the
+        #counters move with every attendance and cancel, so reads stay current
         pipeline = [
 
-            #join session
-            {
-                "$lookup": {
-                    "from": "sessions",
-                    "localField": "session.$id",
-                    "foreignField": "_id",
-                    "as": "s"
-                }
-            },
-            {"$unwind": {"path": "$s", "preserveNullAndEmptyArrays": True}},
-
-            #join exception
-            {
-                "$lookup": {
-                    "from": "exception_sessions",
-                    "localField": "exception_session.$id",
-                    "foreignField": "_id",
-                    "as": "e"
-                }
-            },
-            {"$unwind": {"path": "$e", "preserveNullAndEmptyArrays": True}},
-
-            #extract teacher + subject
+            #per-teacher, per-day counters in the period
             {
-                "$addFields": {
-                    "teacher_id": {
-                        "$ifNull": ["$s.teacher.$id", "$e.teacher.$id"]
-                    },
-                    "subject_id": {
-                        "$ifNull": ["$s.subject.$id", "$e.subject.$id"]
-                    }
+                "$match": {
+                    "date": {"$gte": start, "$lte": end},
+                    **({"program": program} if program else {})
                 }
             },
 
-            #filter by date
+            #sum per teacher
             {
-                "$match": {
-                    "teacher_id": {"$ne": None},
-                    "date": {"$gte": start, "$lte": end}
+                "$group": {
+                    "_id": "$teacher_id",
+                    "sum_present": {"$sum": "$present_sum"},
+                    "sum_total": {"$sum": "$total_sum"},
+                    "conducted": {"$sum": "$conducted"},
+                    "rescheduled": {"$sum": "$rescheduled"},
+                    "cancelled": {"$sum": "$cancelled"}
                 }
             },
 
@@ -101,7 +73,7 @@ async def get_teacher_leaderboard(
             {
                 "$lookup": {
                     "from": "teachers",
-                    "localField": "teacher_id",
+                    "localField": "_id",
                     "foreignField": "_id",
                     "pipeline": [
                         {
@@ -123,97 +95,12 @@ async def get_teacher_leaderboard(
                 if department else []
             ),
 
-            #join subject
-            {
-                "$lookup": {
-                    "from": "subjects",
-                    "localField": "subject_id",
-                    "foreignField": "_id",
-                    "pipeline": [{"$project": {"program": 1}}],
-                    "as": "sub"
-                }
-            },
-            {"$unwind": {"path": "$sub", "preserveNullAndEmptyArrays": True}},
-
-            *(
-                [{"$match": {"sub.program": program}}]
-                if program else []
-            ),
-
-            #calculate attendance
-            {
-                "$addFields": {
-                    "total_students": {"$strLenCP": {"$ifNull": ["$students", ""]}},
-                    "present_students": {
-                        "$size": {
-                            "$filter": {
-                                "input": {
-                                    "$map": {
-                                        "input": {
-                                            "$range": [
-                                                0,
-                                                {"$strLenCP": {"$ifNull": ["$students", ""]}}
-                                            ]
-                                        },
-                                        "as": "i",
-                                        "in": {"$substrCP": ["$students", "$$i", 1]}
-                                    }
-                                },
-                                "as": "c",
-                                "cond": {"$eq": ["$$c", "1"]}
-                            }
-                        }
-                    }
-                }
-            },
-
-            #group per teacher
-            {
-                "$group": {
-                    "_id": "$teacher_id",
-
-                    "first_name": {"$first": "$t.first_name"},
-                    "last_name": {"$first": "$t.last_name"},
-                    "department": {"$first": "$t.department"},
-                    "profile_picture": {"$first": "$t.profile_picture"},
-
-                    "sum_present": {"$sum": "$present_students"},
-                    "sum_total": {"$sum": "$total_students"},
-
-                    "conducted": {"$sum": 1},
-
-                    "rescheduled": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$e.action", "Reschedule"]}, 1, 0]
-                        }
-                    }
-                }
-            },
-
-            #lookup cancellations
-            {
-                "$lookup": {
-                    "from": "exception_sessions",
-                    "let": {"tid": "$_id"},
-                    "pipeline": [
-                        {
-                            "$match": {
-                                "$expr": {"$eq": ["$teacher.$id", "$$tid"]},
-                                "action": "Cancel",
-                                "date": {"$gte": start, "$lte": end}
-                            }
-                        },
-                        {"$count": "count"}
-                    ],
-                    "as": "c"
-                }
-            },
-
             {
                 "$addFields": {
-                    "cancelled": {
-                        "$ifNull": [{"$arrayElemAt": ["$c.count", 0]}, 0]
-                    }
+                    "first_name": "$t.first_name",
+                    "last_name": "$t.last_name",
+                    "department": "$t.department",
+                    "profile_picture": "$t.profile_picture"
                 }
             },
 
@@ -231,15 +118,12 @@ async def get_teacher_leaderboard(
                 }
             },
 
-            #min sessions (dynamic)
-            *(
-                [{
-                    "$match": {
-                        "total_sessions": {"$gte": min_sessions}
-                    }
-                }]
-                if min_sessions > 0 else []
-            ),
+            #min sessions (dynamic), never zero so the rates below are defined
+            {
+                "$match": {
+                    "total_sessions": {"$gte": max(min_sessions, 1)}
+                }
+            },
 
             #rates
             {
@@ -301,7 +185,7 @@ async def get_teacher_leaderboard(
             }
         ]
 
-        data = await Attendance.aggregate(pipeline).to_list()
+        data = await TeacherDailyStats.aggregate(pipeline).to_list()
 
         #rank + badge
         for i, t in enumerate(data):
@@ -316,8 +200,6 @@ async def get_teacher_leaderboard(
             "data": data
         }
 
-        await redis.set(cache_key, json.dumps(result), ex=300)
-
         return JSONResponse(status_code=200, content=result)
 
     except Exception as e:
@@ -0,0 +1,82 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.utils.security import password_hash_stats
+from app.utils.worker_metrics import read_worker_metrics
+
+
+async def get_worker_metrics(request: Request) -> JSONResponse:
+
+    if request.state.user.get("role") != "admin":
+        return JSONResponse(
+            status_code=403,
+            content={
+                "success": False,
+                "message": "Only admins can view worker metrics"
+            }
+        )
+
+    try:
+        instances = await read_worker_metrics()
+
+        # roll instances up per worker so replicas can be sized at a glance
+        workers = {}
+        for snap in instances:
+            name = snap.get("worker")
+            summary = workers.setdefault(name, {
+                "worker": name,
+                "replicas": 0,
+                "queue_depth": snap.get("queue_depth"),
+                "in_flight": 0,
+                "messages_per_sec": 0.0,
+                "max_latency_p95_ms": 0.0,
+                "max_error_rate": 0.0,
+            })
+            summary["replicas"] += 1
+            summary["in_flight"] += snap.get("in_flight", 0)
+            summary["messages_per_sec"] = round(summary["messages_per_sec"] + snap.get("messages_per_sec", 0.0), 3)
+            summary["max_latency_p95_ms"] = max(summary["max_latency_p95_ms"], snap.get("latency_p95_ms", 0.0))
+            summary["max_error_rate"] = max(summary["max_error_rate"], snap.get("error_rate", 0.0))
+
+        return JSONResponse(
+            status_code=200,
+            content={
+                "success": True,
+                "message": "Worker metrics fetched successfully",
+                "data": {
+                    "workers": list(workers.values()),
+                    "instances": instances
+                }
+            }
+        )
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "message": f"Error fetching worker metrics: {str(e)}"
+            }
+        )
+
+
+async def get_password_hashing_metrics(request: Request) -> JSONResponse:
+    """Login / password-hash queue stats of this API process."""
+
+    if request.state.user.get("role") != "admin":
+        return JSONResponse(
+            status_code=403,
+            content={
+                "success": False,
+                "message": "Only admins can view password hashing metrics"
+            }
+        )
+
+    return JSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "message": "Password hashing metrics fetched successfully",
+            "data": password_hash_stats()
+        }
+    )
@@ -15,6 +15,8 @@ from fastapi.responses import JSONResponse
 import logging
 from app.utils.send_otp import generate_and_store_otp, verify_otp
 from app.core.redis import get_redis_client
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import tag
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -57,7 +59,7 @@ async def login_user(request):
     # ---------------- LOAD USER ----------------
     user = await get_user_by_email_role(request.email, request.role)
 
-    if not user or not verify_password(request.password, user.password):
+    if not user or not await verify_password(request.password, user.password):
         return JSONResponse(
             status_code=401,
             content={"success": False, "message": "Invalid credentials"}
@@ -70,40 +72,8 @@ async def login_user(request):
         )
 
     # ---------------- ROLE BASED PAYLOAD ----------------
-    if request.role == "student":
-        access_payload = {
-            "id": str(user.id),
-            "email": user.email,
-            "role": "student",
-            "roll_number": user.roll_number,
-            "program": user.program,
-            "department": user.department,
-            "semester": user.semester,
-            "batch_year": user.batch_year
-        }
-
-    elif request.role == "clerk":
-        access_payload = {
-            "id": str(user.id),
-            "email": user.email,
-            "role": "clerk",
-            "academic_scopes": [
-                {
-                    "program_id": scope.program_id,
-                    "department_id": scope.department_id
-                }
-                for scope in user.academic_scopes
-            ]
-        }
-
-    elif request.role == "teacher":
-        access_payload = {
-            "id": str(user.id),
-            "email": user.email,
-            "role": "teacher"
-        }
-
-    else:
+    access_payload = build_access_payload(request.role, user)
+    if not access_payload:
         return JSONResponse(
             status_code=400,
             content={"success": False, "message": "Invalid role"}
@@ -252,15 +222,8 @@ async def refresh_access_token(request: Request):
             }
         )
 
-    # ---------------- ROLE → MODEL MAP ----------------
-    role_model_map = {
-        "student": Student,
-        "teacher": Teacher,
-        "clerk": Clerk
-    }
-
-    model = role_model_map.get(role)
-    if not model:
+    # ---------------- ROLE CHECK ----------------
+    if role not in ROLE_MODEL_MAP:
         return JSONResponse(
             status_code=401,
             content={
@@ -278,9 +241,9 @@ async def refresh_access_token(request: Request):
             }
         )
 
-    # ---------------- FETCH USER FROM DB ----------------
-    user = await model.find_one(model.id == ObjectId(user_id))
-    if not user:
+    # ---------------- CACHED PRINCIPAL ----------------
+    access_payload = await load_principal(role, user_id)
+    if not access_payload:
         return JSONResponse(
             status_code=401,
             content={
@@ -289,40 +252,6 @@ async def refresh_access_token(request: Request):
             }
         )
 
-    # ---------------- BUILD NEW ACCESS TOKEN ----------------
-    if role == "student":
-        access_payload = {
-            "id": str(user.id),
-            "email": user.email,
-            "role": "student",
-            "roll_number": user.roll_number,
-            "program": user.program,
-            "department": user.department,
-            "semester": user.semester,
-            "batch_year": user.batch_year
-        }
-
-    elif role == "clerk":
-        access_payload = {
-            "id": str(user.id),
-            "email": user.email,
-            "role": "clerk",
-            "academic_scopes": [
-                {
-                    "program_id": scope.program_id,
-                    "department_id": scope.department_id
-                }
-                for scope in user.academic_scopes
-            ]
-        }
-
-    elif role == "teacher":
-        access_payload = {
-            "id": str(user.id),
-            "email": user.email,
-            "role": "teacher"
-        }
-
     new_access_token = create_access_token(access_payload)
 
     return JSONResponse(
@@ -514,7 +443,7 @@ async def reset_user_password(request):
         )
 
     # Ensure new password is different
-    if verify_password(new_password, user.password):
+    if await verify_password(new_password, user.password):
         return JSONResponse(
             status_code=400,
             content={
@@ -526,7 +455,7 @@ async def reset_user_password(request):
     # Update password
     await user.update({
         "$set": {
-            "password": get_password_hash(new_password),
+            "password": await get_password_hash(new_password),
         }
     })
     
@@ -594,7 +523,7 @@ async def change_current_password(
         )
 
     # Check if current password matches
-    if not verify_password(current_password, user.password):
+    if not await verify_password(current_password, user.password):
         return JSONResponse(
             status_code=404,
             content={
@@ -614,7 +543,7 @@ async def change_current_password(
         )
 
     # Hash and update the password
-    hashed_password = get_password_hash(new_password)
+    hashed_password = await get_password_hash(new_password)
     await user.update({"$set": {"password": hashed_password}})
 
     return JSONResponse(
@@ -625,15 +554,70 @@ async def change_current_password(
         }
     )
 
+ROLE_MODEL_MAP = {
+    "student": Student,
+    "teacher": Teacher,
+    "clerk": Clerk
+}
+
+
 async def get_user_by_email_role(email: str, role: str):
-    role_model_map = {
-        "student": Student,
-        "teacher": Teacher,
-        "clerk": Clerk
-    }
-    
-    model = role_model_map.get(role.lower())
+    model = ROLE_MODEL_MAP.get(role.lower())
     if not model:
         return None
         
-    return await model.find_one(model.email == email)
\ No newline at end of file
+    return await model.find_one(model.email == email)
+
+
+def build_access_payload(role: str, user):
+    """Access token claims of a loaded user, None for an unknown role."""
+    if role == "student":
+        return {
+            "id": str(user.id),
+            "email": user.email,
+            "role": "student",
+            "roll_number": user.roll_number,
+            "program": user.program,
+            "department": user.department,
+            "semester": user.semester,
+            "batch_year": user.batch_year
+        }
+
+    if role == "clerk":
+        return {
+            "id": str(user.id),
+            "email": user.email,
+            "role": "clerk",
+            "academic_scopes": [
+                {
+                    "program_id": scope.program_id,
+                    "department_id": scope.department_id
+                }
+                for scope in user.academic_scopes
+            ]
+        }
+
+    if role == "teacher":
+        return {
+            "id": str(user.id),
+            "email": user.email,
+            "role": "teacher"
+        }
+
+    return None
+
+
+# Refresh-token exchanges from the mobile apps dominate user reads; the
+# claims are cached per user for 5 minutes and dropped by the
+# student.updated / teacher.updated / clerk.updated events (tag = role:id).
+@cached(
+    key=lambda role, user_id: f"principal:{role}:{user_id}",
+    ttl=300,
+    tags=lambda role, user_id: [tag(role, user_id)]
+)
+async def load_principal(role: str, user_id: str):
+    model = ROLE_MODEL_MAP[role]
+    user = await model.find_one(model.id == ObjectId(user_id))
+    if not user:
+        return None
+    return build_access_payload(role, user)
\ No newline at end of file
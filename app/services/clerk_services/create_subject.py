@@ -4,12 +4,11 @@ from app.core.database import get_db
 from app.schemas.subject import Subject
 from pydantic import ValidationError
 from bson.objectid import ObjectId
-from app.core.redis import get_redis_client
+from app.utils.cache_tags import emit
 
 async def create_subject(request, request_model):
     
     
-    redis = await get_redis_client()
     if request.state.user.get("role") != "clerk":
         return JSONResponse(
             status_code=400,
@@ -53,15 +52,8 @@ async def create_subject(request, request_model):
         
 
 
-        # Delete cache for subjects to ensure fresh data
-        cache_key_subject = [
-            f"subjects:{request.state.user.get('program')}:{request.state.user.get('department')}:{request.state.user.get('semester')}",
-            f"subject:{request.state.user.get('program')}",
-            f"assignable_subjects:{request.state.user.get('email')}"
-        ]
-
-
-        await redis.delete(*cache_key_subject)
+        # Drop cached subject lists of this department / program
+        await emit("subjects.changed", scopes=[(subject_data.department, subject_data.program)])
 
         return JSONResponse(
             status_code=200,  
@@ -13,8 +13,7 @@ from beanie.operators import In
 from app.schemas.teacher import Teacher
 from app.schemas.subject import Subject
 from app.utils.publisher import send_to_queue
-from app.core.redis import get_redis_client
-from app.utils.redis_key_deletion import invalidate_redis_keys
+from app.utils.cache_tags import emit
 from app.utils.security import get_password_hash
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -35,8 +34,6 @@ async def create_teacher(request: Request, request_model):
 
     try:
         
-        redis = await get_redis_client()
-        
         # STEP 2 — CHECK DUPLICATE TEACHER
         if await Teacher.find_one(Teacher.email == request_model.email):
             return JSONResponse(
@@ -111,7 +108,7 @@ async def create_teacher(request: Request, request_model):
 
         # STEP 5 — GENERATE PASSWORD
         raw_password = str(random.randint(100000, 999999))
-        hashed_password = get_password_hash(raw_password)
+        hashed_password = await get_password_hash(raw_password)
 
         # STEP 6 — CREATE TEACHER DOCUMENT
         teacher_data = Teacher(
@@ -131,24 +128,11 @@ async def create_teacher(request: Request, request_model):
             subject_doc.teacher_assigned = teacher_data
             await subject_doc.save()
             
-        scopes = request.state.user.get("academic_scopes", [])
-        program_ids = [s["program_id"] for s in scopes]
-        department_ids = [s["department_id"] for s in scopes]
-
-        # cache key (based on scope)
-        scope_key = "_".join(sorted([f"{d}:{p}" for d, p in zip(department_ids, program_ids)]))
-        cache_key = f"assignable_subjects:{scope_key}"
-
         # STEP 8 — CLEAR REDIS CACHE
-        cache_keys = set()
-        for s in subjects_to_assign_to_teacher:
-            cache_keys.add(f"subjects:{s.program}:{s.department}:{s.semester}")
-        cache_keys.add(cache_key)
-
-        for key in cache_keys:
-            await redis.delete(key)
-            
-        await invalidate_redis_keys("assignable_subjects:*")
+        await emit(
+            "subjects.changed",
+            scopes={(s.department, s.program) for s in subjects_to_assign_to_teacher}
+        )
 
         # STEP 9 — SEND EMAIL VIA QUEUE
         await send_to_queue(
@@ -1,8 +1,9 @@
+import re
 from fastapi import Request, Query
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from typing import Optional
-from bson import ObjectId
+from bson import DBRef, ObjectId
 
 from app.schemas.student_attendance_summary import StudentAttendanceSummary
 
@@ -16,8 +17,22 @@ async def defaulter_students(
     subject_id: Optional[str] = None,
     program: Optional[str] = None,
     semester: Optional[int] = None,
-    threshold: int = Query(75, ge=0, le=100)
+    threshold: int = Query(75, ge=0, le=100),
+    cursor: Optional[str] = None
 ):
+    """
+    Students with at least one subject below the threshold, one row per
+    student ordered by student id.
+
+    Reads the denormalized summary fields only, in student order from an
+    index and stopping once the page is full: a clerk's scopes become one
+    $or branch each with program / department (and semester) as equalities,
+    merged in student order; other roles walk the partial index over the
+    defaulters. Pass the returned next_cursor as `cursor` for the next page
+    (keyset); `page` still works but has to walk past the skipped students.
+    With subject_id, the page of students is picked from that subject's
+    below-threshold summaries before anything else is read.
+    """
 
     user = request.state.user
     role = user.get("role")
@@ -28,48 +43,30 @@ async def defaulter_students(
             content={"success": False, "message": "Access denied"}
         )
 
-    skip = (page - 1) * limit
-
-    pipeline = []
+    if cursor and not ObjectId.is_valid(cursor):
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": "Invalid cursor"}
+        )
 
     #percentage filter
-    pipeline.append({
-        "$match": {
-            "percentage": {"$lt": threshold}
-        }
-    })
-
-    #join student
-    pipeline.append({
-        "$lookup": {
-            "from": "students",
-            "localField": "student.$id",
-            "foreignField": "_id",
-            "as": "student_data"
-        }
-    })
-
-    #join subject
-    pipeline.append({
-        "$lookup": {
-            "from": "subjects",
-            "localField": "subject.$id",
-            "foreignField": "_id",
-            "as": "subject_data"
-        }
-    })
-
-    pipeline += [
-        {"$unwind": "$student_data"},
-        {"$unwind": "$subject_data"}
-    ]
+    match = {
+        "percentage": {"$lt": threshold}
+    }
 
     # ---------------- CLERK SCOPE FILTER ----------------
 
+    scope_filters = None
+
     if role == "clerk":
 
         scopes = user.get("academic_scopes", [])
 
+        # narrow the scopes rather than adding a second program predicate,
+        # so every $or branch keeps program / department as index equalities
+        if program:
+            scopes = [scope for scope in scopes if scope["program_id"] == program]
+
         if not scopes:
             return JSONResponse(
                 status_code=200,
@@ -80,178 +77,146 @@ async def defaulter_students(
                 }
             )
 
-        scope_filters = []
-
-        for scope in scopes:
-            scope_filters.append({
-                "student_data.program": scope["program_id"],
-                "student_data.department": scope["department_id"]
-            })
-
-        pipeline.append({
-            "$match": {
-                "$or": scope_filters
+        scope_filters = [
+            {
+                "program": scope["program_id"],
+                "department": scope["department_id"]
             }
-        })
+            for scope in scopes
+        ]
 
     # ---------------- OPTIONAL FILTERS ----------------
 
-    if program:
-        pipeline.append({
-            "$match": {
-                "student_data.program": program
-            }
-        })
+    # clerks had it applied to their scopes above
+    if program and scope_filters is None:
+        match["program"] = program
 
     if semester:
-        pipeline.append({
-            "$match": {
-                "student_data.semester": semester
-            }
-        })
-
-    # ---------------- GROUP BY STUDENT ----------------
+        match["semester"] = semester
 
-    pipeline.append({
-        "$group": {
-
-            "_id": "$student_data._id",
+    # ---------------- SEARCH ----------------
 
-            "name": {
-                "$first": {
-                    "$concat": [
-                        "$student_data.first_name",
-                        " ",
-                        "$student_data.last_name"
-                    ]
-                }
-            },
+    if search:
+        match["student_name"] = {"$regex": re.escape(search), "$options": "i"}
 
-            "profile_picture": {"$first": "$student_data.profile_picture"},
+    def scoped(match: dict) -> dict:
+        # a rooted $or is planned branch by branch, each with every filter
+        if scope_filters is None:
+            return match
+        return {"$or": [{**match, **scope} for scope in scope_filters]}
 
-            "roll": {"$first": "$student_data.roll_number"},
-            "program": {"$first": "$student_data.program"},
-            "semester": {"$first": "$student_data.semester"},
+    # ---------------- TOTAL (first page only in cursor mode) ----------------
 
-            "overall_percentage": {"$avg": "$percentage"},
+    total = None
+    if not cursor:
+        counted = await StudentAttendanceSummary.aggregate([
+            {"$match": scoped(match)},
+            *(
+                [{"$match": {"subject": DBRef("subjects", ObjectId(subject_id))}}]
+                if subject_id else []
+            ),
+            {"$group": {"_id": "$student"}},
+            {"$count": "count"}
+        ]).to_list(None)
+        total = counted[0]["count"] if counted else 0
 
-            "defaulter_subjects": {
-                "$push": {
-                    "id": "$subject_data._id",
-                    "name": "$subject_data.subject_name",
-                    "percentage": "$percentage",
-                    "code": "$subject_data.subject_code"
-                }
-            }
-        }
-    })
+    # ---------------- PAGE (keyset on student) ----------------
 
-    # ---------------- SEARCH ----------------
+    if cursor:
+        match["student"] = {"$gt": DBRef("students", ObjectId(cursor))}
 
-    if search:
-        pipeline.append({
-            "$match": {
-                "name": {
-                    "$regex": search,
-                    "$options": "i"
-                }
-            }
-        })
+    skip = 0 if cursor else (page - 1) * limit
 
-    # ---------------- SUBJECT FILTER ----------------
+    collection = StudentAttendanceSummary.get_motor_collection()
+    has_more = False
 
     if subject_id:
+        # page over the students defaulting in that subject first (one
+        # summary each, (subject, student) index order), then load only
+        # their other defaulter subjects for the overall percentage
+        subject_match = {**match, "subject": DBRef("subjects", ObjectId(subject_id))}
+        picked = await collection.find(
+            scoped(subject_match), {"student": 1}
+        ).sort("student", 1).skip(skip).limit(limit + 1).to_list(None)
+
+        has_more = len(picked) > limit
+        match["student"] = {"$in": [doc["student"] for doc in picked[:limit]]}
+        skip = 0
+
+    projection = {
+        "student": 1,
+        "subject": 1,
+        "percentage": 1,
+        "student_name": 1,
+        "profile_picture": 1,
+        "roll_number": 1,
+        "program": 1,
+        "semester": 1,
+        "subject_name": 1,
+        "subject_code": 1
+    }
+
+    summaries = collection.find(
+        scoped(match), projection
+    ).sort("student", 1).batch_size(max(100, limit * 10))
+
+    data = []
+    skipped = 0
+    current = None
+
+    def flush(row):
+        nonlocal skipped
+        if row is None:
+            return
+
+        #subject filter keeps only that subject, the overall stays over all defaulter subjects
+        if subject_id:
+            row["defaulter_subjects"] = [
+                sub for sub in row["defaulter_subjects"] if sub["id"] == subject_id
+            ]
 
-        pipeline.append({
-            "$addFields": {
-                "defaulter_subjects": {
-                    "$filter": {
-                        "input": "$defaulter_subjects",
-                        "as": "sub",
-                        "cond": {
-                            "$eq": ["$$sub.id", ObjectId(subject_id)]
-                        }
-                    }
-                }
+        if skipped < skip:
+            skipped += 1
+            return
+
+        overall = sum(row.pop("percentages")) / row.pop("subject_count")
+        row["overall_percentage"] = round(overall, 2)
+        row["risk"] = "HIGH" if overall < 65 else "MEDIUM"
+        data.append(row)
+
+    async for doc in summaries:
+        student_id = str(doc["student"].id)
+
+        if current is None or current["student_id"] != student_id:
+            flush(current)
+
+            if len(data) >= limit:
+                has_more = True
+                current = None
+                break
+
+            current = {
+                "student_id": student_id,
+                "profile_picture": doc.get("profile_picture"),
+                "name": doc.get("student_name"),
+                "roll": doc.get("roll_number"),
+                "program": doc.get("program"),
+                "semester": doc.get("semester"),
+                "percentages": [],
+                "subject_count": 0,
+                "defaulter_subjects": []
             }
-        })
 
-        pipeline.append({
-            "$match": {
-                "defaulter_subjects.0": {"$exists": True}
-            }
+        current["percentages"].append(doc["percentage"])
+        current["subject_count"] += 1
+        current["defaulter_subjects"].append({
+            "id": str(doc["subject"].id),
+            "name": doc.get("subject_name"),
+            "percentage": doc["percentage"],
+            "code": doc.get("subject_code")
         })
 
-    # ---------------- RISK CALCULATION ----------------
-
-    pipeline.append({
-        "$addFields": {
-            "risk": {
-                "$cond": [
-                    {"$lt": ["$overall_percentage", 65]},
-                    "HIGH",
-                    "MEDIUM"
-                ]
-            }
-        }
-    })
-
-    # ---------------- PROJECTION ----------------
-
-    pipeline.append({
-        "$project": {
-
-            "_id": 0,
-
-            "student_id": {"$toString": "$_id"},
-            "profile_picture": 1,
-            "name": 1,
-            "roll": 1,
-            "program": 1,
-            "semester": 1,
-
-            "overall_percentage": {
-                "$round": ["$overall_percentage", 2]
-            },
-
-            "defaulter_subjects": {
-                "$map": {
-                    "input": "$defaulter_subjects",
-                    "as": "s",
-                    "in": {
-                        "id": {"$toString": "$$s.id"},
-                        "name": "$$s.name",
-                        "percentage": "$$s.percentage",
-                        "code": "$$s.code"
-                    }
-                }
-            },
-
-            "risk": 1
-        }
-    })
-
-    pipeline.append({
-        "$sort": {"_id": 1}
-    })
-
-    #pagination
-    pipeline.append({
-        "$facet": {
-            "data": [
-                {"$skip": skip},
-                {"$limit": limit}
-            ],
-            "total": [
-                {"$count": "count"}
-            ]
-        }
-    })
-
-    result = await StudentAttendanceSummary.aggregate(pipeline).to_list(None)
-
-    data = result[0]["data"]
-    total = result[0]["total"][0]["count"] if result[0]["total"] else 0
+    flush(current)
 
     return JSONResponse(
         status_code=200,
@@ -260,6 +225,7 @@ async def defaulter_students(
             "page": page,
             "limit": limit,
             "total": total,
+            "next_cursor": data[-1]["student_id"] if has_more and data else None,
             "students": data
         })
-    )
\ No newline at end of file
+    )
@@ -7,12 +7,25 @@ from zoneinfo import ZoneInfo
 import hashlib
 import json
 
-from app.schemas.subject_session_stats import SubjectSessionStats
-from app.core.redis import get_redis_client
+from app.schemas.daily_attendance_rollup import DailyAttendanceRollup
+from app.utils.cache_aside import cached
+from app.utils.json_encoder import FastJSONResponse
 
 IST = ZoneInfo("Asia/Kolkata")
 
 
+def _trends_cache_key(time_range, teacher_id, program, department, semester, subject_id) -> str:
+    cache_payload = {
+        "range": time_range,
+        "teacher_id": teacher_id,
+        "program": program,
+        "department": department,
+        "semester": semester,
+        "subject_id": subject_id,
+    }
+    return f"analytics:attendance_trends:{hashlib.md5(json.dumps(cache_payload, sort_keys=True).encode()).hexdigest()}"
+
+
 async def get_attendance_trends(
     request: Request,
     time_range: Literal["week", "month"] = "week",
@@ -29,26 +42,30 @@ async def get_attendance_trends(
             status_code=403,
             content={"success": False, "message": "Access denied"}
         )
-        
-    redis = await get_redis_client()
 
-    # =========================
-    # cache key
-    # =========================
-    cache_payload = {
-        "range": time_range,
-        "teacher_id": teacher_id,
-        "program": program,
-        "department": department,
-        "semester": semester,
-        "subject_id": subject_id,
-    }
+    if time_range not in ("week", "month"):
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": "Invalid range"}
+        )
 
-    cache_key = f"analytics:attendance_trends:{hashlib.md5(json.dumps(cache_payload, sort_keys=True).encode()).hexdigest()}"
+    final_data = await _load_attendance_trends.raw(
+        time_range, teacher_id, program, department, semester, subject_id
+    )
 
-    cached = await redis.get(cache_key)
-    if cached:
-        return JSONResponse(status_code=200, content=json.loads(cached))
+    return FastJSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "message": "Attendance trends fetched successfully",
+            "data": final_data
+        }
+    )
+
+
+# cached 5 min, served stale for one more while a single request refreshes it
+@cached(key=_trends_cache_key, ttl=300, stale_ttl=120)
+async def _load_attendance_trends(time_range, teacher_id, program, department, semester, subject_id):
 
     # =========================
     # date range
@@ -59,7 +76,7 @@ async def get_attendance_trends(
         start_date = today - timedelta(days=today.weekday())
         end_date = start_date + timedelta(days=6)
 
-    elif time_range == "month":
+    else:
         start_date = today.replace(day=1)
 
         if today.month == 12:
@@ -69,12 +86,6 @@ async def get_attendance_trends(
 
         end_date = next_month - timedelta(days=1)
 
-    else:
-        return JSONResponse(
-            status_code=400,
-            content={"success": False, "message": "Invalid range"}
-        )
-
     start_dt = datetime.combine(start_date, datetime.min.time())
     end_dt = datetime.combine(end_date, datetime.max.time())
 
@@ -83,7 +94,15 @@ async def get_attendance_trends(
     }
 
     if subject_id:
-        match_stage["subject.$id"] = ObjectId(subject_id)
+        match_stage["subject_id"] = ObjectId(subject_id)
+    if teacher_id:
+        match_stage["teacher_id"] = ObjectId(teacher_id)
+    if program:
+        match_stage["program"] = program
+    if department:
+        match_stage["department"] = department
+    if semester:
+        match_stage["semester"] = semester
 
     # =========================
     # dynamic grouping
@@ -120,46 +139,30 @@ async def get_attendance_trends(
     pipeline = [
         {"$match": match_stage},
 
-        {
-            "$lookup": {
-                "from": "subjects",
-                "localField": "subject.$id",
-                "foreignField": "_id",
-                "as": "subject"
-            }
-        },
-        {"$unwind": "$subject"},
-
-        {
-            "$match": {
-                **({"subject.program": program} if program else {}),
-                **({"subject.department": department} if department else {}),
-                **({"subject.semester": semester} if semester else {}),
-                **({
-                    "subject.teacher_assigned.$id": ObjectId(teacher_id)
-                } if teacher_id else {})
-            }
-        },
-
         add_fields_stage,
 
         {
             "$group": {
                 "_id": "$group_key",
-                "avg_attendance": {"$avg": "$percentage_present"}
+                "percentage_sum": {"$sum": "$percentage_sum"},
+                "sessions": {"$sum": "$sessions"}
             }
         },
 
+        {"$match": {"sessions": {"$gt": 0}}},
+
         {
             "$project": {
                 "_id": 0,
                 "group_key": "$_id",
-                "attendance": {"$round": ["$avg_attendance", 2]}
+                "attendance": {
+                    "$round": [{"$divide": ["$percentage_sum", "$sessions"]}, 2]
+                }
             }
         }
     ]
 
-    results = await SubjectSessionStats.aggregate(pipeline).to_list()
+    results = await DailyAttendanceRollup.aggregate(pipeline).to_list()
 
     # =========================
     # formatting
@@ -193,13 +196,4 @@ async def get_attendance_trends(
             for i in range(1, 6)
         ]
 
-    response = {
-        "success": True,
-        "message": "Attendance trends fetched successfully",
-        "data": final_data
-    }
-
-    # cache (5 min)
-    await redis.set(cache_key, json.dumps(response), ex=300)
-
-    return JSONResponse(status_code=200, content=response)
\ No newline at end of file
+    return final_data
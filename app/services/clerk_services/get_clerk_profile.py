@@ -1,12 +1,12 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from app.schemas.clerk import Clerk
-from app.core.redis import get_redis_client
-import json
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import tag
+from app.utils.json_encoder import FastJSONResponse
 
 
 async def get_clerk_profile(request: Request):
-    redis = await get_redis_client()
 
     try:
 
@@ -32,25 +32,9 @@ async def get_clerk_profile(request: Request):
                 }
             )
 
-        #redis cache
-        cache_key = f"clerk:profile:{user_email}"
+        clerk_data = await _load_clerk_profile.raw(user_email, user.get("id"))
 
-        cached_data = await redis.get(cache_key)
-
-        if cached_data:
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "success": True,
-                    "message": "Clerk profile fetched successfully",
-                    "data": json.loads(cached_data)
-                }
-            )
-
-        #fetch clerk
-        clerk = await Clerk.find_one(Clerk.email == user_email)
-
-        if not clerk:
+        if not clerk_data:
             return JSONResponse(
                 status_code=404,
                 content={
@@ -59,38 +43,7 @@ async def get_clerk_profile(request: Request):
                 }
             )
 
-        #format academic scopes
-        scopes = []
-
-        if clerk.academic_scopes:
-            for scope in clerk.academic_scopes:
-                scopes.append({
-                    "program_id": scope.program_id,
-                    "department_id": scope.department_id
-                })
-
-        clerk_data = {
-            "clerk_id": str(clerk.id),
-            "first_name": clerk.first_name,
-            "middle_name": clerk.middle_name,
-            "last_name": clerk.last_name,
-            "email": clerk.email,
-            "phone": clerk.phone,
-            "profile_picture": clerk.profile_picture,
-            "profile_picture_id": clerk.profile_picture_id,
-            "academic_scopes": scopes,
-            "created_at": clerk.created_at.isoformat() if clerk.created_at else None,
-            "updated_at": clerk.updated_at.isoformat() if clerk.updated_at else None
-        }
-
-        #save cache
-        await redis.setex(
-            cache_key,
-            3600,
-            json.dumps(clerk_data)
-        )
-
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -109,4 +62,42 @@ async def get_clerk_profile(request: Request):
                 "success": False,
                 "message": "Internal server error while fetching profile"
             }
-        )
\ No newline at end of file
+        )
+
+
+@cached(
+    key=lambda user_email, _: f"clerk:profile:{user_email}",
+    ttl=3600,
+    tags=lambda _, clerk_id: [tag("clerk", clerk_id)]
+)
+async def _load_clerk_profile(user_email: str, clerk_id: str):
+
+    #fetch clerk
+    clerk = await Clerk.find_one(Clerk.email == user_email)
+
+    if not clerk:
+        return None
+
+    #format academic scopes
+    scopes = []
+
+    if clerk.academic_scopes:
+        for scope in clerk.academic_scopes:
+            scopes.append({
+                "program_id": scope.program_id,
+                "department_id": scope.department_id
+            })
+
+    return {
+        "clerk_id": str(clerk.id),
+        "first_name": clerk.first_name,
+        "middle_name": clerk.middle_name,
+        "last_name": clerk.last_name,
+        "email": clerk.email,
+        "phone": clerk.phone,
+        "profile_picture": clerk.profile_picture,
+        "profile_picture_id": clerk.profile_picture_id,
+        "academic_scopes": scopes,
+        "created_at": clerk.created_at.isoformat() if clerk.created_at else None,
+        "updated_at": clerk.updated_at.isoformat() if clerk.updated_at else None
+    }
@@ -7,6 +7,7 @@ from datetime import datetime
 import json
 
 from app.core.redis import get_redis_client
+from app.utils.cache_tags import cache_set, tag
 from app.schemas.subject import Subject
 from app.models.allModel import SubjectShortView
 
@@ -324,10 +325,11 @@ async def get_assignable_subjects(request: Request):
     ]
 
     # cache it
-    await redis.setex(
+    await cache_set(
         cache_key,
+        json.dumps(response, cls=MongoJSONEncoder),
         300,
-        json.dumps(response, cls=MongoJSONEncoder)
+        tags=[tag("scope", d, p) for d, p in zip(department_ids, program_ids)]
     )
 
     return JSONResponse(
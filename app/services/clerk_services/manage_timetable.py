@@ -8,7 +8,7 @@ from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from typing import Dict, List
 from beanie.odm.fields import PydanticObjectId
-from app.utils.redis_key_deletion import invalidate_redis_keys
+from app.utils.cache_tags import emit
 
 async def add_timetable(request: Request, request_model: TimeTableRequest) -> dict:
     try:
@@ -33,6 +33,8 @@ async def add_timetable(request: Request, request_model: TimeTableRequest) -> di
                 }
             )
 
+        created_sessions: List[Session] = []
+
         for day, entries in request_model.schedule.items():
             # Skip days with no entries (e.g., weekends)
             if not entries:
@@ -136,6 +138,7 @@ async def add_timetable(request: Request, request_model: TimeTableRequest) -> di
                             }
                         )
                     session_links.append(session.id)
+                    created_sessions.append(session)
                 except Exception as e:
                     return JSONResponse(
                         status_code=500,
@@ -145,7 +148,7 @@ async def add_timetable(request: Request, request_model: TimeTableRequest) -> di
                         }
                     )
                     
-        await invalidate_redis_keys("timetable:*")
+        await emit("timetable.changed", sessions=created_sessions)
 
         return JSONResponse(
             status_code=201,
@@ -182,6 +185,7 @@ async def update_timetable(request: Request, request_model: UpdateTimeTableReque
         updates = request_model.updates or []
         adds = request_model.adds or []
         deletes = request_model.deletes or []
+        changed_sessions = []
 
         # ------------------ DELETE ------------------
         for session_id in deletes:
@@ -191,6 +195,7 @@ async def update_timetable(request: Request, request_model: UpdateTimeTableReque
                 session.deleted_by = request.state.user.id
                 session.updated_at = datetime.utcnow()
                 await session.save()
+                changed_sessions.append(session)
 
         # ------------------ UPDATE ------------------
         for item in updates:
@@ -258,6 +263,7 @@ async def update_timetable(request: Request, request_model: UpdateTimeTableReque
 
             await new_session.insert()
             await old_session.save()
+            changed_sessions += [old_session, new_session]
 
         # ------------------ ADD ------------------
         for item in adds:
@@ -307,8 +313,9 @@ async def update_timetable(request: Request, request_model: UpdateTimeTableReque
             )
 
             await new_session.insert()
+            changed_sessions.append(new_session)
 
-        await invalidate_redis_keys("timetable:*")
+        await emit("timetable.changed", sessions=changed_sessions)
 
         return JSONResponse(
             status_code=200,
@@ -5,7 +5,7 @@ from pydantic import ValidationError
 from datetime import datetime
 import base64
 from app.schemas.clerk import Clerk  
-from app.core.redis import get_redis_client
+from app.utils.cache_tags import emit
 from app.core.config import settings  
 from app.models.allModel import UpdateClerkRequest
 from app.utils.imagekit_uploader import upload_file_to_imagekit, delete_file
@@ -17,8 +17,6 @@ async def update_clerk(request: Request, request_data: UpdateClerkRequest, profi
     
     print(f"Starting update_clerk for email: {user_email}")
     
-    redis = await get_redis_client()
-
     # Validate user role
     if user_role != "clerk":
         print(f"Unauthorized update attempt by role: {user_role}")
@@ -121,9 +119,7 @@ async def update_clerk(request: Request, request_data: UpdateClerkRequest, profi
             print("Clerk document updated successfully.")
 
             # Clear relevant caches
-            cache_key_clerk = f"clerk:{clerk_email}"
-            await redis.delete(cache_key_clerk)
-            print(f"Deleted cache key: {cache_key_clerk}")
+            await emit("clerk.updated", clerk_id=clerk.id)
 
           
         else:
@@ -5,12 +5,14 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from app.schemas.attendance import Attendance
 import logging
-from beanie.operators import And, In
+from beanie.operators import In
 from typing import List, Optional
 
 from app.schemas.subject import Subject
 from app.schemas.subject_session_stats import SubjectSessionStats
+from app.schemas.teacher import Teacher
 from app.utils.parse_data import to_ist
+from app.utils.attendance_bits import get_bit
 
 logger = logging.getLogger("attendance_api")
 if not logger.handlers:
@@ -73,12 +75,18 @@ async def student_attendance_history(
     start_date = datetime(year, month, 1)
     end_date = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
 
-    # ---------------- SESSION FILTER ----------------
-    session_match = {
-        "session_data.program": program,
-        "session_data.department": department,
-        "session_data.semester": semester,
-        "session_data.academic_year": batch_year,
+    # ---------------- CLASS + DATE FILTER ----------------
+    # denormalized attendance fields, served by the
+    # (department, program, semester, academic_year, effective_date) index
+    attendance_match = {
+        "department": department,
+        "program": program,
+        "semester": semester,
+        "academic_year": batch_year,
+        "effective_date": {
+            "$gte": start_date,
+            "$lt": end_date
+        }
     }
 
     # Handle single subject or list of subjects
@@ -92,41 +100,26 @@ async def student_attendance_history(
         
         if subject_ids:
             if len(subject_ids) == 1:
-                session_match["session_data.subject.$id"] = subject_ids[0]
+                attendance_match["subject_id"] = subject_ids[0]
             else:
-                session_match["session_data.subject.$id"] = {"$in": subject_ids}
+                attendance_match["subject_id"] = {"$in": subject_ids}
 
     # ---------------- AGGREGATION PIPELINE ----------------
     pipeline = [
-        # 1️⃣ Exception session
-        {
-            "$lookup": {
-                "from": "exception_sessions",
-                "localField": "exception_session.$id",
-                "foreignField": "_id",
-                "as": "exception"
-            }
-        },
-        {
-            "$unwind": {
-                "path": "$exception",
-                "preserveNullAndEmptyArrays": True
-            }
-        },
+        # 1️⃣ One student's month, straight off the index
+        {"$match": attendance_match},
 
-        # 2️⃣ Effective date
+        # 2️⃣ Only what the response needs
         {
-            "$addFields": {
-                "effective_date": {
-                    "$cond": [
-                        {"$ifNull": ["$exception", False]},
-                        "$exception.date",
-                        "$date"
-                    ]
-                },
+            "$project": {
+                "effective_date": 1,
+                "subject_id": 1,
+                "students": 1,
+                "actual_start_time": "$start_time",
+                "actual_end_time": "$end_time",
                 "is_exception_session": {
                     "$cond": [
-                        {"$ifNull": ["$exception", False]},
+                        {"$ifNull": ["$exception_session", False]},
                         True,
                         False
                     ]
@@ -134,84 +127,19 @@ async def student_attendance_history(
             }
         },
 
-        # 3️⃣ Date filter
-        {
-            "$match": {
-                "effective_date": {
-                    "$gte": start_date,
-                    "$lt": end_date
-                }
-            }
-        },
-
-        # 4️⃣ Base session
-        {
-            "$addFields": {
-                "base_session_id": {
-                    "$cond": [
-                        {"$ifNull": ["$session", False]},
-                        "$session.$id",
-                        "$exception.session.$id"
-                    ]
-                }
-            }
-        },
-
-        # 5️⃣ Join sessions
-        {
-            "$lookup": {
-                "from": "sessions",
-                "localField": "base_session_id",
-                "foreignField": "_id",
-                "as": "session_data"
-            }
-        },
-        {"$unwind": "$session_data"},
-
-        # 6️⃣ Student eligibility + subject
-        {"$match": session_match},
-
-        # 7️⃣ Actual timings
-        {
-            "$addFields": {
-                "actual_start_time": {
-                    "$cond": [
-                        {"$ifNull": ["$exception.start_time", False]},
-                        "$exception.start_time",
-                        "$session_data.start_time"
-                    ]
-                },
-                "actual_end_time": {
-                    "$cond": [
-                        {"$ifNull": ["$exception.end_time", False]},
-                        "$exception.end_time",
-                        "$session_data.end_time"
-                    ]
-                }
-            }
-        },
-
-        # 8️⃣ Join subject
+        # 3️⃣ Join subject
         {
             "$lookup": {
                 "from": "subjects",
-                "localField": "session_data.subject.$id",
+                "localField": "subject_id",
                 "foreignField": "_id",
+                "pipeline": [{"$project": {"subject_name": 1, "component": 1}}],
                 "as": "subject_data"
             }
         },
         {"$unwind": "$subject_data"},
 
-        # 9️⃣ INTERNAL GROUP (dedup safety)
-        {
-            "$group": {
-                "_id": "$_id",
-                "doc": {"$first": "$$ROOT"}
-            }
-        },
-        {"$replaceRoot": {"newRoot": "$doc"}},
-
-        # 🔟 Sort
+        # 4️⃣ Sort
         {
             "$sort": {
                 "effective_date": 1,
@@ -229,10 +157,7 @@ async def student_attendance_history(
         subject_data = a.get("subject_data")
         subject_name = subject_data.get("subject_name") if subject_data else "Unknown"
 
-        students_str = a.get("students", "")
-        present = (
-            len(students_str) > bit_index and students_str[bit_index] == "1"
-        )
+        present = get_bit(a.get("students"), bit_index)
 
         ist_date = to_ist(a["effective_date"])
         
@@ -292,10 +217,9 @@ async def teacher_attendance_history(
     )
 
     # BASE QUERY
-    query = [
-        SubjectSessionStats.date >= start_date,
-        SubjectSessionStats.date < end_date
-    ]
+    match = {
+        "date": {"$gte": start_date, "$lt": end_date}
+    }
 
     # SUBJECT FILTER + TEACHER ASSIGNMENT CHECK
     if subject:
@@ -334,19 +258,27 @@ async def teacher_attendance_history(
                 }
             )
 
-        # Now safe to filter stats by these subjects
-        if len(subject_ids) == 1:
-            query.append(SubjectSessionStats.subject.id == subject_ids[0])
-        else:
-            query.append(In(SubjectSessionStats.subject.id, subject_ids))
+        # Now safe to filter stats by these subjects; matched as whole DBRefs
+        # so the (subject, date) index applies
+        match["subject"] = {"$in": [DBRef("subjects", sub_id) for sub_id in subject_ids]}
 
-    logger.info(f"Final Query → {query}")
+    logger.info(f"Final Query → {match}")
 
-    # FETCH
-    stats_docs = await SubjectSessionStats.find(
-        And(*query),
-        fetch_links=True
-    ).sort(SubjectSessionStats.date).to_list()
+    # FETCH (filter first, join only the matched stats)
+    stats_docs = await SubjectSessionStats.aggregate([
+        {"$match": match},
+        {"$sort": {"date": 1}},
+        {
+            "$lookup": {
+                "from": "subjects",
+                "localField": "subject.$id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"subject_name": 1, "component": 1}}],
+                "as": "subject_data"
+            }
+        },
+        {"$unwind": "$subject_data"}
+    ]).to_list()
 
     logger.info(f"Found {len(stats_docs)} records")
 
@@ -354,14 +286,14 @@ async def teacher_attendance_history(
     records = []
     for stat in stats_docs:
         records.append({
-            "attendance_id": str(stat.session_id.id),
-            "date": stat.date.date().isoformat(),
-            "day": stat.date.strftime("%A"),
-            "subject": stat.subject.subject_name,
-            "component": stat.subject.component,
-            "present_count": stat.present_count,
-            "absent_count": stat.absent_count,
-            "attendance_percentage": stat.percentage_present
+            "attendance_id": str(stat["session_id"].id),
+            "date": stat["date"].date().isoformat(),
+            "day": stat["date"].strftime("%A"),
+            "subject": stat["subject_data"]["subject_name"],
+            "component": stat["subject_data"]["component"],
+            "present_count": stat["present_count"],
+            "absent_count": stat["absent_count"],
+            "attendance_percentage": stat["percentage_present"]
         })
 
     return {
@@ -400,56 +332,23 @@ async def clerk_attendance_history(
         else datetime(year, month + 1, 1, tzinfo=timezone.utc)
     )
 
-    # ---------------- AGGREGATION PIPELINE ----------------
-
-    pipeline = [
-
-        {
-            "$match": {
-                "date": {
-                    "$gte": start_date,
-                    "$lt": end_date
-                }
-            }
-        },
-
-        {
-            "$lookup": {
-                "from": "subjects",
-                "localField": "subject.$id",
-                "foreignField": "_id",
-                "as": "subject_data"
-            }
-        },
-
-        {
-            "$unwind": "$subject_data"
-        }
-    ]
+    # ---------------- SUBJECT RESOLUTION ----------------
+    # Resolve the clerk's scope and filters against the (small) subjects
+    # collection first, so the stats query is an index range on
+    # (subject, date) instead of a join over the whole month.
 
-    # ---------------- CLERK SCOPE FILTER ----------------
+    subject_query = {}
 
     scopes = user.get("academic_scopes", [])
 
     if scopes:
-
-        scope_conditions = []
-
-        for scope in scopes:
-            scope_conditions.append({
-                "subject_data.program": scope["program_id"],
-                "subject_data.department": scope["department_id"]
-            })
-
-        pipeline.append({
-            "$match": {
-                "$or": scope_conditions
+        subject_query["$or"] = [
+            {
+                "program": scope["program_id"],
+                "department": scope["department_id"]
             }
-        })
-
-    # ---------------- OPTIONAL FILTERS ----------------
-
-    match_stage = {}
+            for scope in scopes
+        ]
 
     # Subject filter
     if subject:
@@ -461,21 +360,21 @@ async def clerk_attendance_history(
         ]
 
         if subject_ids:
-            match_stage["subject_data._id"] = (
+            subject_query["_id"] = (
                 subject_ids[0] if len(subject_ids) == 1
                 else {"$in": subject_ids}
             )
 
     # Program filter
     if program:
-        match_stage["subject_data.program"] = (
+        subject_query["program"] = (
             program[0] if len(program) == 1
             else {"$in": program}
         )
 
     # Department filter
     if department:
-        match_stage["subject_data.department"] = (
+        subject_query["department"] = (
             department[0] if len(department) == 1
             else {"$in": department}
         )
@@ -484,47 +383,73 @@ async def clerk_attendance_history(
     if batch_year:
         years_str = [str(y) for y in batch_year]
 
-        match_stage["subject_data.academic_year"] = (
+        subject_query["academic_year"] = (
             years_str[0] if len(years_str) == 1
             else {"$in": years_str}
         )
 
     # Semester filter
     if semester:
-        match_stage["subject_data.semester"] = (
+        subject_query["semester"] = (
             semester[0] if len(semester) == 1
             else {"$in": semester}
         )
 
-    if match_stage:
-        pipeline.append({"$match": match_stage})
+    subjects = await Subject.get_motor_collection().find(
+        subject_query,
+        {"subject_name": 1, "semester": 1, "component": 1, "teacher_assigned": 1}
+    ).to_list(length=None)
 
-    # ---------------- JOIN TEACHER ----------------
+    subjects_by_id = {sub["_id"]: sub for sub in subjects}
 
-    pipeline.extend([
+    # ---------------- AGGREGATION PIPELINE ----------------
 
-        {
-            "$lookup": {
-                "from": "teachers",
-                "localField": "subject_data.teacher_assigned.$id",
-                "foreignField": "_id",
-                "as": "teacher_data"
-            }
-        },
+    pipeline = [
 
         {
-            "$unwind": "$teacher_data"
+            "$match": {
+                "subject": {
+                    "$in": [DBRef("subjects", sub_id) for sub_id in subjects_by_id]
+                },
+                "date": {
+                    "$gte": start_date,
+                    "$lt": end_date
+                }
+            }
         },
 
         {
             "$sort": {"date": 1}
         }
-
-    ])
+    ]
 
     # ---------------- EXECUTE PIPELINE ----------------
 
-    stats_docs = await SubjectSessionStats.aggregate(pipeline).to_list()
+    stats_docs = await SubjectSessionStats.aggregate(pipeline).to_list() if subjects_by_id else []
+
+    # ---------------- JOIN TEACHER ----------------
+
+    teacher_ids = {
+        sub["teacher_assigned"].id
+        for sub in subjects
+        if sub.get("teacher_assigned")
+    }
+
+    teachers = await Teacher.get_motor_collection().find(
+        {"_id": {"$in": list(teacher_ids)}},
+        {"first_name": 1, "last_name": 1}
+    ).to_list(length=None)
+
+    teachers_by_id = {t["_id"]: t for t in teachers}
+
+    for stat in stats_docs:
+        stat["subject_data"] = subjects_by_id[stat["subject"].id]
+
+        teacher_ref = stat["subject_data"].get("teacher_assigned")
+        stat["teacher_data"] = teachers_by_id.get(teacher_ref.id) if teacher_ref else None
+
+    # subjects without an assigned teacher are left out
+    stats_docs = [stat for stat in stats_docs if stat["teacher_data"]]
 
     # ---------------- BUILD RESPONSE ----------------
 
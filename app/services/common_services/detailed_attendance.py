@@ -9,6 +9,7 @@ from app.schemas.exception_session import ExceptionSession
 from app.schemas.subject import Subject
 from app.schemas.teacher import Teacher
 from app.schemas.student import Student
+from app.utils.attendance_bits import get_bit
 
 
 async def get_attendance_by_id(request: Request, attendance_id: str):
@@ -81,13 +82,11 @@ async def get_attendance_by_id(request: Request, attendance_id: str):
         Student.batch_year == int(session.academic_year),
     ).project(StudentListingView).sort("roll_number").to_list()
 
-    bitmask = attendance.students or ""
-
     present = []
     absent = []
 
     for idx, student in enumerate(students):
-        is_present = idx < len(bitmask) and bitmask[idx] == "1"
+        is_present = idx < attendance.total and get_bit(attendance.students, idx)
 
         data = {
             "id": str(student.student_id),
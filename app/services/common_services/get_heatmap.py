@@ -2,11 +2,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from app.schemas.subject_session_stats import SubjectSessionStats
-import json
+from app.schemas.daily_attendance_rollup import DailyAttendanceRollup
 import logging
 
-from app.utils.json_encoder import JSONEncoder as MongoJSONEncoder
+from app.utils.json_encoder import FastJSONResponse
 
 
 
@@ -29,50 +28,39 @@ async def get_heatmap(
         start_date = datetime(year, month, 1)
         end_date = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
 
-        # base filter
+        # base filter (pre-aggregated rows, no joins)
         match_filter: Dict[str, Any] = {"date": {"$gte": start_date, "$lt": end_date}}
 
-        # aggregation pipeline
-        date_pipeline = [
-            {"$match": match_filter},
-            {
-                "$lookup": {
-                    "from": "subjects",
-                    "localField": "subject.$id",
-                    "foreignField": "_id",
-                    "as": "subject_data"
-                }
-            },
-            {"$unwind": "$subject_data"},
-        ]
-
         # dynamic filters
-        subject_conditions = {}
         if department:
-            subject_conditions["subject_data.department"] = department
+            match_filter["department"] = department
         if program:
-            subject_conditions["subject_data.program"] = program
+            match_filter["program"] = program
         if semester:
-            subject_conditions["subject_data.semester"] = semester
-
-        if subject_conditions:
-            date_pipeline.append({"$match": subject_conditions})
+            match_filter["semester"] = semester
 
         # grouping and sorting
-        date_pipeline.extend([
+        date_pipeline = [
+            {"$match": match_filter},
             {
                 "$group": {
                     "_id": "$date",
-                    "average_attendance": {"$avg": "$percentage_present"},
-                    "total_sessions": {"$sum": 1}
+                    "percentage_sum": {"$sum": "$percentage_sum"},
+                    "total_sessions": {"$sum": "$sessions"}
+                }
+            },
+            {"$match": {"total_sessions": {"$gt": 0}}},
+            {
+                "$addFields": {
+                    "average_attendance": {"$divide": ["$percentage_sum", "$total_sessions"]}
                 }
             },
             {"$sort": {"_id": 1}}
-        ])
+        ]
 
         # execute aggregation
-        logging.info(f"🔥 Running aggregation pipeline with filters: {subject_conditions}")
-        date_results = await SubjectSessionStats.aggregate(date_pipeline).to_list(length=None)
+        logging.info(f"🔥 Running aggregation pipeline with filters: {match_filter}")
+        date_results = await DailyAttendanceRollup.aggregate(date_pipeline).to_list(length=None)
 
         if not date_results:
             response_content = {
@@ -95,11 +83,11 @@ async def get_heatmap(
         response_content = {
             "success": True,
             "message": "Average attendance fetched successfully.",
-            "data": json.loads(json.dumps(response_data, cls=MongoJSONEncoder)),
+            "data": response_data,
         }
 
         logging.info(f"✅ Success: fetched {len(response_data)} days of heatmap data.")
-        return JSONResponse(status_code=200, content=response_content)
+        return FastJSONResponse(status_code=200, content=response_content)
 
     except Exception as e:
         logging.exception(f"💥 Error in get_heatmap: {e}")
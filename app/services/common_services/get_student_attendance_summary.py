@@ -2,24 +2,15 @@ from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from typing import Dict, Any, Optional
 from bson import ObjectId
-import json, logging
-from datetime import datetime
+import logging
 
-from app.core.redis import get_redis_client
+from app.utils.cache_aside import cached
+from app.utils.json_encoder import FastJSONResponse
 from app.schemas.student_attendance_summary import StudentAttendanceSummary
 from app.schemas.subject import Subject         
 from app.schemas.student import Student
 from app.utils.parse_data import validate_student_academic         
 
-# Custom JSON encoder for MongoDB types
-class MongoJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
 
 # Endpoint
 async def get_student_attendance_summary(
@@ -40,8 +31,7 @@ async def get_student_attendance_summary(
                 "message": f"Access denied. Role '{user_role}' not authorized to view attendance summaries"
             },
         )
-        
-    redis = await get_redis_client()
+
 
     # 1. Resolve the target student_id
     if user_role == "student":
@@ -60,163 +50,28 @@ async def get_student_attendance_summary(
         print(f"{user_role.capitalize()} fetching attendance for student → {student_id}")
 
 
-    # 2. Redis cache
-    cache_key = f"student_attendance_summary:{student_id}:{user_role}"
-    cached_data = await redis.get(cache_key)
-
-    if cached_data:
-        try:
-            cached_json = json.loads(cached_data)
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "success": True,
-                    "message": "Student attendance fetched successfully",
-                    "data": cached_json,
-                    "source": "cache",
-                },
-            )
-        except json.JSONDecodeError:
-            await redis.delete(cache_key)
-            logging.warning(f"Invalid cache data for key: {cache_key}, cleared.")
-
-
-    # 3. DB work
-    try:
-        
-        # 3.1 Get the student document (need program + semester)
-        student_doc = await Student.find_one(
-            Student.id == ObjectId(student_id)
-        )
-        if not student_doc:
-            raise HTTPException(
-                status_code=404,
-                detail={"success": False, "message": "Student not found"}
-            )
-
-        # For non-student callers we still need program/semester → fall back to request user
-        prog = getattr(student_doc, "program", program)
-        sem = getattr(student_doc, "semester", semester)
+    missing = validate_student_academic(user)
 
-        missing = validate_student_academic(user)
-        
-        if missing:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "success": False,
-                    "message": "Student academic details are incomplete",
-                    "missing_fields": missing
-                }
-            )
-
-        
-        # 3.2 Fetch **ALL** subjects for this program + semester
-        all_subjects = await Subject.find(
-            Subject.program == prog,
-            Subject.semester == sem
-        ).to_list()
-
-        if not all_subjects:
-            raise HTTPException(
-                status_code=404,
-                detail={"success": False, "message": "No subjects defined for this program/semester"}
-            )
-
-        # 3.3 Fetch existing attendance summaries (if any)
-        summaries = await StudentAttendanceSummary.find(
-            StudentAttendanceSummary.student.id == ObjectId(student_id),
-            fetch_links=True,
-        ).to_list()
-
-        # Build a quick lookup: subject_id → summary
-        summary_map: Dict[str, StudentAttendanceSummary] = {
-            str(s.subject.id): s for s in summaries if getattr(s, "subject", None)
-        }
-
-
-        # 3.4 Build the response list
-        result = []
-        total_classes = total_attended = 0
-        lab_total = lab_attended = 0
-        lecture_total = lecture_attended = 0
-
-        for subj in all_subjects:
-            subj_id = str(subj.id)
-            component = getattr(subj, "component", "Lecture")
-
-            # Use summary if exists, otherwise zeros
-            if subj_id in summary_map:
-                summ = summary_map[subj_id]
-                total = summ.total_classes or 0
-                attended = summ.attended or 0
-                perc = round(summ.percentage, 2) if summ.percentage is not None else 0.0
-            else:
-                total = attended = 0
-                perc = 0.0
-
-            entry = {
-                "subject_name": getattr(subj, "subject_name", "Unknown Subject"),
-                "component": component,
-                "total_classes": total,
-                "attended": attended,
-                "percentage": perc,
+    if missing:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "message": "Student academic details are incomplete",
+                "missing_fields": missing
             }
-            result.append(entry)
-
-            # aggregate totals
-            total_classes += total
-            total_attended += attended
-            if component == "Lab":
-                lab_total += total
-                lab_attended += attended
-            elif component == "Lecture":
-                lecture_total += total
-                lecture_attended += attended
-
-        
-        # 3.5 Final percentages
-        overall_percentage = (
-            round((total_attended / total_classes * 100), 2) if total_classes > 0 else 0.0
         )
-        lab_percentage = (
-            round((lab_attended / lab_total * 100), 2) if lab_total > 0 else 0.0
-        )
-        lecture_percentage = (
-            round((lecture_attended / lecture_total * 100), 2) if lecture_total > 0 else 0.0
-        )
-
-        data = {
-            "attendances": result,
-            "total_classes": total_classes,
-            "total_attended": total_attended,
-            "overall_percentage": overall_percentage,
-            "lab": {
-                "total": lab_total,
-                "attended": lab_attended,
-                "percentage": lab_percentage,
-            },
-            "lecture": {
-                "total": lecture_total,
-                "attended": lecture_attended,
-                "percentage": lecture_percentage,
-            },
-        }
 
-        # 3.6 Cache for 30 min
-        await redis.setex(
-            cache_key,
-            1800,
-            json.dumps(data, cls=MongoJSONEncoder),
-        )
+    # 2. Cached summary (30 min, one rebuild per expiry)
+    try:
+        data = await _load_attendance_summary.raw(student_id, user_role, program, semester)
 
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "message": "Student attendance fetched successfully",
                 "data": data,
-                "source": "database",
             },
         )
 
@@ -231,4 +86,121 @@ async def get_student_attendance_summary(
                 "success": False,
                 "message": "Failed to fetch attendance summary due to server error",
             },
-        )
\ No newline at end of file
+        )
+
+
+@cached(
+    key=lambda student_id, user_role, *_: f"student_attendance_summary:{student_id}:{user_role}",
+    ttl=1800,
+    stale_ttl=300
+)
+async def _load_attendance_summary(student_id: str, user_role: str, program, semester) -> Dict[str, Any]:
+
+    # 3. DB work
+    # 3.1 Get the student document (need program + semester)
+    student_doc = await Student.find_one(
+        Student.id == ObjectId(student_id)
+    )
+    if not student_doc:
+        raise HTTPException(
+            status_code=404,
+            detail={"success": False, "message": "Student not found"}
+        )
+
+    # For non-student callers we still need program/semester → fall back to request user
+    prog = getattr(student_doc, "program", program)
+    sem = getattr(student_doc, "semester", semester)
+
+    # 3.2 Fetch **ALL** subjects for this program + semester
+    all_subjects = await Subject.find(
+        Subject.program == prog,
+        Subject.semester == sem
+    ).to_list()
+
+    if not all_subjects:
+        raise HTTPException(
+            status_code=404,
+            detail={"success": False, "message": "No subjects defined for this program/semester"}
+        )
+
+    # 3.3 Fetch existing attendance summaries (if any)
+    summaries = await StudentAttendanceSummary.find(
+        StudentAttendanceSummary.student.id == ObjectId(student_id),
+        fetch_links=True,
+    ).to_list()
+
+    # Build a quick lookup: subject_id → summary
+    summary_map: Dict[str, StudentAttendanceSummary] = {
+        str(s.subject.id): s for s in summaries if getattr(s, "subject", None)
+    }
+
+
+    # 3.4 Build the response list
+    result = []
+    total_classes = total_attended = 0
+    lab_total = lab_attended = 0
+    lecture_total = lecture_attended = 0
+
+    for subj in all_subjects:
+        subj_id = str(subj.id)
+        component = getattr(subj, "component", "Lecture")
+
+        # Use summary if exists, otherwise zeros
+        if subj_id in summary_map:
+            summ = summary_map[subj_id]
+            total = summ.total_classes or 0
+            attended = summ.attended or 0
+            perc = round(summ.percentage, 2) if summ.percentage is not None else 0.0
+        else:
+            total = attended = 0
+            perc = 0.0
+
+        entry = {
+            "subject_name": getattr(subj, "subject_name", "Unknown Subject"),
+            "component": component,
+            "total_classes": total,
+            "attended": attended,
+            "percentage": perc,
+        }
+        result.append(entry)
+
+        # aggregate totals
+        total_classes += total
+        total_attended += attended
+        if component == "Lab":
+            lab_total += total
+            lab_attended += attended
+        elif component == "Lecture":
+            lecture_total += total
+            lecture_attended += attended
+
+    
+    # 3.5 Final percentages
+    overall_percentage = (
+        round((total_attended / total_classes * 100), 2) if total_classes > 0 else 0.0
+    )
+    lab_percentage = (
+        round((lab_attended / lab_total * 100), 2) if lab_total > 0 else 0.0
+    )
+    lecture_percentage = (
+        round((lecture_attended / lecture_total * 100), 2) if lecture_total > 0 else 0.0
+    )
+
+    data = {
+        "attendances": result,
+        "total_classes": total_classes,
+        "total_attended": total_attended,
+        "overall_percentage": overall_percentage,
+        "lab": {
+            "total": lab_total,
+            "attended": lab_attended,
+            "percentage": lab_percentage,
+        },
+        "lecture": {
+            "total": lecture_total,
+            "attended": lecture_attended,
+            "percentage": lecture_percentage,
+        },
+    }
+
+    return data
@@ -1,7 +1,7 @@
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from app.core.redis import get_redis_client
-from bson import ObjectId
+from bson import DBRef, ObjectId
 import json
 import logging
 from datetime import datetime
@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional
 
 from app.schemas.student_attendance_summary import StudentAttendanceSummary
 from app.schemas.attendance import Attendance
+from app.schemas.subject import Subject
 
 
 # JSON encoder to handle ObjectId and datetime
@@ -21,6 +22,19 @@ class MongoJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def month_filter(month: Optional[int], year: Optional[int]) -> Dict[str, Any]:
+    """Attendance.date condition for the selected month / year (either may be missing)."""
+    if year and month:
+        start = datetime(year, month, 1)
+        end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return {"date": {"$gte": start, "$lt": end}}
+    if year:
+        return {"date": {"$gte": datetime(year, 1, 1), "$lt": datetime(year + 1, 1, 1)}}
+    if month:
+        return {"$expr": {"$eq": [{"$month": "$date"}, month]}}
+    return {}
+
+
 async def get_student_subject_wise(
     
     request : Request,
@@ -67,10 +81,13 @@ async def get_student_subject_wise(
             await redis.delete(cache_key)
 
     try:
-        summary = await StudentAttendanceSummary.find_one(
-            StudentAttendanceSummary.student.id == ObjectId(target_id),
-            StudentAttendanceSummary.subject.id == ObjectId(subject_id),
-            fetch_links=True
+        # 1: the summary, only the present attendance ids
+        summary = await StudentAttendanceSummary.get_motor_collection().find_one(
+            {
+                "student": DBRef("students", ObjectId(target_id)),
+                "subject": DBRef("subjects", ObjectId(subject_id))
+            },
+            {"sessions_present": 1}
         )
 
         if not summary:
@@ -90,58 +107,47 @@ async def get_student_subject_wise(
                             },
                             "source": "database"
             })
-            
 
-        # --- Filter helper based on month & year ---
-        def in_selected_month(date_obj: Optional[datetime]) -> bool:
-            if not date_obj:
-                return False
-            if month and date_obj.month != month:
-                return False
-            if year and date_obj.year != year:
-                return False
-            return True
-
-        # --- Present Sessions ---
-        present_sessions = []
-        if summary.sessions_present:
-            for dbref in summary.sessions_present:
-                attendance = await Attendance.get(ObjectId(dbref.id), fetch_links=True)
-                if attendance and attendance.session:
-                    if in_selected_month(attendance.date):
-                        session = attendance.session
-                        present_sessions.append({
-                            "attendance_id": str(attendance.id),
-                            "date": attendance.date.isoformat() if attendance.date else None,
-                            "day": session.day if session else None,
-                            "session_id": str(session.id) if session else None,
-                            "start_time": session.start_time if session else None,
-                            "end_time": session.end_time if session else None,
-                            "type": "present"
-                        })
-
-        # --- Absent Sessions ---
-        all_attendances = await Attendance.find(
-            Attendance.session.subject.id == summary.subject.id,
-            fetch_links=True
-        ).to_list()
+        present_ids = {ref.id for ref in summary.get("sessions_present") or []}
+
+        # 2: subject name / component
+        subject = await Subject.get(ObjectId(subject_id))
+
+        # 3: every attendance of the subject in the selected month, with
+        # the session timings joined in
+        attendances = await Attendance.aggregate([
+            {"$match": {
+                "subject_id": ObjectId(subject_id),
+                "session": {"$ne": None},
+                **month_filter(month, year)
+            }},
+            {"$sort": {"date": 1}},
+            {"$project": {"date": 1, "session_id": "$session.$id"}},
+            {"$lookup": {
+                "from": "sessions",
+                "localField": "session_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"day": 1, "start_time": 1, "end_time": 1}}],
+                "as": "session"
+            }},
+            {"$unwind": "$session"}
+        ]).to_list()
 
+        present_sessions = []
         absent_sessions = []
-        present_ids = {p["attendance_id"] for p in present_sessions}
-
-        for att in all_attendances:
-            if str(att.id) not in present_ids and att.session:
-                if in_selected_month(att.date):
-                    session = att.session
-                    absent_sessions.append({
-                        "attendance_id": str(att.id),
-                        "date": att.date.isoformat() if att.date else None,
-                        "day": session.day if session else None,
-                        "session_id": str(session.id) if session else None,
-                        "start_time": session.start_time if session else None,
-                        "end_time": session.end_time if session else None,
-                        "type": "absent"
-                    })
+
+        for att in attendances:
+            session = att["session"]
+            is_present = att["_id"] in present_ids
+            (present_sessions if is_present else absent_sessions).append({
+                "attendance_id": str(att["_id"]),
+                "date": att["date"].isoformat() if att.get("date") else None,
+                "day": session.get("day"),
+                "session_id": str(session["_id"]),
+                "start_time": session.get("start_time"),
+                "end_time": session.get("end_time"),
+                "type": "present" if is_present else "absent"
+            })
 
         # --- Summary ---
         total_classes = len(present_sessions) + len(absent_sessions)
@@ -149,9 +155,9 @@ async def get_student_subject_wise(
         percentage = round((attended / total_classes) * 100, 2) if total_classes > 0 else 0
 
         result = {
-            "subject_id": str(summary.subject.id),
-            "subject_name": summary.subject.subject_name if summary.subject else "Unknown",
-            "component": summary.subject.component if summary.subject else None,
+            "subject_id": subject_id,
+            "subject_name": subject.subject_name if subject else "Unknown",
+            "component": subject.component if subject else None,
             "total_classes": total_classes,
             "attended": attended,
             "percentage": percentage,
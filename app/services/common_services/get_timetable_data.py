@@ -3,7 +3,10 @@ from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from app.schemas.session import Session
 from app.models.allModel import TimeTableResponse, SessionShortView, DaySchedule
-from app.core.redis import get_redis_client
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import class_tag
+from app.utils.json_encoder import FastJSONResponse
+from app.utils.link_loader import load_links
 import json
 import logging
 from datetime import datetime
@@ -23,8 +26,6 @@ async def get_timetable_data(request: Request, department: str, program: str, se
                 "message": "User must be a teacher, admin, clerk, or student"
             }
         )
-        
-    redis = await get_redis_client()
 
     try:
         if not department.strip() or not program.strip():
@@ -64,98 +65,22 @@ async def get_timetable_data(request: Request, department: str, program: str, se
                 }
             )
 
-        cache_key = f"timetable:{program}:{department}:{semester}:{academic_year}"
-        print(f"Checking cache with key: {cache_key}")
+        response_data = await _load_timetable.raw(department, program, semester, academic_year)
 
-        cached_data = await redis.get(cache_key)
-        if cached_data:
-            print("Cache hit: Returning cached timetable data")
-            cached_response = json.loads(cached_data)
+        if response_data is None:
+            print("No sessions found for query")
             return JSONResponse(
                 status_code=200,
                 content={
-                    "success" : True,
-                    "message" : "Attendance Records fetched successfully",
-                    "data" : cached_response
+                    "program": program,
+                    "department": department,
+                    "semester": semester,
+                    "academic_year": academic_year,
+                    "schedule": []
                 }
             )
 
-        query = {
-            "department": department,
-            "program": program,
-            "semester": semester,
-            "academic_year": academic_year,
-            "is_active": True
-        }
-        print(f"Querying sessions with filter: {query}")
-
-        sessions = await Session.find(query).sort("start_time").to_list()
-        if not sessions:
-            print("No sessions found for query")
-            response_data = {
-                "program": program,
-                "department": department,
-                "semester": semester,
-                "academic_year": academic_year,
-                "schedule": []
-            }
-            return JSONResponse(
-                status_code=200,
-                content=response_data
-            )
-
-        # Fetch linked subject and teacher data
-        for session in sessions:
-            if session.subject:
-                session.subject = await session.subject.fetch()
-            if session.teacher:
-                session.teacher = await session.teacher.fetch()
-        print("Fetched linked subject and teacher data")
-
-        day_sessions = {}
-        days_order = ["Monday", "Tuesday", "Wednesday",
-                      "Thursday", "Friday", "Saturday", "Sunday"]
-        for session in sessions:
-            day = session.day
-            if day not in day_sessions:
-                day_sessions[day] = []
-            teacher_name = f"{session.teacher.first_name} {session.teacher.middle_name or ''} {session.teacher.last_name}".strip()
-            session_view = SessionShortView(
-                session_id=str(session.id),
-                start_time=session.start_time,
-                end_time=session.end_time,
-                subject_name=session.subject.subject_name,
-                subject_id=str(session.subject.id),
-                teacher_name=teacher_name,
-                component=session.subject.component
-            )
-            day_sessions[day].append(session_view)
-
-        schedule = [
-            DaySchedule(day=day, sessions=day_sessions[day])
-            for day in days_order
-            if day in day_sessions
-        ]
-
-        response_data = {
-            "program": program,
-            "department": department,
-            "semester": semester,
-            "academic_year": academic_year,
-            "schedule": [day_schedule.dict() for day_schedule in schedule]
-        }
-
-        try:
-            await redis.setex(
-                name=cache_key,
-                time=3600,
-                value=json.dumps(response_data)
-            )
-            print(f"Cached timetable data with key: {cache_key}")
-        except Exception as e:
-            print(f"Failed to cache timetable data: {str(e)}")
-
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={
                     "success" : True,
@@ -173,4 +98,69 @@ async def get_timetable_data(request: Request, department: str, program: str, se
                 "success": False,
                 "message": f"Error fetching timetable: {str(e)}"
             }
-        )
\ No newline at end of file
+        )
+
+
+# Read by every dashboard: 1 hour in Redis, 1 minute in process memory.
+# timetable.changed / teacher.updated drop it through the class tag.
+@cached(
+    key=lambda department, program, semester, academic_year: f"timetable:{program}:{department}:{semester}:{academic_year}",
+    ttl=3600,
+    local_ttl=60,
+    tags=lambda department, program, semester, _: [class_tag("timetable", department, program, semester)]
+)
+async def _load_timetable(department: str, program: str, semester: str, academic_year: str) -> dict:
+    query = {
+        "department": department,
+        "program": program,
+        "semester": semester,
+        "academic_year": academic_year,
+        "is_active": True
+    }
+    print(f"Querying sessions with filter: {query}")
+
+    sessions = await Session.find(query).sort("start_time").to_list()
+    if not sessions:
+        return None
+
+    # Fetch linked subject and teacher data, one query per collection
+    await load_links(
+        sessions, "subject", "teacher",
+        projections={
+            "subject": {"subject_name": 1, "component": 1},
+            "teacher": {"first_name": 1, "middle_name": 1, "last_name": 1}
+        }
+    )
+
+    day_sessions = {}
+    days_order = ["Monday", "Tuesday", "Wednesday",
+                  "Thursday", "Friday", "Saturday", "Sunday"]
+    for session in sessions:
+        day = session.day
+        if day not in day_sessions:
+            day_sessions[day] = []
+        teacher_name = f"{session.teacher.first_name} {session.teacher.middle_name or ''} {session.teacher.last_name}".strip()
+        session_view = SessionShortView(
+            session_id=str(session.id),
+            start_time=session.start_time,
+            end_time=session.end_time,
+            subject_name=session.subject.subject_name,
+            subject_id=str(session.subject.id),
+            teacher_name=teacher_name,
+            component=session.subject.component
+        )
+        day_sessions[day].append(session_view)
+
+    schedule = [
+        DaySchedule(day=day, sessions=day_sessions[day])
+        for day in days_order
+        if day in day_sessions
+    ]
+
+    return {
+        "program": program,
+        "department": department,
+        "semester": semester,
+        "academic_year": academic_year,
+        "schedule": [day_schedule.dict() for day_schedule in schedule]
+    }
@@ -8,9 +8,11 @@ from app.models.allModel import (
     NotificationRequest,
     StudentListingView
 )
-from app.schemas.attendance import Attendance
+from app.schemas.attendance import Attendance, build_attendance_context
 from app.schemas.student import Student
 from app.services.common_services.notify_users import notify_users
+from app.utils.attendance_bits import pack_bits, to_bitstring
+from app.utils.live_board import update_live_counts
 
 
 async def update_student_attendance(
@@ -92,7 +94,7 @@ async def update_student_attendance(
             content={"success": False, "message": "Session resolution failed"}
         )
 
-    old_binary = attendance_doc.get("students", "")
+    old_binary = to_bitstring(attendance_doc.get("students"), attendance_doc.get("total"))
     
     print("Old Binary:", old_binary)
     print("New Binary:", new_binary)
@@ -173,10 +175,29 @@ async def update_student_attendance(
             newly_absent.append(student_id)
 
     # update db
+    context = build_attendance_context(
+        attendance_doc["date"],
+        session=session,
+        exception=attendance_doc.get("exception_session_data")
+    )
+
     await Attendance.find_one(
         Attendance.id == ObjectId(attendance_request.attendance_id)
     ).update(
-        {"$set": {"students": new_binary, "updated_at": datetime.utcnow()}}
+        {"$set": {
+            "students": pack_bits(new_binary),
+            "present_count": new_binary.count("1"),
+            "total": len(new_binary),
+            **{k: v for k, v in context.items() if v is not None},
+            "updated_at": datetime.utcnow()
+        }}
+    )
+
+    await update_live_counts(
+        attendance_doc["_id"],
+        context["effective_date"],
+        new_binary.count("1"),
+        len(new_binary)
     )
 
     session_date = attendance_doc["date"].strftime("%d %b %Y")
@@ -5,11 +5,12 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from zoneinfo import ZoneInfo
 from app.core.redis import get_redis_client
+from app.utils.cache_tags import cache_set, class_tag
 
-from app.schemas.session import Session
-from app.schemas.exception_session import ExceptionSession
 from app.schemas.student_attendance_summary import StudentAttendanceSummary
+from app.utils.link_loader import load_links
 from app.utils.parse_data import validate_student_academic
+from app.utils.resolved_schedule import get_day_plan
 
 
 
@@ -66,106 +67,20 @@ async def get_tomorrow_bunk_safety(request: Request):
 
     print(f"\n📅 Tomorrow Date: {tomorrow_date} ({tomorrow_weekday})")
 
-    day_start = datetime.combine(tomorrow_date, datetime.min.time()).replace(tzinfo=ZoneInfo("Asia/Kolkata"))
-    day_end = datetime.combine(tomorrow_date, datetime.max.time()).replace(tzinfo=ZoneInfo("Asia/Kolkata"))
-
-
-    # STEP 3 — Fetch Base Sessions
-    base_sessions = await Session.find(
-        Session.day == tomorrow_weekday,
-        Session.program == prog,
-        Session.semester == sem,
-        Session.academic_year == ac_year,
-        Session.department == dept,
-        Session.is_active == True,
-        fetch_links=True
-    ).to_list()
-
-    print(f"\n📘 Base Timetable Sessions for Tomorrow: {len(base_sessions)}")
-    for s in base_sessions:
-        print(f"   ➤ NORMAL SESSION: {s.subject.id} ({s.subject.component}) {s.start_time} - {s.end_time}")
-
-
-    # STEP 4 — Exception Sessions
-    exceptions = await ExceptionSession.find(
-        {"date": {"$gte": day_start, "$lte": day_end}},
-        fetch_links=True
-    ).to_list()
-
-    print(f"\n⚠️ Exception Sessions Found: {len(exceptions)}")
-
-    cancel_resched_map = {}
-    add_list = []
-
-    for ex in exceptions:
-        subj = ex.session.subject
-        sid = str(subj.id)
-
-        if ex.action == "Add":
-            print(f"   ➕ ADD Exception for Subject: {sid} ({subj.component})")
-            add_list.append(ex)
-
-        elif ex.action == "Cancel":
-            print(f"   ❌ CANCEL Exception for Subject: {sid}")
-            cancel_resched_map[str(ex.session.id)] = ex
-
-        elif ex.action == "Rescheduled":
-            print(f"   🔄 RESCHEDULE Exception for Subject: {sid}")
-            cancel_resched_map[str(ex.session.id)] = ex
-
-    
-    # STEP 5 — Apply Exceptions
-    final_sessions = []
-
-    for ses in base_sessions:
-        sid = str(ses.id)
-
-        if sid in cancel_resched_map:
-            ex = cancel_resched_map[sid]
-
-            if ex.action == "Cancel":
-                print(f"   ❌ Removing CANCELLED SESSION {ses.subject.id}")
-                continue
-
-            if ex.action == "Rescheduled":
-                print(f"   🔄 Updating SESSION {ses.subject.id} Timing → {ex.start_time} to {ex.end_time}")
-                ses.start_time = ex.start_time
-                ses.end_time = ex.end_time
-
-        final_sessions.append(ses)
-
-    # Add virtual ADD sessions
-    for ex in add_list:
-        src = ex.session
-        print(f"   ➕ ADDING VIRTUAL SESSION {src.subject.id} ({src.subject.component})")
-
-        final_sessions.append({
-            "_is_added": True,
-            "id": str(ex.id),
-            "start_time": ex.start_time,
-            "end_time": ex.end_time,
-            "subject": src.subject,
-            "teacher": src.teacher,
-            "program": src.program,
-            "department": src.department,
-            "semester": src.semester,
-            "academic_year": src.academic_year,
-            "day": tomorrow_weekday
-        })
+    # STEP 3 — Tomorrow's Resolved Sessions (exceptions already applied)
+    final_sessions = await get_day_plan(dept, prog, sem, ac_year, tomorrow_date)
 
     print(f"\n📘 FINAL Combined Sessions for Tomorrow: {len(final_sessions)}")
     for s in final_sessions:
-        if isinstance(s, dict):
-            print(f"   ➤ FINAL ADD: {s['subject'].id} ({s['subject'].component}) {s['start_time']} - {s['end_time']}")
-        else:
-            print(f"   ➤ FINAL NORMAL: {s.subject.id} ({s.subject.component}) {s.start_time} - {s.end_time}")
+        kind = "ADD" if s["is_added"] else (s["action"] or "NORMAL").upper()
+        print(f"   ➤ FINAL {kind}: {s['subject_id']} ({s['component']}) {s['start_time']} - {s['end_time']}")
 
 
-    # STEP 6 — Fetch Student Attendance Summary Per Subject ID
+    # STEP 4 — Fetch Student Attendance Summary Per Subject ID
     attendance_stats_docs = await StudentAttendanceSummary.find(
-        StudentAttendanceSummary.student.id == ObjectId(student_id),
-        fetch_links=True
+        StudentAttendanceSummary.student.id == ObjectId(student_id)
     ).to_list()
+    await load_links(attendance_stats_docs, "subject")
 
     print(f"\n📊 Attendance Summary Docs: {len(attendance_stats_docs)}")
 
@@ -196,13 +111,11 @@ async def get_tomorrow_bunk_safety(request: Request):
         total_conducted += conducted
 
 
-    # STEP 7 — Identify Tomorrow Subjects By ID
+    # STEP 5 — Identify Tomorrow Subjects By ID
     tomorrow_subjects = set()
 
     for ses in final_sessions:
-        subject = ses["subject"] if isinstance(ses, dict) else ses.subject
-        sid = str(subject.id)
-        tomorrow_subjects.add(sid)
+        tomorrow_subjects.add(ses["subject_id"])
 
     print(f"\n📚 Subjects Tomorrow: {tomorrow_subjects}")
 
@@ -210,16 +123,17 @@ async def get_tomorrow_bunk_safety(request: Request):
     for sid in tomorrow_subjects:
         if sid not in subject_map:
             print(f"   ⚠️ No attendance summary for {sid}, initializing defaults")
+            planned = next(ses for ses in final_sessions if ses["subject_id"] == sid)
             subject_map[sid] = {
-                "subject_name": None,
-                "subject_code": None,
-                "component": None,
+                "subject_name": planned["subject_name"],
+                "subject_code": planned["subject_code"],
+                "component": planned["component"],
                 "attended": 0,
                 "conducted": 0,
                 "attendance_now": 0.0
             }
 
-    # STEP 8 — Simulate IF BUNK impact
+    # STEP 6 — Simulate IF BUNK impact
     print("\n📉 Simulating IF BUNK Impact...")
     for sid in tomorrow_subjects:
         sub = subject_map[sid]
@@ -232,7 +146,7 @@ async def get_tomorrow_bunk_safety(request: Request):
 
         print(f"   ➤ {sid}: NOW={sub['attendance_now']:.2f}% | IF BUNK={after_bunk_pct:.2f}% | SAFE={sub['safe']}")
 
-    # STEP 9 — Aggregate Simulation
+    # STEP 7 — Aggregate Simulation
     aggregate_now = (total_attended / total_conducted * 100) if total_conducted else 0
 
     total_if_bunk = total_conducted + len(final_sessions)
@@ -242,13 +156,13 @@ async def get_tomorrow_bunk_safety(request: Request):
     print(f"📉 Aggregate IF BUNK: {aggregate_if_bunk:.2f}%")
 
     
-    # STEP 10 — Decision
+    # STEP 8 — Decision
     safe_to_bunk = all(subject_map[sid]["safe"] for sid in tomorrow_subjects) and (aggregate_if_bunk >= 75)
 
     print(f"\n🟩 SAFE TO BUNK? {safe_to_bunk}")
 
 
-    # STEP 11 — Build HTTP Response
+    # STEP 9 — Build HTTP Response
     response_subjects = []
     for sid in sorted(tomorrow_subjects):
         sub = subject_map[sid]
@@ -281,10 +195,11 @@ async def get_tomorrow_bunk_safety(request: Request):
     }
 
     #store cache 12 hours
-    await redis.setex(
+    await cache_set(
         cache_key,
+        json.dumps(response),
         12 * 60 * 60,
-        json.dumps(response)
+        tags=[class_tag("schedule", dept, prog, sem)]
     )
 
     return JSONResponse(status_code=200, content=response)
@@ -339,9 +254,9 @@ async def get_week_plan(request: Request):
     # STEP 2 — LOAD ATTENDANCE SUMMARY (OPTIONAL)
     
     attendance_docs = await StudentAttendanceSummary.find(
-        StudentAttendanceSummary.student.id == ObjectId(student_id),
-        fetch_links=True
+        StudentAttendanceSummary.student.id == ObjectId(student_id)
     ).to_list()
+    await load_links(attendance_docs, "subject")
 
     subject_map = {}
     total_attended = 0
@@ -366,51 +281,13 @@ async def get_week_plan(request: Request):
     print(f"📊 Attendance summary loaded: {len(subject_map)} subjects")
 
     
-    # STEP 3 — LOAD WEEKLY BASE SESSIONS
-    
-    weekly_sessions = await Session.find(
-        Session.program == prog,
-        Session.semester == sem,
-        Session.academic_year == ac_year,
-        Session.department == dept,
-        Session.is_active == True,
-        fetch_links=True
-    ).to_list()
-
-    sessions_by_day = {}
-    for ses in weekly_sessions:
-        sessions_by_day.setdefault(ses.day, []).append(ses)
-
-    print(f"📘 Weekly base sessions loaded: {len(weekly_sessions)}")
-
-    
-    # STEP 4 — DETERMINE DAYS LEFT
+    # STEP 3 — DETERMINE DAYS LEFT
     
     weekday_index = today.weekday()  # Monday=0
     days_left = 0 if weekday_index == 6 else 6 - weekday_index
 
-    week_start = today + timedelta(days=1)
-    week_end = today + timedelta(days=days_left)
-
-    
-    # STEP 5 — LOAD EXCEPTION SESSIONS
-    
-    exceptions = await ExceptionSession.find(
-        {
-            "date": {
-                "$gte": datetime.combine(week_start, datetime.min.time(), tzinfo=tz),
-                "$lte": datetime.combine(week_end, datetime.max.time(), tzinfo=tz)
-            }
-        },
-        fetch_links=True
-    ).to_list()
-
-    exceptions_by_date = {}
-    for ex in exceptions:
-        exceptions_by_date.setdefault(ex.date.date(), []).append(ex)
-
     
-    # STEP 6 — BUILD WEEK PLAN
+    # STEP 4 — BUILD WEEK PLAN FROM THE RESOLVED DAY PLANS
     
     weekly_plan = []
 
@@ -418,58 +295,21 @@ async def get_week_plan(request: Request):
         date = today + timedelta(days=i)
         weekday = date.strftime("%A")
 
-        base_sessions = sessions_by_day.get(weekday, [])
-        todays_ex = exceptions_by_date.get(date, [])
-
-        cancel_or_resched = {}
-        add_list = []
-
-        for ex in todays_ex:
-            sid = str(ex.session.id)
-            if ex.action == "Add":
-                add_list.append(ex)
-            else:
-                cancel_or_resched[sid] = ex
-
-        final_sessions = []
-
-        for ses in base_sessions:
-            sid = str(ses.id)
-
-            if sid in cancel_or_resched:
-                ex = cancel_or_resched[sid]
-
-                if ex.action == "Cancel":
-                    continue
-
-                if ex.action == "Rescheduled":
-                    ses.start_time = ex.start_time
-                    ses.end_time = ex.end_time
-
-            final_sessions.append(ses)
-
-        for ex in add_list:
-            final_sessions.append({
-                "_is_added": True,
-                "subject": ex.session.subject,
-                "start_time": ex.start_time,
-                "end_time": ex.end_time
-            })
+        final_sessions = await get_day_plan(dept, prog, sem, ac_year, date)
 
         
-        # STEP 7 — COLLECT SUBJECT METADATA FROM SESSIONS (CRITICAL FIX)
+        # STEP 5 — COLLECT SUBJECT METADATA FROM SESSIONS (CRITICAL FIX)
         
         todays_subjects = {}
 
         for ses in final_sessions:
-            subject = ses["subject"] if isinstance(ses, dict) else ses.subject
-            sid = str(subject.id)
+            sid = ses["subject_id"]
 
             if sid not in todays_subjects:
                 todays_subjects[sid] = {
-                    "subject_name": subject.subject_name,
-                    "subject_code": subject.subject_code,
-                    "component": subject.component
+                    "subject_name": ses["subject_name"],
+                    "subject_code": ses["subject_code"],
+                    "component": ses["component"]
                 }
 
         # Merge attendance data (or defaults)
@@ -483,7 +323,7 @@ async def get_week_plan(request: Request):
                 }
 
         
-        # STEP 8 — CALCULATE SAFETY
+        # STEP 6 — CALCULATE SAFETY
         
         day_results = []
         safe_today = True
@@ -551,10 +391,11 @@ async def get_week_plan(request: Request):
     #ttl till week end (approx 24h * remaining days)
     ttl = max(6 - today.weekday(), 1) * 24 * 60 * 60
 
-    await redis.setex(
+    await cache_set(
         cache_key,
+        json.dumps(response),
         ttl,
-        json.dumps(response)
+        tags=[class_tag("schedule", dept, prog, sem)]
     )
 
     return JSONResponse(status_code=200, content=response)
@@ -5,6 +5,7 @@ import json
 import logging
 from bson import ObjectId
 from app.core.redis import get_redis_client
+from app.utils.cache_tags import cache_set, tag
 from app.schemas.student import Student
 from app.models.allModel import StudentShortView
 
@@ -97,10 +98,11 @@ async def get_student_detail(request: Request):
             response_data["dob"]
         ).strftime("%d/%m/%Y")
 
-    await redis.setex(
+    await cache_set(
         cache_key_student,
+        json.dumps(response_data, cls=MongoJSONEncoder),
         3600,
-        json.dumps(response_data, cls=MongoJSONEncoder)
+        tags=[tag("student", student.id)]
     )
 
     return JSONResponse(
@@ -4,10 +4,11 @@ from zoneinfo import ZoneInfo
 from fastapi import Request
 from fastapi.responses import JSONResponse
 
-from app.schemas.session import Session
-from app.schemas.exception_session import ExceptionSession
+from bson import ObjectId
+
 from app.schemas.attendance import Attendance
 from app.utils.parse_data import validate_student_academic
+from app.utils.resolved_schedule import get_day_plan
 
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -27,7 +28,6 @@ async def get_todays_upcoming_sessions_for_student(
     #time context
     now = datetime.now(tz=IST)
     today = now.date()
-    weekday = now.strftime("%A")
 
     #student scope
     program = user.get("program")
@@ -46,172 +46,59 @@ async def get_todays_upcoming_sessions_for_student(
             }
         )
 
-    #base sessions
-    base_sessions = await Session.find(
-        Session.day == weekday,
-        Session.program == program,
-        Session.semester == semester,
-        Session.academic_year == academic_year,
-        Session.department == department,
-        Session.is_active == True,
-        fetch_links=True
-    ).to_list()
-
-    base_map = {str(s.id): s for s in base_sessions}
-
-    #today exceptions only
-    exceptions = await ExceptionSession.find(
-        ExceptionSession.date == today,
-        fetch_links=True
-    ).to_list()
-
-    cancel_set = set()
-    reschedule_map = {}
-    target_exceptions = []
-    add_exceptions = []
-
-    #process exceptions
-    for ex in exceptions:
-
-        #ignore non-approved swaps
-        if ex.swap_id and ex.swap_id.status != "APPROVED":
-            continue
-
-        #ADD
-        if ex.action == "Add":
-            if (
-                ex.program == program and
-                ex.semester == semester and
-                ex.academic_year == academic_year and
-                ex.department == department
-            ):
-                add_exceptions.append(ex)
-            continue
-
-        if not ex.session:
-            continue
-
-        sid = str(ex.session.id)
-
-        if ex.action == "Cancel":
-            cancel_set.add(sid)
-
-        elif ex.action == "Reschedule":
-            reschedule_map[sid] = ex
-
-            if ex.swap_role == "TARGET":
-                target_exceptions.append(ex)
-
-    #final session list
-    final_sessions = []
-    added_ids = set()
-
-    #normal + reschedule
-    for sid, session in base_map.items():
-
-        if sid in cancel_set:
-            continue
-
-        if sid in reschedule_map:
-            ex = reschedule_map[sid]
-            session.start_time = ex.start_time
-            session.end_time = ex.end_time
-
-        final_sessions.append(session)
-        added_ids.add(sid)
-
-    #inject swap target sessions
-    for ex in target_exceptions:
-        sid = str(ex.session.id)
-        if sid not in added_ids:
-            injected = ex.session
-            injected.start_time = ex.start_time
-            injected.end_time = ex.end_time
-            final_sessions.append(injected)
-            added_ids.add(sid)
-
-    #add virtual sessions (ADD)
-    for ex in add_exceptions:
-        final_sessions.append({
-            "_is_added": True,
-            "id": str(ex.id),
-            "start_time": ex.start_time,
-            "end_time": ex.end_time,
-            "subject": ex.subject,
-            "teacher": ex.created_by,
-            "program": ex.program,
-            "department": ex.department,
-            "semester": ex.semester,
-            "academic_year": ex.academic_year,
-        })
-
-    #attendance (today only)
-    attendance_list = await Attendance.find(
-        Attendance.date == today,
-        fetch_links=True
-    ).to_list()
+    #today's resolved plan for the class (exceptions already applied)
+    plan = await get_day_plan(department, program, semester, academic_year, today)
+
+    #attendance (today, these sessions only)
+    attendance_list = await Attendance.get_motor_collection().find(
+        {
+            "date": datetime.combine(today, datetime.min.time()),
+            "$or": [
+                {"session.$id": {"$in": [ObjectId(e["session_id"]) for e in plan if not e["is_added"]]}},
+                {"exception_session.$id": {"$in": [ObjectId(e["exception_id"]) for e in plan if e["exception_id"]]}}
+            ]
+        },
+        {"session": 1, "exception_session": 1}
+    ).to_list(None)
 
     attendance_map = {}
     for a in attendance_list:
-        if a.session:
-            attendance_map[str(a.session.id)] = a
-        elif a.exception_session:
-            attendance_map[str(a.exception_session.id)] = a
+        if a.get("session"):
+            attendance_map[str(a["session"].id)] = a
+        elif a.get("exception_session"):
+            attendance_map[str(a["exception_session"].id)] = a
 
     #filter upcoming
     upcoming = []
 
-    for s in final_sessions:
-
-        if isinstance(s, dict):
-            session_id = s["id"]
-            start_str = s["start_time"]
-            end_str = s["end_time"]
-            subject = s["subject"]
-            teacher = s["teacher"]
-            program = s["program"]
-            department = s["department"]
-            semester = s["semester"]
-            academic_year = s["academic_year"]
-        else:
-            session_id = str(s.id)
-            start_str = s.start_time
-            end_str = s.end_time
-            subject = s.subject
-            teacher = s.teacher
-            program = s.program
-            department = s.department
-            semester = s.semester
-            academic_year = s.academic_year
+    for entry in plan:
 
         #convert time
         start_dt = datetime.strptime(
-            f"{today} {start_str}", "%Y-%m-%d %H:%M"
+            f"{today} {entry['start_time']}", "%Y-%m-%d %H:%M"
         ).replace(tzinfo=IST)
 
         #only upcoming
         if start_dt <= now:
             continue
 
-        attendance = attendance_map.get(session_id)
+        attendance = attendance_map.get(entry["session_id"]) or \
+            attendance_map.get(entry["exception_id"])
 
         payload = {
-            "session_id": session_id,
-            "attendance_id": str(attendance.id) if attendance else None,
+            "session_id": entry["session_id"],
+            "attendance_id": str(attendance["_id"]) if attendance else None,
             "date": today.strftime("%Y-%m-%d"),
-            "start_time": start_str,
-            "end_time": end_str,
-            "subject_name": subject.subject_name if subject else None,
-            "subject_code": subject.subject_code if subject else None,
-            "component": subject.component if subject else None,
+            "start_time": entry["start_time"],
+            "end_time": entry["end_time"],
+            "subject_name": entry["subject_name"],
+            "subject_code": entry["subject_code"],
+            "component": entry["component"],
             "program": program,
             "department": department,
             "semester": semester,
             "academic_year": academic_year,
-            "teacher_name": (
-                f"{teacher.first_name} {teacher.last_name}"
-                if teacher else None
-            )
+            "teacher_name": entry["teacher_name"]
         }
 
         upcoming.append(payload)
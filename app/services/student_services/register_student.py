@@ -45,7 +45,7 @@ async def register_student(student_data: StudentRegisterRequest, request: Reques
             )
                
         #hash
-        hashed_password = get_password_hash(str(student_data.password))
+        hashed_password = await get_password_hash(str(student_data.password))
 
         #clerk auto verify
         is_verified = True if role == "clerk" else False
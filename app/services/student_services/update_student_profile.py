@@ -7,10 +7,12 @@ from datetime import datetime
 from typing import Optional, List
 from fastapi import UploadFile, Request
 from fastapi.responses import JSONResponse
+from bson import DBRef
 
 from app.schemas.student import Student
+from app.schemas.student_attendance_summary import StudentAttendanceSummary, summary_student_fields
 from app.core.config import settings
-from app.core.redis import get_redis_client
+from app.utils.cache_tags import emit
 from app.utils.imagekit_uploader import upload_file_to_imagekit, delete_file
 from app.utils.publisher import send_to_queue
 from app.utils.security import create_access_token
@@ -35,8 +37,6 @@ async def update_student_profile(
             content={"success": False, "message": "Only Students can access their profile"}
         )
         
-    redis = await get_redis_client()
-
     try:
         student = await Student.find_one(Student.email == user_email)
         if not student:
@@ -195,10 +195,17 @@ async def update_student_profile(
             faiss_cache.pop(old_cache_key, None)
             faiss_cache.pop(new_cache_key, None)
 
-            await redis.delete(f"student:{student.email}")
-
             student = await Student.get(student.id)
 
+            # the summaries carry copies of these for the defaulter filters
+            # and search; the worker only rewrites them on the next marking
+            await StudentAttendanceSummary.get_motor_collection().update_many(
+                {"student": DBRef("students", student.id)},
+                {"$set": summary_student_fields(student)}
+            )
+
+            await emit("student.updated", student_id=student.id)
+
         # ---------------- TOKEN ----------------
         new_token = create_access_token({
             "id": str(student.id),
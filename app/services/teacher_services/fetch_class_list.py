@@ -7,6 +7,7 @@ import json
 
 from app.schemas.student import Student
 from app.models.allModel import StudentListingView, StudentShortView
+from app.utils.json_encoder import FastJSONResponse
 
 
 #json encoder
@@ -167,15 +168,16 @@ async def fetch_class(
 
     for st in students_raw:
 
-        st_dict = json.loads(
-            st.model_dump_json(by_alias=True, exclude_unset=True)
+        # dumped straight to JSON-able types, the embedding is never serialized
+        st_dict = st.model_dump(
+            mode="json",
+            by_alias=True,
+            exclude_unset=True,
+            exclude={"face_embedding"}
         )
 
         if mode == "student_listing":
-            face_embedding = st_dict.get("face_embedding")
-            st_dict["is_embeddings"] = face_embedding is not None
-
-        st_dict.pop("face_embedding", None)
+            st_dict["is_embeddings"] = getattr(st, "face_embedding", None) is not None
 
         students_data.append(st_dict)
 
@@ -184,7 +186,7 @@ async def fetch_class(
 
         total_pages = (total + limit - 1) // limit
 
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=200,
             content={
                 "success": True,
@@ -203,7 +205,7 @@ async def fetch_class(
         )
 
     #attendance mode response
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=200,
         content={
             "success": True,
@@ -6,6 +6,7 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 import logging
 from app.core.redis import get_redis_client
+from app.utils.cache_tags import cache_set, tag
 from beanie.operators import Or
 from app.schemas.session import Session
 from app.schemas.attendance import Attendance
@@ -141,7 +142,7 @@ async def get_current_and_upcoming_sessions(request: Request):
                 attendance = attendance_by_exception.get(str(ex.id))
 
         attendance_id = str(attendance.id) if attendance else None
-        attendance_marked = bool(attendance and attendance.students)
+        attendance_marked = bool(attendance and attendance.total)
 
         payload = {
             "session_id": str(s.id),
@@ -410,7 +411,7 @@ async def fetch_teacher_request(
     }
 
     # cache save
-    await redis.setex(cache_key, 60, json.dumps(response, default=str))
+    await cache_set(cache_key, json.dumps(response, default=str), 60, tags=[tag("teacher_requests", teacher_id)])
 
     return JSONResponse(status_code=200, content=response)
 
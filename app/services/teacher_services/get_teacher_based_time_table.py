@@ -5,6 +5,7 @@ from fastapi.responses import JSONResponse
 from app.models.allModel import SessionView
 from app.schemas.session import Session
 from app.core.redis import get_redis_client
+from app.utils.cache_tags import cache_set, tag
 from beanie.operators import Eq
 from bson import DBRef, ObjectId
 import json
@@ -39,7 +40,7 @@ async def get_teacher_based_time_table(request: Request) -> JSONResponse:
             "message": "No timetable found for this teacher",
             "data": {}
         }
-        await redis.setex(cache_key, 3600, json.dumps(empty))
+        await cache_set(cache_key, json.dumps(empty), 3600, tags=[tag("teacher_timetable", user_id)])
         return JSONResponse(status_code=200, content=empty)
 
     # 2. Fetch linked subject & teacher
@@ -78,5 +79,5 @@ async def get_teacher_based_time_table(request: Request) -> JSONResponse:
         "data": data_payload
     }
 
-    await redis.setex(cache_key, 3600, json.dumps(payload))
+    await cache_set(cache_key, json.dumps(payload), 3600, tags=[tag("teacher_timetable", user_id)])
     return JSONResponse(status_code=200, content=payload)
\ No newline at end of file
@@ -2,11 +2,11 @@ from decimal import Decimal
 from statistics import mean
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
-from app.core.redis import get_redis_client
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import tag
+from app.utils.json_encoder import FastJSONResponse
 from bson import ObjectId
-import json
 from datetime import datetime, timedelta
-from pydantic import HttpUrl
 from app.schemas.attendance import Attendance
 from app.schemas.exception_session import ExceptionSession
 from app.schemas.session import Session
@@ -22,17 +22,6 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class MongoJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if isinstance(obj, HttpUrl):
-            return str(obj)
-        return super().default(obj)
-
-
 async def get_teacher_me(request: Request):
 
     user = request.state.user
@@ -46,23 +35,35 @@ async def get_teacher_me(request: Request):
             }
         )
 
-    teacher_email = user.get("email")
-    redis = await get_redis_client()
-
-    cache_key = f"teacher:profile:{teacher_email}"
+    teacher_data = await _load_teacher_profile.raw(user.get("email"), user.get("id"))
 
-    cached = await redis.get(cache_key)
-
-    if cached:
+    if not teacher_data:
         return JSONResponse(
-            status_code=200,
+            status_code=404,
             content={
-                "success": True,
-                "message": "Teacher details fetched successfully",
-                "data": json.loads(cached)
+                "success": False,
+                "message": "Teacher not found"
             }
         )
 
+    return FastJSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "message": "Teacher details fetched successfully",
+            "data": teacher_data
+        }
+    )
+
+
+#cache for 1 hour
+@cached(
+    key=lambda teacher_email, _: f"teacher:profile:{teacher_email}",
+    ttl=3600,
+    tags=lambda _, teacher_id: [tag("teacher", teacher_id)]
+)
+async def _load_teacher_profile(teacher_email: str, teacher_id: str):
+
     # ---------------- AGGREGATION PIPELINE ----------------
 
     pipeline = [
@@ -164,30 +165,7 @@ async def get_teacher_me(request: Request):
 
     result = await Teacher.aggregate(pipeline).to_list(length=1)
 
-    if not result:
-        return JSONResponse(
-            status_code=404,
-            content={
-                "success": False,
-                "message": "Teacher not found"
-            }
-        )
-
-    teacher_data = result[0]
-
-    teacher_json = json.dumps(teacher_data, cls=MongoJSONEncoder)
-
-    #cache for 1 hour
-    await redis.setex(cache_key, 3600, teacher_json)
-
-    return JSONResponse(
-        status_code=200,
-        content={
-            "success": True,
-            "message": "Teacher details fetched successfully",
-            "data": json.loads(teacher_json)
-        }
-    )
+    return result[0] if result else None
 
 
 # 2. Get Teacher Details by ID (used by Clerk)
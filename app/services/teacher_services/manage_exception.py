@@ -20,6 +20,8 @@ from app.services.common_services.notify_users import notify_users
 from app.utils.notify import notify_students_by_session, notify_students_for_two_sessions
 from app.utils.parse_data import enqueue_exception_session, overlap_error_response
 from app.core.redis import get_redis_client
+from app.utils.cache_tags import emit
+from app.utils.teacher_daily_stats import increment_teacher_daily_stats
 
 
 logger = logging.getLogger("session_exception")
@@ -142,9 +144,23 @@ async def create_session_exception(
 
         await cancel_exception.insert()
 
+        # drop the queued attendance job first, the cancel is already saved
         redis_key = f"{REDIS_SESSION_JOB_PREFIX}{session_obj.id}:{ex_date}"
         await redis.delete(redis_key)
 
+        await emit("exception.changed", sessions=[session_obj], teacher_ids=[requester.id])
+
+        # a missed leaderboard counter must not fail a cancel that is saved
+        try:
+            await increment_teacher_daily_stats(
+                requester.id,
+                ex_date,
+                session_obj.program,
+                cancelled=1
+            )
+        except Exception as e:
+            logger.error(f"Error updating TeacherDailyStats for cancel {cancel_exception.id}: {e}")
+
         return JSONResponse(
             status_code=201,
             content={
@@ -236,6 +252,7 @@ async def create_session_exception(
             )
 
             await add_exception.insert()
+            await emit("exception.changed", sessions=[session_obj], teacher_ids=[requester.id])
 
             await enqueue_exception_session(
                 session=session_obj,
@@ -315,6 +332,11 @@ async def create_session_exception(
 
         add_exception.swap_id = swap
         await add_exception.save()
+        await emit(
+            "exception.changed",
+            sessions=[session_obj, target],
+            teacher_ids=[requester.id, target.teacher.id]
+        )
 
         await notify_users(
             NotificationRequest(
@@ -421,6 +443,7 @@ async def create_session_exception(
     )
 
     await source_exception.insert()
+    await emit("exception.changed", sessions=[session_obj], teacher_ids=[requester.id])
 
     redis_key = f"{REDIS_SESSION_JOB_PREFIX}{session_obj.id}:{ex_date}"
     await redis.delete(redis_key)
@@ -464,6 +487,11 @@ async def create_session_exception(
 
     source_exception.swap_id = swap
     await source_exception.save()
+    await emit(
+        "exception.changed",
+        sessions=[session_obj, target],
+        teacher_ids=[requester.id, target.teacher.id]
+    )
 
     await notify_users(
         NotificationRequest(
@@ -527,6 +555,11 @@ async def take_action_session_exception(
         swap.status = "REJECTED"
         swap.responded_at = datetime.utcnow()
         await swap.save()
+        await emit(
+            "exception.changed",
+            sessions=[swap.source_session, swap.target_session],
+            teacher_ids=[swap.requested_by.id, swap.requested_to.id]
+        )
 
         await notify_users(
             NotificationRequest(
@@ -571,6 +604,11 @@ async def take_action_session_exception(
         swap_role="TARGET"
     )
     await target_exception.insert()
+    await emit(
+        "exception.changed",
+        sessions=[source_session, target_session],
+        teacher_ids=[swap.requested_by.id, swap.requested_to.id]
+    )
 
     # enqueue BOTH sessions
     await enqueue_exception_session(
@@ -6,6 +6,7 @@ from datetime import datetime
 
 from app.schemas.student import Student
 from app.services.common_services.notify_users import notify_users
+from app.utils.live_board import update_live_counts
 
 async def mark_student_attendance(request: Request, attendance_request: AttendanceStudentRequest):
 
@@ -161,8 +162,20 @@ async def mark_student_attendance(request: Request, attendance_request: Attendan
   
     # Save attendance
     try:
-        attendance_record.students = attendance_request.attendance_student
+        attendance_record.set_students(attendance_request.attendance_student)
+        attendance_record.set_context(
+            session=session,
+            exception=attendance_record.exception_session if is_exception else None
+        )
+        attendance_record.updated_at = datetime.utcnow()
         await attendance_record.save()
+
+        await update_live_counts(
+            attendance_record.id,
+            attendance_record.effective_date or attendance_record.date,
+            attendance_record.present_count,
+            attendance_record.total
+        )
         
         # Send Confirmation Notification to the student 
         await notify_users(
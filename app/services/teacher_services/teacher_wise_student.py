@@ -5,7 +5,9 @@ from app.models.allModel import StudentBasicView, StudentSelectionRequest
 from app.schemas.student import Student
 from app.schemas.subject import Subject
 from app.schemas.teacher import Teacher
-from app.core.redis import get_redis_client
+from app.utils.cache_aside import cached
+from app.utils.cache_tags import tag
+from app.utils.json_encoder import FastJSONResponse
 import json
 
 
@@ -40,38 +42,45 @@ async def get_students_by_teacher(request: Request, student_request: StudentSele
         )
 
     teacher_id = request.state.user.get("id")
-    redis = await get_redis_client()
 
-    cache_key = (
+    data = await _load_teacher_students(teacher_id, student_request)
+
+    if data is None:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "message": "Teacher not found"}
+        )
+
+    return FastJSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "message": "Students fetched successfully",
+            "data": data["records"],
+            "total": data["total"]
+        }
+    )
+
+
+#cache for 30 minutes
+@cached(
+    key=lambda teacher_id, student_request: (
         f"teacher_students:{teacher_id}:"
         f"{student_request.batch_year}:{student_request.program}:"
         f"{student_request.semester}:{student_request.name}:"
         f"{student_request.page}:{student_request.limit}"
-    )
-
-    cached = await redis.get(cache_key)
-
-    if cached:
-        data = json.loads(cached)
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "message": "Students fetched from cache",
-                "data": data["records"],
-                "total": data["total"],
-                "source": "cache"
-            }
-        )
+    ),
+    ttl=1800,
+    stale_ttl=300,
+    tags=lambda teacher_id, _: [tag("teacher", teacher_id)]
+)
+async def _load_teacher_students(teacher_id: str, student_request: StudentSelectionRequest):
 
     #fetch teacher
     teacher = await Teacher.find_one(Teacher.id == ObjectId(teacher_id))
 
     if not teacher:
-        return JSONResponse(
-            status_code=404,
-            content={"success": False, "message": "Teacher not found"}
-        )
+        return None
 
     #fetch subjects taught by teacher
     teacher_subjects = await Subject.find(
@@ -79,14 +88,7 @@ async def get_students_by_teacher(request: Request, student_request: StudentSele
     ).to_list()
 
     if not teacher_subjects:
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": [],
-                "total": 0
-            }
-        )
+        return {"records": [], "total": 0}
 
     #extract program + department + semester combinations
     class_filters = []
@@ -155,26 +157,10 @@ async def get_students_by_teacher(request: Request, student_request: StudentSele
 
         enriched_students.append(student_dict)
 
-    #cache for 30 minutes
-    await redis.setex(
-        cache_key,
-        1800,
-        json.dumps({
-            "records": enriched_students,
-            "total": total_students
-        })
-    )
-
-    return JSONResponse(
-        status_code=200,
-        content={
-            "success": True,
-            "message": "Students fetched successfully",
-            "data": enriched_students,
-            "total": total_students,
-            "source": "database"
-        }
-    )
+    return {
+        "records": enriched_students,
+        "total": total_students
+    }
 
 
 async def class_based_teacher(request: Request):
@@ -1,6 +1,6 @@
 from fastapi import HTTPException, UploadFile, Request
 from fastapi.responses import JSONResponse
-from app.core.redis import get_redis_client
+from app.utils.cache_tags import emit
 from app.models.allModel import UpdateProfileRequest
 from app.utils.imagekit_uploader import upload_file_to_imagekit, delete_file
 from datetime import datetime
@@ -8,6 +8,7 @@ from typing import Optional
 import base64
 from pydantic import ValidationError
 from app.schemas.teacher import Teacher
+from app.schemas.session import Session
 from pydantic import BaseModel, validator
 
 
@@ -29,8 +30,6 @@ async def update_teacher_profile(
             }
         )
         
-    redis = await get_redis_client()
-
     teacher_email = user_email
     teacher = await Teacher.find_one(Teacher.email == teacher_email)
     if not teacher:
@@ -118,10 +117,23 @@ async def update_teacher_profile(
         await teacher.update({"$set": update_data})
         print("Teacher document updated successfully.")
 
-        # Clear relevant caches
-        cache_key_teacher = f"teacher:profile:{teacher_email}"
-        await redis.delete(cache_key_teacher)
-        print(f"Deleted cache key: {cache_key_teacher}")
+        # Clear relevant caches; a renamed teacher also changes the
+        # timetables of every class they teach
+        classes = []
+        if {"first_name", "middle_name", "last_name"} & update_data.keys():
+            classes = [
+                (c["_id"]["department"], c["_id"]["program"], c["_id"]["semester"])
+                for c in await Session.aggregate([
+                    {"$match": {"teacher.$id": teacher.id, "is_active": True}},
+                    {"$group": {"_id": {
+                        "department": "$department",
+                        "program": "$program",
+                        "semester": "$semester"
+                    }}}
+                ]).to_list()
+            ]
+
+        await emit("teacher.updated", teacher_id=teacher.id, classes=classes)
 
     else:
         print("No fields to update for teacher.")
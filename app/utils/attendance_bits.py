@@ -0,0 +1,91 @@
+from typing import List, Optional, Tuple, Union
+
+# Attendance.students is a packed bitset: student i is bit (7 - i % 8) of
+# byte i // 8 (MSB first, same layout as numpy.packbits). The number of
+# students is stored separately in Attendance.total since the last byte
+# is zero-padded.
+
+BitsValue = Union[bytes, str, None]
+
+
+def pack_bits(bitstr: str) -> bytes:
+    """'0101...' → packed bytes."""
+    if not bitstr:
+        return b""
+    if not set(bitstr) <= {"0", "1"}:
+        raise ValueError("Attendance must be a binary string of 0 and 1")
+    padded = bitstr + "0" * (-len(bitstr) % 8)
+    return int(padded, 2).to_bytes(len(padded) // 8, "big")
+
+
+def unpack_bits(data: bytes, total: int) -> str:
+    """Packed bytes → '0101...' of length total."""
+    if not data or not total:
+        return ""
+    return format(int.from_bytes(data, "big"), f"0{len(data) * 8}b")[:total]
+
+
+def to_bitstring(value: BitsValue, total: Optional[int] = None) -> str:
+    """
+    Accepts either storage format (legacy '0101' string or packed bytes),
+    for code that reads raw documents.
+    """
+    if not value:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    return unpack_bits(bytes(value), total if total is not None else len(value) * 8)
+
+
+def get_bit(value: BitsValue, index: int) -> bool:
+    if not value or index < 0:
+        return False
+    if isinstance(value, str):
+        return index < len(value) and value[index] == "1"
+    byte_index = index >> 3
+    if byte_index >= len(value):
+        return False
+    return bool((value[byte_index] >> (7 - (index & 7))) & 1)
+
+
+def set_bit(data: bytes, index: int, present: bool) -> bytes:
+    buf = bytearray(data)
+    byte_index = index >> 3
+    if byte_index >= len(buf):
+        buf.extend(b"\x00" * (byte_index + 1 - len(buf)))
+    mask = 1 << (7 - (index & 7))
+    if present:
+        buf[byte_index] |= mask
+    else:
+        buf[byte_index] &= ~mask
+    return bytes(buf)
+
+
+def popcount(value: BitsValue) -> int:
+    if not value:
+        return 0
+    if isinstance(value, str):
+        return value.count("1")
+    return int.from_bytes(value, "big").bit_count()
+
+
+def diff_bits(old: BitsValue, new: BitsValue, total: int) -> List[Tuple[int, bool, bool]]:
+    """
+    Students whose bit flipped, as (student_index, was_present, is_now_present).
+    Works on whole integers, so unchanged students cost nothing.
+    """
+    width = (total + 7) // 8 * 8
+    old_int = int(to_bitstring(old, total).ljust(width, "0") or "0", 2)
+    new_int = int(to_bitstring(new, total).ljust(width, "0") or "0", 2)
+
+    changed = old_int ^ new_int
+    changes = []
+    while changed:
+        low = changed & -changed
+        index = width - low.bit_length()
+        if index < total:
+            changes.append((index, bool(old_int & low), bool(new_int & low)))
+        changed ^= low
+
+    changes.sort()
+    return changes
@@ -0,0 +1,68 @@
+from typing import Optional
+from bson import DBRef, ObjectId
+from app.schemas.student_attendance_summary import StudentAttendanceSummary
+
+DEFAULTER_THRESHOLD = 75.0
+TOP_PERFORMER_THRESHOLD = 85.0
+
+# bucket name → TeacherSubjectSummary counter field
+CATEGORY_FIELDS = {
+    "defaulter": "defaulter_count",
+    "at_risk": "at_risk_count",
+    "top_performer": "top_performer_count",
+}
+
+
+def summary_percentage(attended: int, total_classes: int) -> float:
+    """Same formula the summary updater applies server-side."""
+    return round((attended / total_classes * 100) if total_classes > 0 else 0.0, 2)
+
+
+def attendance_category(percentage: Optional[float]) -> Optional[str]:
+    if percentage is None:
+        return None
+    if percentage < DEFAULTER_THRESHOLD:
+        return "defaulter"
+    if percentage < TOP_PERFORMER_THRESHOLD:
+        return "at_risk"
+    return "top_performer"
+
+
+async def aggregate_category_counts(subject_id: Optional[ObjectId] = None) -> dict:
+    """
+    Full recount with a single $group, used to seed new teacher summaries
+    and to reconcile the incremental counters.
+    Returns {subject_id: (defaulter, at_risk, top_performer)}.
+    """
+    pipeline = []
+    if subject_id is not None:
+        pipeline.append({"$match": {"subject": DBRef("subjects", subject_id)}})
+
+    pipeline.append({
+        "$group": {
+            "_id": "$subject.$id",
+            "defaulter": {
+                "$sum": {"$cond": [{"$lt": ["$percentage", DEFAULTER_THRESHOLD]}, 1, 0]}
+            },
+            "at_risk": {
+                "$sum": {
+                    "$cond": [
+                        {"$and": [
+                            {"$gte": ["$percentage", DEFAULTER_THRESHOLD]},
+                            {"$lt": ["$percentage", TOP_PERFORMER_THRESHOLD]}
+                        ]},
+                        1, 0
+                    ]
+                }
+            },
+            "top_performer": {
+                "$sum": {"$cond": [{"$gte": ["$percentage", TOP_PERFORMER_THRESHOLD]}, 1, 0]}
+            },
+        }
+    })
+
+    rows = await StudentAttendanceSummary.aggregate(pipeline).to_list()
+    return {
+        row["_id"]: (row["defaulter"], row["at_risk"], row["top_performer"])
+        for row in rows
+    }
@@ -0,0 +1,240 @@
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from redis.exceptions import LockError
+
+from app.core.redis import get_redis_client
+from app.utils.cache_tags import cache_set
+from app.utils.json_encoder import RawJSON, dumps, loads
+from app.utils.local_cache import local_cache
+
+logger = logging.getLogger("app.utils.cache_aside")
+
+# Cache-aside with stampede protection. Entries are stored as
+#   "<fresh_until epoch>\n<json>"
+# so a hit can be sent on without parsing (loader.raw), and kept stale_ttl seconds past fresh_until. A miss is computed once per
+# key: concurrent callers in this process share one task, other processes
+# wait on cache_lock:{key} and read the result. A stale hit is served as
+# is while a single background refresh recomputes it. With local_ttl the
+# value is also kept in this process (app/utils/local_cache.py).
+LOCK_PREFIX = "cache_lock:"
+
+_inflight: Dict[str, asyncio.Future] = {}
+_background: set = set()
+
+_UNPARSED = object()
+
+
+class _Entry:
+    """A cached JSON body, parsed on first use."""
+
+    __slots__ = ("body", "fresh_until", "_value")
+
+    def __init__(self, body, fresh_until: float):
+        self.body = body
+        self.fresh_until = fresh_until
+        self._value = _UNPARSED
+
+    def value(self) -> Any:
+        if self._value is _UNPARSED:
+            self._value = loads(self.body)
+        return self._value
+
+    def result(self, raw: bool) -> Any:
+        return RawJSON(self.body) if raw else self.value()
+
+
+def _jittered(ttl: int, jitter: float) -> int:
+    # spread expiries of keys written together so they do not all miss at once
+    return ttl + int(random.uniform(0, ttl * jitter))
+
+
+async def _read(redis, key: str) -> Optional[_Entry]:
+    raw = await redis.get(key)
+    if raw is None:
+        return None
+
+    stamp, _, body = raw.partition("\n")
+    try:
+        return _Entry(body, float(stamp))
+    except ValueError:
+        # entries written before this layer are plain JSON, treat as a miss
+        return None
+
+
+async def _store(key, compute, ttl, stale_ttl, tags, jitter) -> Optional[_Entry]:
+    value = await compute()
+    if value is None:
+        return None
+
+    body = dumps(value)
+    fresh = _jittered(ttl, jitter)
+    fresh_until = time.time() + fresh
+    await cache_set(key, f"{fresh_until}\n".encode() + body, fresh + stale_ttl, tags)
+    return _Entry(body, fresh_until)
+
+
+async def _fill(redis, key, compute, ttl, stale_ttl, tags, jitter, lock_timeout, stale=None):
+    lock = redis.lock(f"{LOCK_PREFIX}{key}", timeout=lock_timeout)
+
+    if await lock.acquire(blocking=False):
+        try:
+            return await _store(key, compute, ttl, stale_ttl, tags, jitter)
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                pass
+
+    # another process is computing it
+    if stale is not None:
+        return stale
+
+    deadline = time.monotonic() + lock_timeout
+    delay = 0.025
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.4)
+
+        entry = await _read(redis, key)
+        if entry is not None:
+            return entry
+        if not await redis.exists(lock.name):
+            break
+
+    # the holder gave up, failed or returned nothing to cache
+    return await _store(key, compute, ttl, stale_ttl, tags, jitter)
+
+
+def _single_flight(key: str, fill: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+    flight = _inflight.get(key)
+    if flight is None:
+        flight = asyncio.ensure_future(fill())
+        _inflight[key] = flight
+
+        def done(_):
+            if _inflight.get(key) is flight:
+                del _inflight[key]
+
+        flight.add_done_callback(done)
+
+    # a cancelled caller must not cancel the other waiters
+    return asyncio.shield(flight)
+
+
+def _refresh_in_background(key: str, fill: Callable[[], Awaitable[Any]]):
+    if key in _inflight:
+        return
+
+    async def refresh():
+        try:
+            await _single_flight(key, fill)
+        except Exception as e:
+            logger.error(f"❌ Background refresh of {key} failed: {e}")
+
+    task = asyncio.create_task(refresh())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def get_or_compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    *,
+    stale_ttl: int = 0,
+    tags: Iterable[str] = (),
+    jitter: float = 0.1,
+    lock_timeout: int = 30,
+    local_ttl: int = 0,
+    raw: bool = False
+) -> Any:
+    """
+    The cached value of `key`, or the result of `compute()` stored for
+    `ttl` seconds (plus up to `jitter` of it) under `tags`. For another
+    `stale_ttl` seconds the old value is returned while it is refreshed in
+    the background. A None result is returned but not cached.
+
+    With `local_ttl`, fresh values are also held in process memory for at
+    most that many seconds; those are shared objects, do not mutate them.
+
+    With `raw`, the value is returned as RawJSON (the serialized body) to
+    embed in a FastJSONResponse without parsing it.
+    """
+    if local_ttl:
+        entry = local_cache.get(key)
+        if entry is not None:
+            return entry.result(raw)
+        epoch = local_cache.epoch
+
+    redis = await get_redis_client()
+    tags = list(tags)
+
+    def fill(stale=None):
+        return _fill(redis, key, compute, ttl, stale_ttl, tags, jitter, lock_timeout, stale)
+
+    entry = await _read(redis, key)
+    if entry is not None:
+        if entry.fresh_until <= time.time():
+            stale = entry
+            _refresh_in_background(key, lambda: fill(stale=stale))
+            return entry.result(raw)
+    else:
+        entry = await _single_flight(key, fill)
+        if entry is None:
+            return None
+
+    if local_ttl:
+        local_cache.set(key, entry, local_ttl, tags, epoch)
+    return entry.result(raw)
+
+
+def cached(
+    key: Callable[..., str],
+    ttl: int,
+    *,
+    stale_ttl: int = 0,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    jitter: float = 0.1,
+    lock_timeout: int = 30,
+    local_ttl: int = 0
+):
+    """
+    Decorates an async loader returning JSON-able data (or None), e.g.
+
+        @cached(key=lambda email: f"clerk:profile:{email}", ttl=3600,
+                tags=lambda email, clerk_id: [tag("clerk", clerk_id)])
+        async def load_clerk_profile(email, clerk_id): ...
+
+    `key` and `tags` are called with the loader's arguments. Values come
+    back parsed from JSON, on a miss too; `await load_clerk_profile.raw(...)`
+    returns the same value as RawJSON.
+    """
+    def decorator(fn):
+        def call(args, kwargs, raw):
+            return get_or_compute(
+                key(*args, **kwargs),
+                lambda: fn(*args, **kwargs),
+                ttl,
+                stale_ttl=stale_ttl,
+                tags=tags(*args, **kwargs) if tags else (),
+                jitter=jitter,
+                lock_timeout=lock_timeout,
+                local_ttl=local_ttl,
+                raw=raw
+            )
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await call(args, kwargs, raw=False)
+
+        async def raw(*args, **kwargs):
+            return await call(args, kwargs, raw=True)
+
+        wrapper.raw = raw
+        return wrapper
+    return decorator
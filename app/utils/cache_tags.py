@@ -0,0 +1,141 @@
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+from beanie import Link
+from bson import DBRef
+
+from app.core.redis import get_redis_client
+from app.utils.redis_pub_sub import publish_to_channel
+
+logger = logging.getLogger("app.utils.cache_tags")
+
+# Tagged cache entries. Every cached key is added to one Redis set per tag
+# it depends on (cache_tag:{tag}); writes emit a domain event whose tags are
+# evicted by reading those sets, so invalidation touches only the affected
+# keys instead of SCANning the keyspace.
+CACHE_TAG_PREFIX = "cache_tag:"
+CACHE_EVENTS_CHANNEL = "cache:events"
+
+
+def tag(kind: str, *parts) -> str:
+    return ":".join([kind, *(str(p) for p in parts)])
+
+
+def class_tag(kind: str, department, program, semester) -> str:
+    """Per class (no academic year): timetable / schedule tags."""
+    return tag(kind, department, program, semester)
+
+
+def tag_key(name: str) -> str:
+    return f"{CACHE_TAG_PREFIX}{name}"
+
+
+def _ref_id(value):
+    if value is None:
+        return None
+    if isinstance(value, Link):
+        return value.ref.id
+    if isinstance(value, DBRef):
+        return value.id
+    return getattr(value, "id", value)
+
+
+async def cache_set(key: str, value: str, ttl: int, tags: Iterable[str]):
+    """SET key with a TTL and register it under each tag."""
+    redis = await get_redis_client()
+    pipe = redis.pipeline()
+    pipe.set(key, value, ex=ttl)
+    for name in set(tags):
+        pipe.sadd(tag_key(name), key)
+        # the tag set lives as long as its longest-lived entry
+        pipe.expire(tag_key(name), ttl, nx=True)
+        pipe.expire(tag_key(name), ttl, gt=True)
+    await pipe.execute()
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """Deletes every key registered under the tags and unregisters them."""
+    tag_keys = [tag_key(name) for name in set(tags)]
+    if not tag_keys:
+        return 0
+
+    redis = await get_redis_client()
+    pipe = redis.pipeline()
+    for key in tag_keys:
+        pipe.smembers(key)
+    registered = await pipe.execute()
+
+    members = set().union(*registered)
+    if not members:
+        return 0
+
+    # SREM only what was read, in the same MULTI as the DEL: a key that
+    # cache_set registers in between stays in its set and can still be
+    # invalidated (an emptied set is removed by Redis itself)
+    pipe = redis.pipeline()
+    pipe.delete(*members)
+    for key, keys in zip(tag_keys, registered):
+        if keys:
+            pipe.srem(key, *keys)
+    await pipe.execute()
+
+    return len(members)
+
+
+# ---------------- domain events ----------------
+
+def _timetable_changed(sessions: Iterable) -> List[str]:
+    tags = []
+    for s in sessions:
+        tags.append(class_tag("timetable", s.department, s.program, s.semester))
+        tags.append(class_tag("schedule", s.department, s.program, s.semester))
+        tags.append(tag("teacher_timetable", _ref_id(s.teacher)))
+    return tags
+
+
+def _teacher_updated(teacher_id, classes: Iterable = ()) -> List[str]:
+    # names show up in the timetables and day plans of the classes they teach
+    tags = [tag("teacher", teacher_id), tag("teacher_timetable", teacher_id)]
+    for department, program, semester in classes:
+        tags.append(class_tag("timetable", department, program, semester))
+        tags.append(class_tag("schedule", department, program, semester))
+    return tags
+
+
+def _exception_changed(sessions: Iterable, teacher_ids: Iterable = ()) -> List[str]:
+    tags = [
+        class_tag("schedule", s.department, s.program, s.semester)
+        for s in sessions if s is not None
+    ]
+    tags += [tag("teacher_requests", _ref_id(t)) for t in teacher_ids if t is not None]
+    return tags
+
+
+EVENT_TAGS: Dict[str, Callable[..., Iterable[str]]] = {
+    "student.updated": lambda student_id: [tag("student", student_id)],
+    "teacher.updated": _teacher_updated,
+    "clerk.created": lambda: [tag("clerks")],
+    "clerk.updated": lambda clerk_id: [tag("clerk", clerk_id), tag("clerks")],
+    # scopes: (department, program) pairs whose subject lists changed
+    "subjects.changed": lambda scopes: [tag("scope", d, p) for d, p in scopes],
+    "timetable.changed": _timetable_changed,
+    "programs.changed": lambda: [tag("programs"), tag("metadata")],
+    "departments.changed": lambda: [tag("departments"), tag("metadata")],
+    "exception.changed": _exception_changed,
+}
+
+
+async def emit(event: str, **payload) -> Optional[int]:
+    """
+    Evicts the cache entries that depend on `event` and announces it on
+    cache:events. Cache failures are logged, never raised into the write.
+    """
+    try:
+        tags = sorted(set(EVENT_TAGS[event](**payload)))
+        evicted = await invalidate_tags(*tags)
+        await publish_to_channel(CACHE_EVENTS_CHANNEL, {"event": event, "tags": tags})
+        logger.info(f"🧹 {event}: evicted {evicted} keys for {len(tags)} tags")
+        return evicted
+    except Exception as e:
+        logger.error(f"❌ Cache event {event} failed: {e}")
+        return None
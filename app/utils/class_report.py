@@ -0,0 +1,291 @@
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.schemas.attendance import Attendance
+from app.schemas.session import Session
+from app.schemas.student import Student
+from app.schemas.subject import Subject
+from app.utils.report_core import SubjectReport, build_class_report
+
+# rows per PDF table; reportlab splits one huge table across pages in
+# roughly quadratic time, consecutive smaller tables lay out linearly
+PDF_CHUNK_ROWS = 200
+
+ProgressCallback = Callable[[int, str], None]
+
+
+class ClassReportError(Exception):
+    """Nothing to report for the requested class."""
+
+
+async def load_class_report(
+    department: str,
+    program: str,
+    semester: int,
+    batch_year: int
+) -> Tuple[list, list, List[SubjectReport]]:
+    """Roll numbers, names and one SubjectReport per subject of the class."""
+
+    #students
+    students = await Student.find({
+        "department": department,
+        "program": program,
+        "semester": semester,
+        "batch_year": batch_year
+    }).sort("roll_number").to_list()
+
+    if not students:
+        raise ClassReportError("No students")
+
+    student_rolls = [s.roll_number for s in students]
+    student_names = [f"{s.first_name} {s.last_name}" for s in students]
+
+    #subjects
+    subjects = await Subject.find({
+        "department": department,
+        "program": program,
+        "semester": semester
+    }).to_list()
+
+    subject_map = {str(s.id): s for s in subjects}
+
+    #sessions
+    sessions = await Session.find({
+        "department": department,
+        "program": program,
+        "semester": str(semester),
+        "is_active": True
+    }).to_list()
+
+    if not sessions:
+        raise ClassReportError("No sessions")
+
+    session_ids = [s.id for s in sessions]
+
+    #group sessions by subject
+    subject_sessions_map = {}
+    for s in sessions:
+        sid = str(s.subject.ref.id)
+        subject_sessions_map.setdefault(sid, []).append(s.id)
+
+    #attendance aggregation
+    pipeline = [
+        {"$match": {"session.$id": {"$in": session_ids}}},
+        {"$project": {"session_id": "$session.$id", "students": 1, "total": 1, "date": 1}}
+    ]
+
+    attendances = await Attendance.aggregate(pipeline).to_list()
+
+    attendance_map = {}
+    for att in attendances:
+        sid = str(att["session_id"])
+        attendance_map.setdefault(sid, []).append(att)
+
+    reports = build_class_report(subject_map, subject_sessions_map, attendance_map, len(students))
+    return student_rolls, student_names, reports
+
+
+async def _stamp(collection, match: dict, *fields: str) -> str:
+    """"count@latest" over the given timestamp fields of the matched documents."""
+    rows = await collection.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            **{f: {"$max": f"${f}"} for f in fields}
+        }}
+    ]).to_list(1)
+
+    if not rows:
+        return "0"
+
+    latest = max((rows[0][f] for f in fields if rows[0].get(f)), default=None)
+    return f"{rows[0]['count']}@{latest.isoformat() if latest else '-'}"
+
+
+async def class_report_watermark(
+    department: str,
+    program: str,
+    semester: int,
+    batch_year: int
+) -> str:
+    """
+    Changes whenever anything the report is built from changes: the
+    roster, the active sessions, or any of their attendances (marked,
+    edited or added). Cheap compared to building the report itself.
+    """
+    student_match = {
+        "department": department,
+        "program": program,
+        "semester": semester,
+        "batch_year": batch_year
+    }
+    session_match = {
+        "department": department,
+        "program": program,
+        "semester": str(semester),
+        "is_active": True
+    }
+
+    students_stamp, sessions_stamp, session_ids = await asyncio.gather(
+        _stamp(Student.get_motor_collection(), student_match, "updated_at"),
+        _stamp(Session.get_motor_collection(), session_match, "created_at", "updated_at"),
+        Session.get_motor_collection().distinct("_id", session_match)
+    )
+
+    attendance_stamp = await _stamp(
+        Attendance.get_motor_collection(),
+        {"session.$id": {"$in": session_ids}},
+        "updated_at"
+    )
+
+    return f"students:{students_stamp}|sessions:{sessions_stamp}|attendance:{attendance_stamp}"
+
+
+def _sheet_name(subject) -> str:
+    full_name = f"{subject.subject_name} {subject.component}"
+
+    if len(full_name) > 31:
+        words = subject.subject_name.split()
+        acronym = "".join(word[0].upper() for word in words if word)
+        full_name = f"{acronym} {subject.component}"
+
+    return full_name[:31]
+
+
+def _report_styles() -> List[NamedStyle]:
+    border = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin")
+    )
+    center = Alignment(horizontal="center", vertical="center")
+
+    return [
+        NamedStyle(
+            name="report_header", border=border, alignment=center,
+            fill=PatternFill("solid", fgColor="366092"),
+            font=Font(color="FFFFFF", bold=True)
+        ),
+        NamedStyle(name="report_cell", border=border, alignment=center),
+        NamedStyle(
+            name="report_present", border=border, alignment=center,
+            fill=PatternFill("solid", fgColor="C6EFCE"),
+            font=Font(color="006100")
+        ),
+        NamedStyle(
+            name="report_absent", border=border, alignment=center,
+            fill=PatternFill("solid", fgColor="FFC7CE"),
+            font=Font(color="9C0006")
+        ),
+    ]
+
+
+def render_excel(
+    path: str,
+    rolls: list,
+    names: list,
+    reports: List[SubjectReport],
+    progress: Optional[ProgressCallback] = None
+):
+    """
+    Streams the workbook to `path` with openpyxl's write_only mode; rows
+    are written as they are produced and styled through named styles, so
+    memory stays flat however many students and dates there are.
+    """
+    wb = Workbook(write_only=True)
+    for style in _report_styles():
+        wb.add_named_style(style)
+
+    roll_width = max((len(str(r)) for r in rolls if r is not None), default=0)
+    name_width = max((len(n) for n in names), default=0)
+
+    for index, report in enumerate(reports):
+        ws = wb.create_sheet(title=_sheet_name(report.subject))
+
+        # widths have to be known before the first row in write_only mode
+        ws.column_dimensions["A"].width = max(roll_width, len("Roll No")) + 3
+        ws.column_dimensions["B"].width = max(name_width, len("Name")) + 3
+        for c in range(3, report.total + 3):
+            ws.column_dimensions[get_column_letter(c)].width = 13
+        for offset, width in enumerate([len("Total"), len("Present"), len("100.0%")]):
+            ws.column_dimensions[get_column_letter(report.total + 3 + offset)].width = width + 3
+
+        ws.freeze_panes = "C2"
+
+        header = []
+        for value in report.header():
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = "report_header"
+            header.append(cell)
+        ws.append(header)
+
+        last_mark = 2 + report.total
+        for row in report.rows(rolls, names):
+            cells = []
+            for c, value in enumerate(row, start=1):
+                cell = WriteOnlyCell(ws, value=value)
+                if 3 <= c <= last_mark:
+                    cell.style = "report_present" if value == "P" else "report_absent"
+                else:
+                    cell.style = "report_cell"
+                cells.append(cell)
+            ws.append(cells)
+
+        if progress:
+            progress(index + 1, report.subject.subject_name)
+
+    wb.save(path)
+
+
+def render_pdf(
+    path: str,
+    rolls: list,
+    names: list,
+    reports: List[SubjectReport],
+    progress: Optional[ProgressCallback] = None
+):
+    doc = SimpleDocTemplate(path, pagesize=landscape(A4))
+    elements = []
+    styles = getSampleStyleSheet()
+
+    table_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#366092")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ALIGN", (2, 1), (-1, -1), "CENTER")
+    ])
+
+    for index, report in enumerate(reports):
+        subject = report.subject
+        elements.append(Paragraph(
+            f"{subject.subject_name} - {subject.component}",
+            styles["Heading2"]
+        ))
+        elements.append(Spacer(1, 12))
+
+        header = report.header()
+        rows = list(report.rows(rolls, names))
+
+        for start in range(0, len(rows), PDF_CHUNK_ROWS):
+            table = Table([header, *rows[start:start + PDF_CHUNK_ROWS]], repeatRows=1)
+            table.setStyle(table_style)
+            elements.append(table)
+
+        elements.append(Spacer(1, 24))
+
+        if progress:
+            progress(index + 1, subject.subject_name)
+
+    doc.build(elements)
@@ -1,9 +1,12 @@
 import json
 import datetime
+import orjson
 from bson import ObjectId
 from decimal import Decimal
 from uuid import UUID
 from enum import Enum
+from fastapi.responses import JSONResponse
+from pydantic import AnyUrl
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -36,4 +39,43 @@ class JSONEncoder(json.JSONEncoder):
         if isinstance(obj, set):
             return list(obj)
 
-        return super().default(obj)
\ No newline at end of file
+        return super().default(obj)
+
+
+# orjson path: datetime, date, time, UUID and Enum are native, the rest
+# matches JSONEncoder above
+def _orjson_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+
+    if isinstance(obj, Decimal):
+        return float(obj)
+
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8")
+
+    if isinstance(obj, set):
+        return list(obj)
+
+    if isinstance(obj, AnyUrl):
+        return str(obj)
+
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+loads = orjson.loads
+
+# already serialized JSON, embedded as is when dumped, e.g. a cache hit:
+#   FastJSONResponse({"success": True, "data": RawJSON(cached)})
+RawJSON = orjson.Fragment
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; understands Mongo types and RawJSON."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,82 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from beanie import Link
+from beanie.operators import In
+
+# Batched replacement for fetch_links=True / per-document link.fetch():
+# the Links found at a path on all documents are grouped by collection and
+# each collection is read with a single $in query.
+
+
+def _owners(documents: Iterable, parents: list) -> list:
+    owners = list(documents)
+    for name in parents:
+        owners = [getattr(owner, name, None) for owner in owners]
+        owners = [owner for owner in owners if owner is not None and not isinstance(owner, Link)]
+    return owners
+
+
+async def _fetch(model, ids: list, projection: Optional[dict]) -> list:
+    if projection is None:
+        return await model.find(In(model.id, ids)).to_list()
+
+    # projected documents are built without validation, only the projected
+    # fields (and id) are set; they are for reading, never save them
+    raw = await model.get_motor_collection().find({"_id": {"$in": ids}}, projection).to_list(None)
+    return [model.model_construct(id=doc.pop("_id"), **doc) for doc in raw]
+
+
+async def load_links(documents: Iterable, *paths: str, projections: Optional[Dict[str, dict]] = None) -> None:
+    """
+    Resolves the Link fields at `paths` in place on every document, e.g.
+
+        await load_links(sessions, "subject", "teacher")
+        await load_links(exceptions, "session", "session.subject")
+
+    Dotted paths walk through links resolved by an earlier path. Fields
+    holding a list of Links are resolved element-wise. `projections` maps a
+    path to a Mongo projection to read only those fields. Links whose
+    target no longer exists are left as they are.
+    """
+    documents = list(documents)
+    projections = projections or {}
+
+    for path in paths:
+        *parents, field = path.split(".")
+        owners = _owners(documents, parents)
+
+        ids_by_model = defaultdict(set)
+        for owner in owners:
+            value = getattr(owner, field, None)
+            for link in value if isinstance(value, list) else [value]:
+                if isinstance(link, Link):
+                    ids_by_model[link.document_class].add(link.ref.id)
+
+        if not ids_by_model:
+            continue
+
+        models = list(ids_by_model)
+        results = await asyncio.gather(*(
+            _fetch(model, list(ids_by_model[model]), projections.get(path))
+            for model in models
+        ))
+
+        loaded = {
+            (model, doc.id): doc
+            for model, docs in zip(models, results)
+            for doc in docs
+        }
+
+        def resolve(link):
+            if not isinstance(link, Link):
+                return link
+            return loaded.get((link.document_class, link.ref.id), link)
+
+        for owner in owners:
+            value = getattr(owner, field, None)
+            if isinstance(value, list):
+                setattr(owner, field, [resolve(link) for link in value])
+            elif isinstance(value, Link):
+                setattr(owner, field, resolve(value))
@@ -0,0 +1,126 @@
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.core.redis import get_redis_client
+from app.utils.redis_pub_sub import publish_to_channel
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# One hash per day: field = attendance id, value = JSON entry.
+# Entries are dropped lazily once their end_time has passed and the
+# whole hash expires the morning after.
+LIVE_BOARD_PREFIX = "live_board:"
+LIVE_BOARD_CHANNEL = "live_board:events"
+
+# keeps the hash alive after the last entry of the day has ended
+BOARD_MARKER_FIELD = "_board"
+
+
+def live_board_key(day: date) -> str:
+    return f"{LIVE_BOARD_PREFIX}{day.isoformat()}"
+
+
+def _board_day(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+async def add_live_entry(attendance, subject=None, teacher=None):
+    """Called by the session worker once the day's Attendance exists."""
+    day = _board_day(attendance.effective_date or attendance.date)
+    key = live_board_key(day)
+
+    entry = {
+        "session_id": str(attendance.id),
+        "subject_name": getattr(subject, "subject_name", None),
+        "session_type": getattr(subject, "component", None) or "Lecture",
+        "teacher_id": str(attendance.teacher_id) if attendance.teacher_id else None,
+        "teacher_name": (
+            f"{teacher.first_name} {teacher.last_name}"
+            if getattr(teacher, "first_name", None) else " "
+        ),
+        "start_time": attendance.start_time,
+        "end_time": attendance.end_time,
+        "present_students": attendance.present_count,
+        "total_students": attendance.total,
+    }
+
+    redis = await get_redis_client()
+    pipe = redis.pipeline()
+    pipe.hset(key, mapping={BOARD_MARKER_FIELD: "1", entry["session_id"]: json.dumps(entry)})
+    pipe.expireat(key, datetime.combine(day + timedelta(days=1), time(6, 0), tzinfo=IST))
+    await pipe.execute()
+
+    await publish_to_channel(LIVE_BOARD_CHANNEL, {"event": "upsert", "entry": entry})
+
+
+async def update_live_counts(attendance_id, day, present_students: int, total_students: int):
+    """Refresh the counts after attendance is marked; no-op if the session is not on the board."""
+    key = live_board_key(_board_day(day))
+    field = str(attendance_id)
+
+    redis = await get_redis_client()
+    raw = await redis.hget(key, field)
+    if not raw:
+        return
+
+    entry = json.loads(raw)
+    entry["present_students"] = present_students
+    entry["total_students"] = total_students
+
+    await redis.hset(key, field, json.dumps(entry))
+    await publish_to_channel(LIVE_BOARD_CHANNEL, {"event": "upsert", "entry": entry})
+
+
+async def read_live_board(now: Optional[datetime] = None) -> Optional[list]:
+    """
+    Sessions running right now, or None when today's board does not exist
+    (nothing scheduled yet, or Redis was flushed).
+    """
+    now = now or datetime.now(tz=IST)
+    current_time_str = now.strftime("%H:%M")
+    key = live_board_key(now.date())
+
+    redis = await get_redis_client()
+    raw_entries = await redis.hgetall(key)
+    if not raw_entries:
+        return None
+
+    live, ended, seen = [], [], set()
+    for field, raw in raw_entries.items():
+        if field == BOARD_MARKER_FIELD:
+            continue
+
+        entry = json.loads(raw)
+        start_time, end_time = entry.get("start_time"), entry.get("end_time")
+
+        if end_time and end_time <= current_time_str:
+            ended.append(field)
+            continue
+        if not start_time or start_time > current_time_str:
+            continue
+
+        # same teacher + slot twice (e.g. a swap), keep one
+        slot = (entry.get("teacher_id"), start_time, end_time)
+        if slot in seen:
+            continue
+        seen.add(slot)
+
+        live.append({
+            "session_id": entry["session_id"],
+            "subject_name": entry.get("subject_name"),
+            "teacher_name": entry.get("teacher_name"),
+            "total_students": entry.get("total_students", 0),
+            "present_students": entry.get("present_students", 0),
+            "session_type": entry.get("session_type") or "Lecture",
+        })
+
+    if ended:
+        await redis.hdel(key, *ended)
+        for field in ended:
+            await publish_to_channel(LIVE_BOARD_CHANNEL, {"event": "remove", "session_id": field})
+
+    return live
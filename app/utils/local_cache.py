@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.utils.cache_tags import CACHE_EVENTS_CHANNEL
+from app.utils.redis_pub_sub import subscribe_to_channel
+
+logger = logging.getLogger("app.utils.local_cache")
+
+# In-process tier in front of Redis for hot, rarely changing data
+# (metadata, programs, departments, timetables). Entries carry the same
+# tags as their Redis copy and are evicted by the cache:events listener,
+# so a write on any instance clears every API process within one pub/sub
+# hop. The short local TTL bounds staleness if an event is missed.
+LOCAL_CACHE_MAX_ENTRIES = 2048
+
+
+class LocalCache:
+
+    def __init__(self, max_entries: int = LOCAL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        # bumped on every eviction; a fill that started before an eviction
+        # may have read the old value from Redis and is not stored
+        self.epoch = 0
+        # only serve from memory while evictions are being received
+        self.enabled = False
+
+    def get(self, key: str) -> Any:
+        """The value, or None if absent or expired (None is never stored)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str], epoch: int):
+        if not self.enabled or epoch != self.epoch:
+            return
+
+        tags = tuple(set(tags))
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for name in tags:
+            self._by_tag.setdefault(name, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def evict_tags(self, tags: Iterable[str]) -> int:
+        self.epoch += 1
+        keys = set()
+        for name in tags:
+            keys |= self._by_tag.get(name, set())
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def clear(self):
+        self.epoch += 1
+        self._entries.clear()
+        self._by_tag.clear()
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for name in entry[2]:
+            keys = self._by_tag.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[name]
+
+
+local_cache = LocalCache()
+
+_listener: Optional[asyncio.Task] = None
+
+
+async def _listen():
+    while True:
+        try:
+            async with subscribe_to_channel(CACHE_EVENTS_CHANNEL) as pubsub:
+                # whatever changed while we were not subscribed is unknown
+                local_cache.clear()
+                local_cache.enabled = True
+
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=15.0)
+                    if not message:
+                        continue
+                    event = json.loads(message["data"])
+                    local_cache.evict_tags(event.get("tags", []))
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Cache event listener failed, retrying: {e}")
+        finally:
+            local_cache.enabled = False
+            local_cache.clear()
+
+        await asyncio.sleep(2)
+
+
+def start_local_cache():
+    """Called from the app lifespan; without it the local tier stays off."""
+    global _listener
+    if _listener is None:
+        _listener = asyncio.create_task(_listen())
+
+
+async def stop_local_cache():
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
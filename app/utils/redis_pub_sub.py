@@ -63,9 +63,5 @@ async def subscribe_to_channel(channel_name: str):
                 logger.info(f"[subscribe_to_channel] Unsubscribed from {channel_name}")
             except Exception as e:
                 logger.error(f"[subscribe_to_channel] Error during cleanup: {str(e)}")
-        if redis_client:
-            try:
-                await redis_client.close()
-                logger.info(f"[subscribe_to_channel] Redis client closed")
-            except Exception as e:
-                logger.error(f"[subscribe_to_channel] Error closing Redis client: {str(e)}")
\ No newline at end of file
+        # redis_client is the shared app client, pubsub.close() already
+        # returned its dedicated connection
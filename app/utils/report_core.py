@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from app.utils.attendance_bits import BitsValue
+
+# Shared core of the class attendance reports: every subject becomes a
+# students × dates uint8 matrix (1 = present) and the totals are computed
+# column-wise, so the Excel and PDF renderers only serialize.
+
+
+@dataclass
+class SubjectReport:
+    subject: object
+    dates: List[date]
+    matrix: np.ndarray          # (students, dates) uint8
+    present: np.ndarray         # (students,) present count
+    percent: np.ndarray         # (students,) float
+
+    @property
+    def total(self) -> int:
+        return len(self.dates)
+
+    def header(self) -> list:
+        return ["Roll No", "Name"] + \
+               [d.strftime("%d-%m-%Y") for d in self.dates] + \
+               ["Total", "Present", "%"]
+
+    def rows(self, rolls: list, names: list) -> Iterable[list]:
+        """One report row per student: roll, name, P/A per date, totals."""
+        marks = np.where(self.matrix == 1, "P", "A").tolist()
+        present = self.present.tolist()
+        percent = self.percent.tolist()
+        total = self.total
+
+        for i, student_marks in enumerate(marks):
+            yield [rolls[i], names[i], *student_marks, total, present[i], f"{percent[i]:.1f}%"]
+
+
+def decode_bits(value: BitsValue, total: int, student_count: int) -> np.ndarray:
+    """One attendance's students field → uint8 vector of length student_count."""
+    if isinstance(value, str):
+        bits = np.frombuffer(value.strip().encode(), dtype=np.uint8) - ord("0")
+    else:
+        bits = np.unpackbits(np.frombuffer(bytes(value), dtype=np.uint8))
+        if total:
+            bits = bits[:total]
+
+    row = np.zeros(student_count, dtype=np.uint8)
+    n = min(len(bits), student_count)
+    row[:n] = bits[:n]
+    return row
+
+
+def build_subject_report(subject, attendances: List[dict], student_count: int) -> SubjectReport:
+    """
+    attendances: raw documents with date, students and total. Unmarked
+    ones are skipped; two on the same date keep the later one.
+    """
+    columns: Dict[date, np.ndarray] = {}
+    for att in attendances:
+        if not att.get("students"):
+            continue
+        columns[att["date"].date()] = decode_bits(att["students"], att.get("total"), student_count)
+
+    dates = sorted(columns)
+
+    if dates:
+        matrix = np.stack([columns[d] for d in dates], axis=1)
+    else:
+        matrix = np.zeros((student_count, 0), dtype=np.uint8)
+
+    present = matrix.sum(axis=1, dtype=np.int64)
+    percent = present / len(dates) * 100 if dates else np.zeros(student_count)
+
+    return SubjectReport(
+        subject=subject,
+        dates=dates,
+        matrix=matrix,
+        present=present,
+        percent=percent,
+    )
+
+
+def build_class_report(
+    subject_map: dict,
+    subject_sessions_map: Dict[str, list],
+    attendance_map: Dict[str, List[dict]],
+    student_count: int
+) -> List[SubjectReport]:
+    """One SubjectReport per subject, in subject_map order."""
+    reports = []
+    for subject_id, subject in subject_map.items():
+        attendances = [
+            att
+            for sid in subject_sessions_map.get(subject_id, [])
+            for att in attendance_map.get(str(sid), [])
+        ]
+        reports.append(build_subject_report(subject, attendances, student_count))
+    return reports
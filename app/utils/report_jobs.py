@@ -0,0 +1,104 @@
+import time
+import uuid
+from typing import Optional
+
+from app.core.redis import get_redis_client
+from app.utils.redis_pub_sub import publish_to_channel
+
+# Report generation runs in worker_report; the job's state lives in a
+# Redis hash and every change is also published for SSE listeners.
+REPORT_JOB_PREFIX = "report_job:"
+REPORT_PROGRESS_PREFIX = "report_progress:"
+REPORT_JOB_TTL_SECONDS = 24 * 60 * 60
+
+# Last job per (class, file type) and the data watermark it was built
+# from; expires before the uploaded file is deleted (24 h after upload).
+REPORT_CACHE_PREFIX = "report_cache:"
+REPORT_CACHE_TTL_SECONDS = 23 * 60 * 60
+
+FINAL_STATUSES = {"complete", "failed"}
+
+
+def report_job_key(job_id: str) -> str:
+    return f"{REPORT_JOB_PREFIX}{job_id}"
+
+
+def report_cache_key(department: str, program: str, semester: int, batch_year: int, file_type: str) -> str:
+    return f"{REPORT_CACHE_PREFIX}{department}:{program}:{semester}:{batch_year}:{file_type}"
+
+
+def report_progress_channel(job_id: str) -> str:
+    return f"{REPORT_PROGRESS_PREFIX}{job_id}"
+
+
+async def create_report_job(params: dict, requested_by: Optional[str]) -> str:
+    job_id = uuid.uuid4().hex
+
+    redis = await get_redis_client()
+    key = report_job_key(job_id)
+    pipe = redis.pipeline()
+    pipe.hset(key, mapping={
+        "job_id": job_id,
+        "status": "queued",
+        "progress": 0,
+        "message": "Waiting for a report worker",
+        "requested_by": requested_by or "",
+        "created_at": int(time.time()),
+        **{k: str(v) for k, v in params.items()},
+    })
+    pipe.expire(key, REPORT_JOB_TTL_SECONDS)
+    await pipe.execute()
+
+    return job_id
+
+
+async def update_report_job(job_id: str, status: str, progress: int, message: str, **fields):
+    event = {
+        "job_id": job_id,
+        "status": status,
+        "progress": progress,
+        "message": message,
+        **fields,
+    }
+
+    redis = await get_redis_client()
+    await redis.hset(report_job_key(job_id), mapping={
+        k: str(v) for k, v in event.items() if v is not None
+    })
+    await publish_to_channel(report_progress_channel(job_id), event)
+
+
+async def get_report_job(job_id: str) -> Optional[dict]:
+    redis = await get_redis_client()
+    job = await redis.hgetall(report_job_key(job_id))
+    if not job:
+        return None
+
+    job["progress"] = int(job.get("progress") or 0)
+    return job
+
+
+async def find_cached_report_job(cache_key: str, watermark: str) -> Optional[dict]:
+    """
+    The job already built (or still building) this report from the same
+    data, or None. Failed or expired jobs are not reused.
+    """
+    redis = await get_redis_client()
+    cached = await redis.hgetall(cache_key)
+    if not cached or cached.get("watermark") != watermark:
+        return None
+
+    job = await get_report_job(cached["job_id"])
+    if not job or job.get("status") == "failed":
+        return None
+
+    return job
+
+
+async def remember_report_job(cache_key: str, watermark: str, job_id: str):
+    redis = await get_redis_client()
+    pipe = redis.pipeline()
+    pipe.delete(cache_key)
+    pipe.hset(cache_key, mapping={"watermark": watermark, "job_id": job_id})
+    pipe.expire(cache_key, REPORT_CACHE_TTL_SECONDS)
+    await pipe.execute()
@@ -0,0 +1,198 @@
+import json
+from datetime import date, datetime
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from beanie import Link
+
+from app.core.redis import get_redis_client
+from app.schemas.exception_session import ExceptionSession
+from app.schemas.session import Session
+from app.utils.cache_tags import cache_set, class_tag
+from app.utils.link_loader import load_links
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# One JSON list per class and date: the sessions that actually take place,
+# with Cancel / Reschedule / swap / Add exceptions already applied.
+# Tagged schedule:{department}:{program}:{semester}; timetable.changed and
+# exception.changed events drop the plans of the classes they touch.
+DAY_PLAN_PREFIX = "day_plan:"
+DAY_PLAN_TTL_SECONDS = 36 * 60 * 60
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def day_plan_key(department: str, program: str, semester, academic_year, day) -> str:
+    return f"{DAY_PLAN_PREFIX}{department}:{program}:{semester}:{academic_year}:{_as_date(day).isoformat()}"
+
+
+def _id(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, Link):
+        return str(value.ref.id)
+    return str(value.id)
+
+
+def _entry(session, start_time, end_time, subject, teacher, exception=None, swap_pending=False) -> dict:
+    loaded_subject = subject if not isinstance(subject, Link) else None
+    loaded_teacher = teacher if not isinstance(teacher, Link) else None
+
+    return {
+        "session_id": str(exception.id) if exception and exception.action == "Add" else str(session.id),
+        "exception_id": str(exception.id) if exception else None,
+        "action": exception.action if exception else None,
+        "swap_role": exception.swap_role if exception else None,
+        "is_added": bool(exception and exception.action == "Add"),
+        "swap_pending": swap_pending,
+        "start_time": start_time,
+        "end_time": end_time,
+        "subject_id": _id(subject),
+        "subject_name": getattr(loaded_subject, "subject_name", None),
+        "subject_code": getattr(loaded_subject, "subject_code", None),
+        "component": getattr(loaded_subject, "component", None),
+        "teacher_id": _id(teacher),
+        "teacher_name": (
+            f"{loaded_teacher.first_name} {loaded_teacher.last_name}"
+            if getattr(loaded_teacher, "first_name", None) else None
+        ),
+    }
+
+
+async def build_day_plan(department: str, program: str, semester: str, academic_year: str, day: date) -> List[dict]:
+    """Straight from Mongo; use get_day_plan."""
+    weekday = day.strftime("%A")
+
+    # every active session of the class: today's, plus the ones a swap may
+    # move onto this date
+    class_sessions = await Session.find(
+        Session.department == department,
+        Session.program == program,
+        Session.semester == semester,
+        Session.academic_year == academic_year,
+        Session.is_active == True
+    ).to_list()
+
+    if not class_sessions:
+        return []
+
+    sessions_by_id = {s.id: s for s in class_sessions}
+    subject_ids = list({s.subject.ref.id for s in class_sessions})
+
+    day_start = datetime.combine(day, datetime.min.time()).replace(tzinfo=IST)
+    day_end = datetime.combine(day, datetime.max.time()).replace(tzinfo=IST)
+
+    exceptions = await ExceptionSession.find({
+        "date": {"$gte": day_start, "$lte": day_end},
+        "$or": [
+            {"session.$id": {"$in": list(sessions_by_id)}},
+            {"action": "Add", "subject.$id": {"$in": subject_ids}}
+        ]
+    }).to_list()
+
+    await load_links(exceptions, "swap_id", projections={"swap_id": {"status": 1}})
+
+    cancelled = set()
+    swap_pending = set()
+    rescheduled = {}
+    swap_targets = []
+    added = []
+
+    for ex in exceptions:
+        # swaps only count once approved; a pending reschedule keeps the
+        # session where it is but flags it so the scheduler waits for the
+        # answer. A pending extra lecture (Add) is simply not planned yet:
+        # its session is the teacher's regular one, which still runs.
+        if ex.swap_id and (isinstance(ex.swap_id, Link) or ex.swap_id.status != "APPROVED"):
+            if (
+                ex.action == "Reschedule"
+                and ex.session
+                and not isinstance(ex.swap_id, Link)
+                and ex.swap_id.status == "PENDING"
+            ):
+                swap_pending.add(ex.session.ref.id)
+            continue
+
+        if ex.action == "Add":
+            added.append(ex)
+            continue
+
+        if not ex.session:
+            continue
+
+        session_id = ex.session.ref.id
+
+        if ex.action == "Cancel":
+            cancelled.add(session_id)
+
+        elif ex.action == "Reschedule":
+            rescheduled[session_id] = ex
+            if ex.swap_role == "TARGET":
+                swap_targets.append(session_id)
+
+    planned = [
+        s for s in class_sessions
+        if s.day == weekday and s.id not in cancelled
+    ]
+    planned_ids = {s.id for s in planned}
+    planned += [
+        sessions_by_id[session_id] for session_id in swap_targets
+        if session_id not in planned_ids and session_id not in cancelled
+    ]
+
+    await load_links(
+        [*planned, *added], "subject", "teacher", "created_by",
+        projections={
+            "subject": {"subject_name": 1, "subject_code": 1, "component": 1},
+            "teacher": {"first_name": 1, "last_name": 1},
+            "created_by": {"first_name": 1, "last_name": 1},
+        }
+    )
+
+    plan = []
+    for session in planned:
+        ex = rescheduled.get(session.id)
+        plan.append(_entry(
+            session,
+            ex.start_time if ex else session.start_time,
+            ex.end_time if ex else session.end_time,
+            session.subject,
+            session.teacher,
+            ex,
+            swap_pending=session.id in swap_pending
+        ))
+
+    for ex in added:
+        plan.append(_entry(ex, ex.start_time, ex.end_time, ex.subject, ex.created_by, ex))
+
+    plan.sort(key=lambda entry: entry["start_time"] or "")
+    return plan
+
+
+async def get_day_plan(department: str, program: str, semester, academic_year, day) -> List[dict]:
+    """
+    The effective sessions of a class on `day`, sorted by start time. Each
+    entry has session_id (the exception id for Add), exception_id, action,
+    swap_role, is_added, swap_pending, start/end time, subject
+    id/name/code/component and teacher id/name.
+    """
+    day = _as_date(day)
+    semester, academic_year = str(semester), str(academic_year)
+    key = day_plan_key(department, program, semester, academic_year, day)
+
+    redis = await get_redis_client()
+    cached = await redis.get(key)
+    if cached:
+        return json.loads(cached)
+
+    plan = await build_day_plan(department, program, semester, academic_year, day)
+    await cache_set(
+        key, json.dumps(plan), DAY_PLAN_TTL_SECONDS,
+        tags=[class_tag("schedule", department, program, semester)]
+    )
+    return plan
@@ -1,10 +1,39 @@
 from app.core.config import settings  
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
+import asyncio
+import os
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
+
+# bcrypt releases the GIL, so hashing threads run on separate cores while
+# the event loop keeps serving other requests. The semaphore bounds the
+# work handed to the pool; the rest waits on the loop, where it can be
+# cancelled with its request.
+PASSWORD_HASH_WORKERS = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password_hash"
+)
+_hash_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+
+_hash_stats = {
+    "hash_count": 0,
+    "verify_count": 0,
+    "waiting": 0,
+    "running": 0,
+    "wait_seconds": 0.0,
+    "run_seconds": 0.0,
+}
 
 # Secret config from env
 SECRET_KEY = settings.SECRET_KEY
@@ -12,11 +41,51 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = 30   
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# -------- PASSWORD HASHING --------
+def _finish_hash(kind: str, started_at: float):
+    _hash_stats["running"] -= 1
+    _hash_stats["run_seconds"] += time.perf_counter() - started_at
+    _hash_stats[f"{kind}_count"] += 1
+    _hash_slots.release()
+
+
+async def _run_hash(kind: str, fn, *args):
+    loop = asyncio.get_running_loop()
+    queued_at = time.perf_counter()
+
+    _hash_stats["waiting"] += 1
+    try:
+        await _hash_slots.acquire()
+    finally:
+        _hash_stats["waiting"] -= 1
+
+    started_at = time.perf_counter()
+    _hash_stats["wait_seconds"] += started_at - queued_at
+    _hash_stats["running"] += 1
+
+    # the slot is given back when the thread is done, even if the request
+    # awaiting it was cancelled meanwhile
+    job = _hash_executor.submit(fn, *args)
+    job.add_done_callback(lambda _: loop.call_soon_threadsafe(_finish_hash, kind, started_at))
+    return await asyncio.wrap_future(job, loop=loop)
+
+
+async def verify_password(plain_password, hashed_password):
+    return await _run_hash("verify", pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await _run_hash("hash", pwd_context.hash, password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+def password_hash_stats() -> dict:
+    """Counters since start of this process, for the admin-only /admin/password-hashing-metrics route."""
+    done = _hash_stats["hash_count"] + _hash_stats["verify_count"]
+    return {
+        **_hash_stats,
+        "workers": PASSWORD_HASH_WORKERS,
+        "rounds": settings.PASSWORD_HASH_ROUNDS,
+        "avg_wait_ms": round(_hash_stats["wait_seconds"] / done * 1000, 2) if done else 0.0,
+        "avg_run_ms": round(_hash_stats["run_seconds"] / done * 1000, 2) if done else 0.0,
+    }
 
 # -------- TOKEN CREATION --------
 def create_access_token(data: dict):
@@ -0,0 +1,31 @@
+from datetime import date as dt_date, datetime, time
+from typing import Optional
+from bson import ObjectId
+
+from app.schemas.teacher_daily_stats import TeacherDailyStats
+
+
+def day_bucket(value) -> datetime:
+    """Midnight of the given date / datetime, the key the counters are stored under."""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, dt_date):
+        return datetime.combine(value, time.min)
+    raise ValueError(f"Cannot bucket {type(value)} by day")
+
+
+async def increment_teacher_daily_stats(
+    teacher_id: ObjectId,
+    day,
+    program: Optional[str] = None,
+    **increments: int
+):
+    increments = {field: value for field, value in increments.items() if value}
+    if not teacher_id or not increments:
+        return
+
+    await TeacherDailyStats.get_motor_collection().update_one(
+        {"teacher_id": teacher_id, "date": day_bucket(day), "program": program},
+        {"$inc": increments},
+        upsert=True
+    )
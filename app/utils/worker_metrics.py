@@ -0,0 +1,197 @@
+import asyncio
+import os
+import socket
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aio_pika
+from app.core.redis import get_redis_client
+
+logger = logging.getLogger("app.utils.worker_metrics")
+
+WORKER_METRICS_PREFIX = "worker_metrics:"
+WORKER_METRICS_INDEX = "worker_metrics:instances"
+
+PUBLISH_INTERVAL_SECONDS = 10
+WINDOW_SECONDS = 60
+MAX_SAMPLES = 5000
+
+
+def _parse_value(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class WorkerMetrics:
+    """
+    Per-process handler stats for a queue worker.
+
+    Handlers are wrapped with `track()`; a background task publishes a
+    snapshot (queue depth, rate, latency percentiles, in-flight, error rate)
+    to the Redis hash `worker_metrics:{worker}:{host}:{pid}` every few seconds.
+    """
+
+    def __init__(self, worker_name: str, queue_name: Optional[str] = None):
+        self.worker_name = worker_name
+        self.queue_name = queue_name
+        self.instance = f"{socket.gethostname()}:{os.getpid()}"
+        self.key = f"{WORKER_METRICS_PREFIX}{worker_name}:{self.instance}"
+        self.started_at = time.time()
+
+        self.in_flight = 0
+        self.total_processed = 0
+        self.total_errors = 0
+
+        # worker specific values, e.g. change stream lag
+        self.gauges: dict = {}
+
+        # (finished_at, latency_seconds, failed)
+        self._samples: deque = deque(maxlen=MAX_SAMPLES)
+        self._publisher: Optional[asyncio.Task] = None
+
+    # ---------------- RECORDING ----------------
+    @asynccontextmanager
+    async def track(self):
+        self.in_flight += 1
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.in_flight -= 1
+            self._record(time.perf_counter() - started, failed)
+
+    def record_error(self):
+        """Mark a failure that the handler caught and swallowed itself."""
+        self.total_errors += 1
+        self._samples.append((time.time(), None, True))
+
+    def set_gauge(self, name: str, value):
+        self.gauges[name] = value
+
+    def _record(self, latency: float, failed: bool):
+        self.total_processed += 1
+        if failed:
+            self.total_errors += 1
+        self._samples.append((time.time(), latency, failed))
+
+    # ---------------- SNAPSHOT ----------------
+    def snapshot(self) -> dict:
+        cutoff = time.time() - WINDOW_SECONDS
+        window = [s for s in self._samples if s[0] >= cutoff]
+
+        latencies = sorted(s[1] for s in window if s[1] is not None)
+        errors = sum(1 for s in window if s[2])
+        handled = len(latencies)
+
+        return {
+            **self.gauges,
+            "worker": self.worker_name,
+            "instance": self.instance,
+            "queue": self.queue_name or "",
+            "in_flight": self.in_flight,
+            "messages_per_sec": round(handled / WINDOW_SECONDS, 3),
+            "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+            "latency_p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "error_rate": round(errors / handled, 4) if handled else 0.0,
+            "window_seconds": WINDOW_SECONDS,
+            "total_processed": self.total_processed,
+            "total_errors": self.total_errors,
+            "uptime_seconds": int(time.time() - self.started_at),
+        }
+
+    # ---------------- PUBLISHING ----------------
+    async def _queue_depth(self, connection) -> dict:
+        """
+        Passive declare on a throwaway channel: a missing queue closes the
+        channel, so it must not be the one the consumer is using.
+        """
+        if not self.queue_name or connection is None:
+            return {}
+
+        channel = await connection.channel()
+        try:
+            queue = await channel.declare_queue(self.queue_name, passive=True)
+            result = queue.declaration_result
+            return {
+                "queue_depth": result.message_count,
+                "queue_consumers": result.consumer_count,
+            }
+        finally:
+            if not channel.is_closed:
+                await channel.close()
+
+    async def publish(self, connection: Optional[aio_pika.abc.AbstractConnection] = None):
+        stats = self.snapshot()
+        try:
+            stats.update(await self._queue_depth(connection))
+        except Exception as e:
+            logger.warning(f"[{self.worker_name}] Queue depth unavailable: {e}")
+
+        stats["published_at"] = int(time.time())
+
+        redis = await get_redis_client()
+        pipe = redis.pipeline()
+        pipe.hset(self.key, mapping={k: str(v) for k, v in stats.items()})
+        pipe.expire(self.key, PUBLISH_INTERVAL_SECONDS * 3)
+        pipe.sadd(WORKER_METRICS_INDEX, self.key)
+        await pipe.execute()
+
+    async def _publish_loop(self, connection):
+        while True:
+            try:
+                await self.publish(connection)
+            except Exception as e:
+                logger.warning(f"[{self.worker_name}] Failed to publish metrics: {e}")
+            await asyncio.sleep(PUBLISH_INTERVAL_SECONDS)
+
+    def start(self, connection: Optional[aio_pika.abc.AbstractConnection] = None):
+        if self._publisher is None or self._publisher.done():
+            self._publisher = asyncio.create_task(self._publish_loop(connection))
+        return self._publisher
+
+
+async def read_worker_metrics() -> list[dict]:
+    """Collect the latest snapshot of every live worker instance."""
+    redis = await get_redis_client()
+    keys = await redis.smembers(WORKER_METRICS_INDEX)
+    if not keys:
+        return []
+
+    keys = sorted(keys)
+    pipe = redis.pipeline()
+    for key in keys:
+        pipe.hgetall(key)
+    snapshots = await pipe.execute()
+
+    live, expired = [], []
+    for key, snap in zip(keys, snapshots):
+        if snap:
+            live.append({k: _parse_value(v) for k, v in snap.items()})
+        else:
+            expired.append(key)
+
+    if expired:
+        await redis.srem(WORKER_METRICS_INDEX, *expired)
+
+    return live
@@ -1,19 +1,33 @@
 import asyncio
+import json
 import logging
+import time
+from collections import defaultdict
 from datetime import date
 from decimal import Decimal
-from typing import List, Tuple, Optional
-from decimal import Decimal as PyDecimal
+from typing import Dict, List, Tuple, Optional
 from beanie import Link
-from beanie.operators import Set, AddToSet, Pull
 from app.core.database import init_db
-from bson import ObjectId, DBRef
+from bson import ObjectId, DBRef, Decimal128
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from decimal import Decimal
 from app.schemas.attendance import Attendance
-from app.schemas.student_attendance_summary import StudentAttendanceSummary
+from app.schemas.student_attendance_summary import StudentAttendanceSummary, summary_profile_fields
 from app.schemas.teacher_subject_summary import TeacherSubjectSummary
 from app.schemas.subject_session_stats import SubjectSessionStats
+from app.schemas.daily_attendance_rollup import DailyAttendanceRollup
 from app.schemas.student import Student
+from app.core.redis import get_redis_client
+from app.utils.attendance_bits import diff_bits, to_bitstring
+from app.utils.attendance_categories import (
+    CATEGORY_FIELDS,
+    aggregate_category_counts,
+    attendance_category,
+    summary_percentage,
+)
+from app.utils.teacher_daily_stats import increment_teacher_daily_stats
+from app.utils.worker_metrics import WorkerMetrics
 
 # Logger
 logger = logging.getLogger(__name__)
@@ -22,6 +36,12 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+metrics = WorkerMetrics("worker_attendance")
+
+
+class AttendanceNotApplied(Exception):
+    """The summaries do not reflect the attendance yet; it must be retried."""
+
 
 #############################################
 # 🧠 SMART Bit-Diff Calculator
@@ -53,46 +73,15 @@ def calculate_bit_changes(old_bitstr: str, new_bitstr: str) -> Tuple[bool, List[
     
     # Regular update - find only changed students
     max_len = max(len(old_bitstr), len(new_bitstr))
-    changes = []
-
-    for i in range(max_len):
-        old_bit = old_bitstr[i] if i < len(old_bitstr) else "0"
-        new_bit = new_bitstr[i] if i < len(new_bitstr) else "0"
-
-        was_present = old_bit == "1"
-        is_now_present = new_bit == "1"
-
-        if was_present != is_now_present:
-            changes.append((i, was_present, is_now_present))
-
-    return False, changes
+    return False, diff_bits(old_bitstr, new_bitstr, max_len)
 
 
 #############################################
-# 🧩 OPTIMIZED Updater: Student Attendance Summary
+# 🧩 BULK Updater: Student Attendance Summary
 #############################################
 
-async def update_student_attendance_summary(
-    attendance: Attendance,
-    student: Student,
-    subject: Link,
-    was_present: bool,
-    is_now_present: bool,
-    is_initial_record: bool
-):
-    """
-    Handles updates for StudentAttendanceSummary collection
-    """
-    try:
-        summary = await StudentAttendanceSummary.find_one(
-            StudentAttendanceSummary.student == DBRef("students", student.id),
-            StudentAttendanceSummary.subject == DBRef("subjects", subject.id)
-        )
-    except Exception as e:
-        logger.error(f"🚨 Error querying summary for student {student.id}, subject {subject.id}: {e}")
-        return
-
-    # Calculate deltas
+def calculate_summary_deltas(was_present: bool, is_now_present: bool, is_initial_record: bool) -> Tuple[int, int]:
+    """Returns (total_classes_delta, attended_delta) for one student."""
     total_classes_delta = 1 if is_initial_record else 0
     attended_delta = 0
 
@@ -104,84 +93,275 @@ async def update_student_attendance_summary(
         elif not was_present and is_now_present:
             attended_delta = 1
 
-    attendance_ref = DBRef("attendances", attendance.id)
+    return total_classes_delta, attended_delta
 
-    if not summary:
-        # Create new summary
-        total_classes = 1 if is_initial_record else 0
-        attended = 1 if (is_initial_record and is_now_present) else 0
-        percentage = round((attended / total_classes * 100) if total_classes > 0 else 0.0, 2)
 
-        summary = StudentAttendanceSummary(
-            student=student,
-            subject=subject,
-            total_classes=total_classes,
-            attended=attended,
-            percentage=percentage,
-            sessions_present=[attendance.id] if is_now_present else [],
-            created_at=attendance.created_at or None,
-            updated_at=attendance.updated_at or None
-        )
-        try:
-            await summary.insert()
-            logger.info(f"📝 Created StudentAttendanceSummary for student {student.id}, subject {subject.id}")
-        except Exception as e:
-            logger.error(f"🚨 Error inserting summary for student {student.id}, subject {subject.id}: {e}")
-    else:
-        # Update existing summary - ONLY if there are actual changes
-        new_total = summary.total_classes + total_classes_delta
-        new_attended = max(0, summary.attended + attended_delta)
-        new_percentage = round((new_attended / new_total * 100) if new_total > 0 else 0.0, 2)
-
-        # Only update if something actually changed
-        if (new_total != summary.total_classes or 
-            new_attended != summary.attended or 
-            new_percentage != summary.percentage):
-            
-            update_ops = [
-                Set({
-                    StudentAttendanceSummary.total_classes: new_total,
-                    StudentAttendanceSummary.attended: new_attended,
-                    StudentAttendanceSummary.percentage: new_percentage,
-                    StudentAttendanceSummary.updated_at: attendance.updated_at or None,
-                })
+# attendances remembered per summary in counted_sessions; replays only
+# ever concern the last few sessions of a subject
+COUNTED_SESSIONS_KEPT = 32
+
+
+def build_student_summary_update(
+    attendance: Attendance,
+    student: Student,
+    subject: Link,
+    total_classes_delta: int,
+    attended_delta: int
+) -> UpdateOne:
+    """
+    Build one upserting pipeline update for a student's summary.
+    Counters move by deltas and the percentage is recomputed from the
+    stored counters. Each delta is guarded by whether it already shows in
+    the document (attendance ref in counted_sessions / sessions_present),
+    so replaying the same update is a no-op.
+    """
+    attendance_ref = {"$literal": DBRef("attendances", attendance.id)}
+    sessions_present = {"$ifNull": ["$sessions_present", []]}
+    counted_sessions = {"$ifNull": ["$counted_sessions", []]}
+    is_present = {"$in": [attendance_ref, sessions_present]}
+    is_counted = {"$in": [attendance_ref, counted_sessions]}
+
+    total_classes_add = 0
+    if total_classes_delta:
+        total_classes_add = {"$cond": [is_counted, 0, total_classes_delta]}
+        counted_sessions = {
+            "$cond": [
+                is_counted,
+                counted_sessions,
+                {"$slice": [{"$concatArrays": [counted_sessions, [attendance_ref]]}, -COUNTED_SESSIONS_KEPT]}
+            ]
+        }
+
+    attended_add = 0
+    if attended_delta > 0:
+        # $addToSet
+        attended_add = {"$cond": [is_present, 0, attended_delta]}
+        sessions_present = {
+            "$cond": [
+                is_present,
+                sessions_present,
+                {"$concatArrays": [sessions_present, [attendance_ref]]}
             ]
+        }
+    elif attended_delta < 0:
+        # $pull
+        attended_add = {"$cond": [is_present, attended_delta, 0]}
+        sessions_present = {
+            "$filter": {
+                "input": sessions_present,
+                "cond": {"$ne": ["$$this", attendance_ref]}
+            }
+        }
+
+    pipeline = [
+        {
+            "$set": {
+                "total_classes": {"$add": [{"$ifNull": ["$total_classes", 0]}, total_classes_add]},
+                "attended": {"$max": [0, {"$add": [{"$ifNull": ["$attended", 0]}, attended_add]}]},
+                "sessions_present": sessions_present,
+                "counted_sessions": counted_sessions,
+                "created_at": {"$ifNull": ["$created_at", attendance.created_at]},
+                "updated_at": attendance.updated_at,
+                **{
+                    field: {"$literal": value}
+                    for field, value in summary_profile_fields(student, subject).items()
+                },
+            }
+        },
+        {
+            "$set": {
+                "percentage": {
+                    "$cond": [
+                        {"$gt": ["$total_classes", 0]},
+                        {"$round": [{"$multiply": [{"$divide": ["$attended", "$total_classes"]}, 100]}, 2]},
+                        0.0
+                    ]
+                }
+            }
+        }
+    ]
+
+    return UpdateOne(
+        {
+            "student": DBRef("students", student.id),
+            "subject": DBRef("subjects", subject.id)
+        },
+        pipeline,
+        upsert=True
+    )
 
-            if was_present and not is_now_present:
-                update_ops.append(Pull({StudentAttendanceSummary.sessions_present: attendance_ref}))
-            elif not was_present and is_now_present:
-                update_ops.append(AddToSet({StudentAttendanceSummary.sessions_present: attendance_ref}))
 
-            try:
-                await summary.update(*update_ops)
-                logger.info(f"✅ Updated StudentAttendanceSummary for student {student.id}, subject {subject.id}")
-            except Exception as e:
-                logger.error(f"🚨 Error updating summary for student {student.id}, subject {subject.id}: {e}")
-        else:
-            logger.debug(f"🔍 No changes needed for student {student.id}, subject {subject.id}")
+def pending_deltas(current: Optional[dict], total_classes_delta: int, attended_delta: int) -> Tuple[int, int]:
+    """The part of the deltas not yet in the summary, by the same guards as the update."""
+    if not current:
+        return total_classes_delta, attended_delta
+    if current.get("counted"):
+        total_classes_delta = 0
+    if attended_delta > 0 and current.get("present"):
+        attended_delta = 0
+    elif attended_delta < 0 and not current.get("present"):
+        attended_delta = 0
+    return total_classes_delta, attended_delta
+
+
+async def bulk_update_student_attendance_summaries(
+    attendance: Attendance,
+    student_changes: List[Tuple[Student, bool, bool]],
+    subject: Link,
+    is_initial_record: bool
+) -> Tuple[Dict[str, int], int]:
+    """
+    Applies every student's delta for one attendance in a single bulk_write.
+    student_changes: list of (student, was_present, is_now_present)
+    Returns how many students entered (+) or left (-) each category, counting
+    only the written operations, and how many operations failed.
+
+    Safe to replay: deltas already in a summary are skipped, so retrying
+    the attendance after a partial failure only changes the failed students.
+
+    Categories come from counters read before the write. The caller holds
+    the per-subject lock, which serializes this within one worker process
+    only; concurrent workers on the same subject can still make the counters
+    drift until the nightly reconcile recounts them.
+    """
+    category_deltas: Dict[str, int] = defaultdict(int)
+
+    deltas = []
+    for student, was_present, is_now_present in student_changes:
+        total_classes_delta, attended_delta = calculate_summary_deltas(was_present, is_now_present, is_initial_record)
+        if total_classes_delta or attended_delta:
+            deltas.append((student, total_classes_delta, attended_delta))
+
+    if not deltas:
+        logger.debug(f"🔍 No StudentAttendanceSummary changes for attendance {attendance.id}")
+        return category_deltas, 0
+
+    # current counters of the affected students only, to know which
+    # category each one leaves and enters, and whether a replay already
+    # carries this attendance
+    attendance_ref = DBRef("attendances", attendance.id)
+    existing = await StudentAttendanceSummary.get_motor_collection().find(
+        {
+            "subject": DBRef("subjects", subject.id),
+            "student": {"$in": [DBRef("students", student.id) for student, _, _ in deltas]}
+        },
+        {
+            "student": 1,
+            "total_classes": 1,
+            "attended": 1,
+            "present": {"$in": [attendance_ref, {"$ifNull": ["$sessions_present", []]}]},
+            "counted": {"$in": [attendance_ref, {"$ifNull": ["$counted_sessions", []]}]},
+        }
+    ).to_list(None)
+    counters = {doc["student"].id: doc for doc in existing}
+
+    operations = []
+    # (old_category, new_category) per operation, same index as operations
+    transitions: List[Tuple[Optional[str], str]] = []
+    for student, total_classes_delta, attended_delta in deltas:
+        current = counters.get(student.id)
+        total_classes_delta, attended_delta = pending_deltas(current, total_classes_delta, attended_delta)
+        if not total_classes_delta and not attended_delta:
+            continue
+
+        operations.append(build_student_summary_update(
+            attendance, student, subject, total_classes_delta, attended_delta
+        ))
+
+        old_category = None
+        total_classes, attended = 0, 0
+        if current:
+            total_classes = current.get("total_classes", 0)
+            attended = current.get("attended", 0)
+            old_category = attendance_category(summary_percentage(attended, total_classes))
+
+        new_category = attendance_category(summary_percentage(
+            max(0, attended + attended_delta), total_classes + total_classes_delta
+        ))
+        transitions.append((old_category, new_category))
+
+    if not operations:
+        logger.info(f"🔍 StudentAttendanceSummary already reflects attendance {attendance.id}")
+        return category_deltas, 0
+
+    write_errors = []
+    try:
+        result = await StudentAttendanceSummary.get_motor_collection().bulk_write(operations, ordered=False)
+        logger.info(
+            f"✅ StudentAttendanceSummary bulk write for subject {subject.id}: "
+            f"{result.modified_count} updated, {result.upserted_count} created"
+        )
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        logger.error(f"🚨 Bulk write errors for subject {subject.id}: {write_errors}")
+
+    # unordered: every operation without a write error was applied
+    failed_indexes = {error["index"] for error in write_errors}
+    for index, (old_category, new_category) in enumerate(transitions):
+        if index in failed_indexes or old_category == new_category:
+            continue
+        if old_category:
+            category_deltas[old_category] -= 1
+        category_deltas[new_category] += 1
+
+    return category_deltas, len(write_errors)
 
 
 #############################################
 # 🧩 OPTIMIZED Updater: Teacher Subject Summary
 #############################################
 
+def category_counter_updates(category_deltas: Dict[str, int]) -> dict:
+    """$inc of the category counters, floored at zero so a drifted counter never fails validation."""
+    update = {}
+    for category, delta in category_deltas.items():
+        if delta:
+            field = CATEGORY_FIELDS[category]
+            update[field] = {"$max": [0, {"$add": [{"$ifNull": [f"${field}", 0]}, delta]}]}
+    return update
+
+
+async def apply_category_deltas(teacher: Link, subject: Link, category_deltas: Dict[str, int]):
+    """Moves only the category counters; a missing summary is seeded by a recount later."""
+    update = category_counter_updates(category_deltas)
+    if not update:
+        return
+    await TeacherSubjectSummary.get_motor_collection().update_one(
+        {
+            "teacher": DBRef("teachers", teacher.id),
+            "subject": DBRef("subjects", subject.id)
+        },
+        [{"$set": update}]
+    )
+
+
 async def update_teacher_subject_summary(
     attendance: Attendance,
     teacher: Link,
     subject: Link,
     is_initial_record: bool,
     old_percentage: Optional[float] = None,
-    new_percentage: Optional[float] = None
+    new_percentage: Optional[float] = None,
+    category_deltas: Optional[Dict[str, int]] = None
 ):
     """
-    SMART: Handles both initial records and updates efficiently
+    SMART: Handles both initial records and updates efficiently.
+    Category counters move by the deltas reported by the student summary
+    update; only a newly created summary is seeded with a full recount.
     """
+    category_deltas = {k: v for k, v in (category_deltas or {}).items() if v}
+
     try:
         logger.info(f"🛠️ Starting SMART update_teacher_subject_summary()")
         logger.info(f"👉 Attendance ID: {attendance.id}")
         logger.info(f"👉 Is initial record: {is_initial_record}")
         logger.info(f"👉 Old percentage: {old_percentage}")
         logger.info(f"👉 New percentage: {new_percentage}")
+        logger.info(f"👉 Category deltas: {category_deltas}")
+
+        if not is_initial_record and old_percentage == new_percentage and not category_deltas:
+            logger.info(f"🔍 No percentage change detected ({old_percentage} → {new_percentage}), skipping update")
+            return
 
         # Find existing summary
         summary = await TeacherSubjectSummary.find_one(
@@ -189,89 +369,52 @@ async def update_teacher_subject_summary(
             TeacherSubjectSummary.subject == DBRef("subjects", subject.id)
         )
 
-        if is_initial_record:
-            # For initial records, we MUST create/update regardless
-            logger.info("🎯 Initial record - processing full update")
-            
-            if not summary:
-                logger.info("⚡ No existing summary found → Creating new one")
-                new_total_sessions = 1
-                new_avg_attendance = Decimal(str(new_percentage))
-
-                defaulter_count, at_risk_count, top_performer_count = await get_attendance_category_counts(subject.id)
-
-                summary = TeacherSubjectSummary(
-                    teacher=teacher,
-                    subject=subject,
-                    total_sessions_conducted=new_total_sessions,
-                    average_attendance_percentage=new_avg_attendance,
-                    defaulter_count=defaulter_count,
-                    at_risk_count=at_risk_count,
-                    top_performer_count=top_performer_count
-                )
-                await summary.insert()
-                logger.info(f"📝 Created TeacherSubjectSummary for teacher {teacher.id}, subject {subject.id}")
-            else:
-                logger.info("🔄 Initial record with existing summary → Updating")
-                old_total = summary.total_sessions_conducted
-                old_avg = summary.average_attendance_percentage
-                
-                new_avg_attendance = ((old_avg * old_total) + Decimal(str(new_percentage))) / (old_total + 1)
-                new_total_sessions = old_total + 1
-
-                defaulter_count, at_risk_count, top_performer_count = await get_attendance_category_counts(subject.id)
-
-                await summary.set({
-                    TeacherSubjectSummary.total_sessions_conducted: new_total_sessions,
-                    TeacherSubjectSummary.average_attendance_percentage: PyDecimal(str(round(new_avg_attendance, 2))),
-                    TeacherSubjectSummary.defaulter_count: defaulter_count,
-                    TeacherSubjectSummary.at_risk_count: at_risk_count,
-                    TeacherSubjectSummary.top_performer_count: top_performer_count
-                })
-                logger.info(f"✅ Updated TeacherSubjectSummary for teacher {teacher.id}, subject {subject.id}")
+        if not summary:
+            if not is_initial_record:
+                logger.warning(f"⚠️ No existing summary found for update, creating new one")
 
-        else:
-            # For updates, only proceed if percentage changed
-            if old_percentage == new_percentage:
-                logger.info(f"🔍 No percentage change detected ({old_percentage} → {new_percentage}), skipping update")
-                return
+            logger.info("⚡ No existing summary found → Creating new one")
+            counts = await aggregate_category_counts(subject.id)
+            defaulter_count, at_risk_count, top_performer_count = counts.get(subject.id, (0, 0, 0))
+
+            summary = TeacherSubjectSummary(
+                teacher=teacher,
+                subject=subject,
+                total_sessions_conducted=1,
+                average_attendance_percentage=Decimal(str(new_percentage)),
+                defaulter_count=defaulter_count,
+                at_risk_count=at_risk_count,
+                top_performer_count=top_performer_count
+            )
+            await summary.insert()
+            logger.info(f"📝 Created TeacherSubjectSummary for teacher {teacher.id}, subject {subject.id}")
+            return
 
-            if not summary:
-                logger.warning(f"⚠️ No existing summary found for update, creating new one")
-                new_total_sessions = 1  # This shouldn't happen, but handle it
-                new_avg_attendance = Decimal(str(new_percentage))
-
-                defaulter_count, at_risk_count, top_performer_count = await get_attendance_category_counts(subject.id)
-
-                summary = TeacherSubjectSummary(
-                    teacher=teacher,
-                    subject=subject,
-                    total_sessions_conducted=new_total_sessions,
-                    average_attendance_percentage=new_avg_attendance,
-                    defaulter_count=defaulter_count,
-                    at_risk_count=at_risk_count,
-                    top_performer_count=top_performer_count
-                )
-                await summary.insert()
-                logger.info(f"📝 Created TeacherSubjectSummary for teacher {teacher.id}, subject {subject.id}")
-            else:
-                logger.info("📝 Existing summary found → Updating with changed percentage")
-                old_total = summary.total_sessions_conducted
-                old_avg = summary.average_attendance_percentage
+        old_total = summary.total_sessions_conducted
+        old_avg = summary.average_attendance_percentage
 
-                # Adjust average: remove old percentage, add new percentage
-                new_avg_attendance = ((old_avg * old_total) - Decimal(str(old_percentage)) + Decimal(str(new_percentage))) / old_total
+        if is_initial_record:
+            logger.info("🔄 Initial record with existing summary → Updating")
+            new_avg_attendance = ((old_avg * old_total) + Decimal(str(new_percentage))) / (old_total + 1)
+            new_total_sessions = old_total + 1
+        else:
+            logger.info("📝 Existing summary found → Updating with changed percentage")
+            # Adjust average: remove old percentage, add new percentage
+            new_avg_attendance = ((old_avg * old_total) - Decimal(str(old_percentage)) + Decimal(str(new_percentage))) / old_total
+            new_total_sessions = old_total  # unchanged for updates
 
-                defaulter_count, at_risk_count, top_performer_count = await get_attendance_category_counts(subject.id)
+        update = {
+            "total_sessions_conducted": new_total_sessions,
+            "average_attendance_percentage": Decimal128(str(round(new_avg_attendance, 2))),
+        }
 
-                await summary.set({
-                    TeacherSubjectSummary.total_sessions_conducted: old_total,  # unchanged for updates
-                    TeacherSubjectSummary.average_attendance_percentage: PyDecimal(str(round(new_avg_attendance, 2))),
-                    TeacherSubjectSummary.defaulter_count: defaulter_count,
-                    TeacherSubjectSummary.at_risk_count: at_risk_count,
-                    TeacherSubjectSummary.top_performer_count: top_performer_count
-                })
-                logger.info(f"✅ Updated TeacherSubjectSummary for teacher {teacher.id}, subject {subject.id}")
+        update.update(category_counter_updates(category_deltas))
+
+        await TeacherSubjectSummary.get_motor_collection().update_one(
+            {"_id": summary.id},
+            [{"$set": update}]
+        )
+        logger.info(f"✅ Updated TeacherSubjectSummary for teacher {teacher.id}, subject {subject.id}")
 
         logger.info("✅ update_teacher_subject_summary() completed successfully")
 
@@ -334,11 +477,64 @@ async def update_subject_session_stats(
     logger.info("✅ update_subject_session_stats() completed successfully")
 
 
+#############################################
+# 📅 Updater: Daily Attendance Rollup
+#############################################
+
+async def update_daily_attendance_rollup(
+    attendance: Attendance,
+    teacher: Link,
+    subject: Link,
+    program: str,
+    department: str,
+    semester: int,
+    is_initial_record: bool,
+    old_present_count: int,
+    new_present_count: int,
+    total_students: int,
+    old_percentage: float,
+    new_percentage: float
+):
+    """
+    $inc the (date, department, program, semester, subject, teacher) row by
+    this attendance's delta; a first record also adds a session.
+    """
+    key = {
+        "date": attendance.date,
+        "department": department,
+        "program": program,
+        "semester": semester,
+        "subject_id": subject.id,
+        "teacher_id": attendance.teacher_id or (teacher.id if teacher else None),
+    }
+
+    increments = {
+        "present_sum": new_present_count - old_present_count,
+        "percentage_sum": new_percentage - old_percentage,
+    }
+    if is_initial_record:
+        increments["sessions"] = 1
+        increments["total_sum"] = total_students
+
+    await DailyAttendanceRollup.get_motor_collection().update_one(
+        key,
+        {"$inc": increments},
+        upsert=True
+    )
+    logger.info(f"✅ Updated DailyAttendanceRollup for subject {subject.id} on {attendance.date}")
+
+
 #############################################
 # ✅ SMART: Handle Student Attendance with Smart Detection
 #############################################
 
 async def handle_attendance_update(attendance: Attendance, old_bitstr: str, new_bitstr: str):
+    """
+    Folds the old -> new bitstring change into the summaries. Returns once
+    they reflect new_bitstr, including when there is nothing to apply
+    (no change, or a Cancel / Add exception without a session); raises
+    AttendanceNotApplied when the change could not be applied.
+    """
     old_bitstr = old_bitstr.strip() if old_bitstr else ""
     new_bitstr = new_bitstr.strip() if new_bitstr else ""
 
@@ -369,13 +565,13 @@ async def handle_attendance_update(attendance: Attendance, old_bitstr: str, new_
     try:
         await attendance.fetch_all_links()
     except Exception as e:
-        logger.error(f"🚨 Error fetching links for attendance {attendance.id}: {e}")
-        return
+        raise AttendanceNotApplied(f"could not fetch links: {e}") from e
 
     # Resolve session context
     session_context = await resolve_session_context(attendance)
     if not session_context:
-        logger.error(f"🚨 Failed to resolve session context for attendance {attendance.id}")
+        # intentional skip: nothing to count, the bitstring is still applied
+        logger.info(f"⏭️ No session to apply for attendance {attendance.id}, marking it applied")
         return
 
     subject, program, department, semester, teacher = session_context
@@ -383,47 +579,71 @@ async def handle_attendance_update(attendance: Attendance, old_bitstr: str, new_
     # Fetch students
     student_list = await fetch_students(program, semester, department)
     if not student_list:
-        logger.warning(f"⚠️ No students found")
-        return
+        raise AttendanceNotApplied(f"no students found for {program} {department} semester {semester}")
 
-    # ✅ SMART STEP 1: Update Student Attendance Summary
-    if is_initial_record:
-        logger.info("🎯 Processing ALL students for initial record")
-        # Process all students for initial record
-        for index, (_, was_present, is_now_present) in enumerate(changed_students):
-            if index >= len(student_list):
-                continue
-            student = student_list[index]
-            await update_student_attendance_summary(
-                attendance, student, subject, was_present, is_now_present, is_initial_record
+    # summaries of one subject are read-modify-write, keep them serialized
+    async with subject_locks[subject.id]:
+        # ✅ SMART STEP 1: Update Student Attendance Summary (one bulk write)
+        if is_initial_record:
+            logger.info("🎯 Processing ALL students for initial record")
+        else:
+            logger.info("🎯 Processing ONLY CHANGED students for update")
+
+        student_changes = [
+            (student_list[index], was_present, is_now_present)
+            for index, was_present, is_now_present in changed_students
+            if index < len(student_list)
+        ]
+        category_deltas, failed_writes = await bulk_update_student_attendance_summaries(
+            attendance, student_changes, subject, is_initial_record
+        )
+        if failed_writes:
+            # the retry skips the students already written, so their
+            # category moves have to land now; the rest waits for the retry
+            await apply_category_deltas(teacher, subject, category_deltas)
+            raise AttendanceNotApplied(f"{failed_writes} StudentAttendanceSummary writes failed")
+
+        # ✅ SMART STEP 2: Update Teacher Subject Summary
+        try:
+            await update_teacher_subject_summary(
+                attendance, teacher, subject, is_initial_record, old_percentage, new_percentage,
+                category_deltas
             )
-    else:
-        logger.info("🎯 Processing ONLY CHANGED students for update")
-        # Process only changed students for updates
-        for index, was_present, is_now_present in changed_students:
-            if index >= len(student_list):
-                continue
-            student = student_list[index]
-            await update_student_attendance_summary(
-                attendance, student, subject, was_present, is_now_present, is_initial_record
+        except Exception as e:
+            logger.error(f"🚨 Error updating TeacherSubjectSummary for attendance {attendance.id}: {e}")
+
+        # ✅ SMART STEP 3: Update Subject Session Stats
+        try:
+            await update_subject_session_stats(
+                attendance, teacher, subject, is_initial_record, 
+                new_present_count, total_students - new_present_count, new_percentage
             )
+        except Exception as e:
+            logger.error(f"🚨 Error updating SubjectSessionStats for attendance {attendance.id}: {e}")
 
-    # ✅ SMART STEP 2: Update Teacher Subject Summary
-    try:
-        await update_teacher_subject_summary(
-            attendance, teacher, subject, is_initial_record, old_percentage, new_percentage
-        )
-    except Exception as e:
-        logger.error(f"🚨 Error updating TeacherSubjectSummary for attendance {attendance.id}: {e}")
+        # ✅ SMART STEP 4: Update Daily Attendance Rollup
+        try:
+            await update_daily_attendance_rollup(
+                attendance, teacher, subject, program, department, semester,
+                is_initial_record, old_present_count, new_present_count, total_students,
+                old_percentage, new_percentage
+            )
+        except Exception as e:
+            logger.error(f"🚨 Error updating DailyAttendanceRollup for attendance {attendance.id}: {e}")
 
-    # ✅ SMART STEP 3: Update Subject Session Stats
-    try:
-        await update_subject_session_stats(
-            attendance, teacher, subject, is_initial_record, 
-            new_present_count, total_students - new_present_count, new_percentage
-        )
-    except Exception as e:
-        logger.error(f"🚨 Error updating SubjectSessionStats for attendance {attendance.id}: {e}")
+        # ✅ SMART STEP 5: Update Teacher Leaderboard Counters
+        try:
+            await increment_teacher_daily_stats(
+                attendance.teacher_id or (teacher.id if teacher else None),
+                attendance.effective_date or attendance.date,
+                program,
+                conducted=1 if is_initial_record else 0,
+                rescheduled=1 if is_initial_record and attendance.exception_action == "Reschedule" else 0,
+                present_sum=new_present_count - old_present_count,
+                total_sum=total_students if is_initial_record else 0
+            )
+        except Exception as e:
+            logger.error(f"🚨 Error updating TeacherDailyStats for attendance {attendance.id}: {e}")
 
     logger.info(f"✅ Completed processing for Attendance {attendance.id}")
 
@@ -431,7 +651,8 @@ async def handle_attendance_update(attendance: Attendance, old_bitstr: str, new_
 async def resolve_session_context(attendance: Attendance) -> Optional[tuple]:
     """
     Resolve session context from attendance.
-    Returns None for CANCEL / ADD exceptions (no session exists).
+    Returns None for CANCEL / ADD exceptions (no session exists);
+    raises AttendanceNotApplied if the context could not be loaded.
     """
     try:
         session = None
@@ -461,6 +682,8 @@ async def resolve_session_context(attendance: Attendance) -> Optional[tuple]:
                 session = await session.fetch_link()
 
         if not session:
+            if attendance.session or attendance.exception_session:
+                raise AttendanceNotApplied("linked session could not be loaded")
             return None
 
         # Fetch linked entities
@@ -475,8 +698,7 @@ async def resolve_session_context(attendance: Attendance) -> Optional[tuple]:
         return subject, program, department, semester, teacher
 
     except Exception as e:
-        logger.error(f"🚨 Error resolving session context: {e}")
-        return None
+        raise AttendanceNotApplied(f"could not resolve session context: {e}") from e
 
 
 async def fetch_students(program, semester, department) -> List[Student]:
@@ -492,34 +714,224 @@ async def fetch_students(program, semester, department) -> List[Student]:
         return []
 
 
-async def get_attendance_category_counts(subject_id: ObjectId) -> tuple[int, int, int]:
-    """Calculate attendance category counts"""
-    try:
-        summaries = await StudentAttendanceSummary.find(
-            StudentAttendanceSummary.subject == DBRef("subjects", subject_id)
-        ).to_list()
+#############################################
+# 👂 Change Stream Consumer (batched + resumable)
+#############################################
+
+RESUME_TOKEN_KEY = "attendance_stream:resume_token"
+
+# last bitstring folded into the summaries, per attendance
+APPLIED_BITSTR_PREFIX = "attendance_stream:applied:"
+APPLIED_BITSTR_TTL_SECONDS = 60 * 60 * 24 * 30
+
+# ChangeStreamHistoryLost / ChangeStreamFatalError: token fell off the oplog
+CHANGE_STREAM_HISTORY_LOST_CODES = {280, 286}
+
+BATCH_MAX_EVENTS = 500          # flush when this many events are buffered
+BATCH_WINDOW_SECONDS = 1.0      # ...or when the oldest buffered event is this old
+MAX_CONCURRENT_ATTENDANCES = 16
+BATCH_RETRY_ATTEMPTS = 5        # then stop, leaving the resume token before the batch
+BATCH_RETRY_BASE_DELAY_SECONDS = 1.0
+
+# Attendances of the same subject touch the same summary documents,
+# so they are serialized; different subjects run in parallel.
+subject_locks: Dict[ObjectId, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+async def load_resume_token() -> Optional[dict]:
+    redis = await get_redis_client()
+    raw = await redis.get(RESUME_TOKEN_KEY)
+    return json.loads(raw) if raw else None
+
+
+async def save_resume_token(token: Optional[dict]):
+    if not token:
+        return
+    redis = await get_redis_client()
+    await redis.set(RESUME_TOKEN_KEY, json.dumps(token))
+
+
+def coalesce_changes(changes: List[dict]) -> Dict[ObjectId, dict]:
+    """
+    Collapse a batch to one entry per attendance: the pre-image of the
+    first event and the post-image of the last one.
+    """
+    coalesced: Dict[ObjectId, dict] = {}
+    for change in changes:
+        full_document = change.get("fullDocument")
+        if not full_document:
+            # document was deleted before updateLookup could read it
+            continue
+
+        doc_id = change["documentKey"]["_id"]
+        entry = coalesced.setdefault(doc_id, {"before": change.get("fullDocumentBeforeChange")})
+        entry["after"] = full_document
+    return coalesced
+
+
+async def load_applied_bitstr(attendance_id: ObjectId) -> Optional[str]:
+    redis = await get_redis_client()
+    return await redis.get(f"{APPLIED_BITSTR_PREFIX}{attendance_id}")
+
+
+async def save_applied_bitstr(attendance_id: ObjectId, bitstr: str):
+    redis = await get_redis_client()
+    await redis.set(f"{APPLIED_BITSTR_PREFIX}{attendance_id}", bitstr, ex=APPLIED_BITSTR_TTL_SECONDS)
+
 
-        defaulter = at_risk = top_performer = 0
+async def has_session_stats(attendance_id: ObjectId) -> bool:
+    """SubjectSessionStats exist once an attendance has been counted."""
+    doc = await SubjectSessionStats.get_motor_collection().find_one(
+        {"session_id": DBRef("attendances", attendance_id)},
+        {"_id": 1}
+    )
+    return doc is not None
+
+
+async def process_attendance_document(entry: dict) -> bool:
+    """True once the summaries reflect this attendance."""
+    full_document = entry["after"]
+    doc_id = full_document.get("_id")
+    try:
+        # updateLookup already delivered the document, no need to re-read it
+        attendance = Attendance.model_validate(full_document)
+        new_bitstr = attendance.bitstring
+
+        # Diff against what the summaries already reflect. The stored value
+        # makes replays after a restart no-ops; the pre-image covers
+        # attendances last applied before the stored value expired.
+        old_bitstr = await load_applied_bitstr(attendance.id)
+        if old_bitstr is None:
+            before = entry.get("before")
+            if before is not None:
+                old_bitstr = to_bitstring(before.get("students"), before.get("total"))
+            elif await has_session_stats(attendance.id):
+                # counted before, old marks unknown: treating them as "" would
+                # count the session again. Record the current marks as the
+                # baseline so later changes diff correctly.
+                logger.error(
+                    f"🚨 No applied bitstring or pre-image for already counted attendance "
+                    f"{attendance.id}, skipping this change"
+                )
+                metrics.record_error()
+                await save_applied_bitstr(attendance.id, new_bitstr.strip())
+                return True
+            else:
+                old_bitstr = ""
 
-        for s in summaries:
-            pct = s.percentage
-            if pct < 75.0:
-                defaulter += 1
-            elif 75.0 <= pct < 85.0:
-                at_risk += 1
-            elif pct >= 85.0:
-                top_performer += 1
+        async with metrics.track():
+            await handle_attendance_update(attendance, old_bitstr, new_bitstr)
 
-        return defaulter, at_risk, top_performer
+        # only reached when applied (or deliberately skipped); a failure
+        # keeps the old value so the next attempt diffs against it again
+        await save_applied_bitstr(attendance.id, new_bitstr.strip())
+        return True
 
     except Exception as e:
-        logger.error(f"🚨 Error calculating category counts for subject {subject_id}: {e}")
-        return 0, 0, 0
+        logger.error(f"🚨 Error processing update for {doc_id}: {e}")
+        return False
+
+
+async def process_entries(entries: List[dict]) -> List[dict]:
+    """Processes coalesced entries concurrently, returns the ones that failed."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ATTENDANCES)
+
+    async def run(entry: dict) -> bool:
+        async with semaphore:
+            return await process_attendance_document(entry)
+
+    results = await asyncio.gather(*(run(entry) for entry in entries))
+    return [entry for entry, applied in zip(entries, results) if not applied]
+
+
+async def process_batch(changes: List[dict]) -> List[dict]:
+    """
+    Applies a batch, retrying failed attendances with backoff. Returns the
+    entries that still failed after BATCH_RETRY_ATTEMPTS.
+    """
+    documents = coalesce_changes(changes)
+    logger.info(f"📦 Processing batch: {len(changes)} events → {len(documents)} attendances")
+
+    failed = await process_entries(list(documents.values()))
+    for attempt in range(1, BATCH_RETRY_ATTEMPTS):
+        if not failed:
+            break
+        delay = BATCH_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1)
+        logger.warning(f"⚠️ {len(failed)} attendances failed, retrying in {delay:.0f}s (attempt {attempt + 1})")
+        await asyncio.sleep(delay)
+        failed = await process_entries(failed)
+
+    return failed
+
+
+async def enable_pre_images(collection):
+    """
+    fullDocumentBeforeChange is only recorded once the collection opts in.
+    Without it every attendance missing a stored bitstring would have to be
+    skipped, so the worker refuses to start unless pre-images are on.
+    """
+    try:
+        await collection.database.command({
+            "collMod": collection.name,
+            "changeStreamPreAndPostImages": {"enabled": True}
+        })
+        logger.info("✅ Change stream pre-images enabled on Attendance")
+    except OperationFailure as e:
+        # collMod may be denied while pre-images were already turned on
+        listed = await collection.database.command({
+            "listCollections": 1,
+            "filter": {"name": collection.name}
+        })
+        info = listed["cursor"]["firstBatch"]
+        options = info[0].get("options", {}) if info else {}
+        if not options.get("changeStreamPreAndPostImages", {}).get("enabled"):
+            logger.error(f"🚨 Change stream pre-images are not enabled on Attendance: {e}")
+            raise
+        logger.info("✅ Change stream pre-images already enabled on Attendance")
+
+
+async def consume_stream(collection, pipeline: list, resume_token: Optional[dict]):
+    async with collection.watch(
+        pipeline,
+        full_document="updateLookup",
+        full_document_before_change="whenAvailable",
+        resume_after=resume_token,
+        max_await_time_ms=int(BATCH_WINDOW_SECONDS * 1000)
+    ) as stream:
+        buffer: List[dict] = []
+        batch_started = 0.0
+        saved_token = resume_token
+
+        while stream.alive:
+            change = await stream.try_next()
+
+            if change is not None:
+                if not buffer:
+                    batch_started = time.monotonic()
+                buffer.append(change)
+
+                cluster_time = change.get("clusterTime")
+                if cluster_time is not None:
+                    metrics.set_gauge("stream_lag_seconds", max(0, int(time.time()) - cluster_time.time))
+
+            window_elapsed = bool(buffer) and time.monotonic() - batch_started >= BATCH_WINDOW_SECONDS
+            if len(buffer) >= BATCH_MAX_EVENTS or window_elapsed:
+                failed = await process_batch(buffer)
+                if failed:
+                    # stop with saved_token still before this batch; the
+                    # restarted worker replays it from there
+                    ids = [str(entry["after"].get("_id")) for entry in failed]
+                    raise AttendanceNotApplied(
+                        f"{len(failed)} attendances still failing after {BATCH_RETRY_ATTEMPTS} attempts: {ids}"
+                    )
+                buffer = []
+
+            # at-least-once: the token only moves once everything before it is applied
+            if not buffer and stream.resume_token != saved_token:
+                saved_token = stream.resume_token
+                await save_resume_token(saved_token)
 
 
-#############################################
-# 👂 Change Stream Watcher (unchanged)
-#############################################
 async def watch_attendance_changes():
     logger.info("🚀 Initializing DB connection...")
     try:
@@ -529,39 +941,35 @@ async def watch_attendance_changes():
         logger.error(f"🚨 Failed to initialize database: {e}")
         raise
 
-    pipeline = [{"$match": {"operationType": "update"}}]
+    # only mark changes; context backfills and other $sets never touch
+    # students and have nothing to diff
+    pipeline = [{
+        "$match": {
+            "operationType": "update",
+            "updateDescription.updatedFields.students": {"$exists": True}
+        }
+    }]
     collection = Attendance.get_motor_collection()
 
+    await enable_pre_images(collection)
+
+    resume_token = await load_resume_token()
+    if resume_token:
+        logger.info("⏯️ Resuming Attendance change stream from saved token")
+
     logger.info("👂 Listening for updates on Attendance collection...")
+    metrics.start()
 
     try:
-        async with collection.watch(
-            pipeline,
-            full_document="updateLookup"
-        ) as stream:
-            async for change in stream:
-                doc_id = change["documentKey"]["_id"]
-                logger.info(f"🔔 Update detected: {doc_id}")
-
-                try:
-                    attendance = await Attendance.get(doc_id, fetch_links=True)
-                    if not attendance:
-                        logger.warning(f"⚠️ Attendance {doc_id} not found")
-                        continue
-
-                    # We do NOT rely on MongoDB pre-images
-                    new_bitstr = attendance.students or ""
-                    old_bitstr = ""  # let handler detect initial vs update
-
-                    await handle_attendance_update(
-                        attendance,
-                        old_bitstr,
-                        new_bitstr
-                    )
-
-                except Exception as e:
-                    logger.error(f"🚨 Error processing update for {doc_id}: {e}")
-                    continue
+        try:
+            await consume_stream(collection, pipeline, resume_token)
+        except OperationFailure as e:
+            if not resume_token or e.code not in CHANGE_STREAM_HISTORY_LOST_CODES:
+                raise
+            logger.warning("⚠️ Saved resume token is no longer in the oplog, starting from now")
+            redis = await get_redis_client()
+            await redis.delete(RESUME_TOKEN_KEY)
+            await consume_stream(collection, pipeline, None)
 
     except Exception as e:
         logger.error(f"🚨 Watch stream error: {e}")
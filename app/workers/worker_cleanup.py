@@ -3,6 +3,9 @@ import aio_pika
 import json
 from app.core.rabbitmq_config import settings
 from app.utils.imagekit_uploader import delete_file
+from app.utils.worker_metrics import WorkerMetrics
+
+metrics = WorkerMetrics("worker_cleanup", settings.cleanup_queue)
 
 async def connect_rabbitmq():
     while True:
@@ -27,10 +30,11 @@ async def cleanup_worker():
     )
 
     print(f"[cleanup_worker] Listening on {settings.cleanup_queue}")
+    metrics.start(connection)
 
     async with queue.iterator() as messages:
         async for message in messages:
-            async with message.process():
+            async with message.process(), metrics.track():
                 try:
                     payload = json.loads(message.body)
 
@@ -47,6 +51,7 @@ async def cleanup_worker():
                         print("[cleanup_worker] Unknown message type")
 
                 except Exception as e:
+                    metrics.record_error()
                     print(f"[cleanup_worker] Error: {str(e)}")
 
 if __name__ == "__main__":
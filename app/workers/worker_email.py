@@ -3,6 +3,9 @@ import aio_pika
 import json
 from app.core.rabbitmq_config import settings
 from app.utils.send_email import send_email
+from app.utils.worker_metrics import WorkerMetrics
+
+metrics = WorkerMetrics("worker_email", settings.email_queue)
 
 async def connect_rabbitmq():
     while True:
@@ -25,10 +28,11 @@ async def email_worker():
     )
 
     print(f"[email_worker] Listening on queue: {settings.email_queue}")
+    metrics.start(connection)
 
     async with queue.iterator() as messages:
         async for message in messages:
-            async with message.process():
+            async with message.process(), metrics.track():
                 try:
                     payload = json.loads(message.body)
                     data = payload.get("data", {})
@@ -50,6 +54,7 @@ async def email_worker():
                         print(f"[email_worker] Invalid payload: {payload}")
 
                 except Exception as e:
+                    metrics.record_error()
                     print(f"[email_worker] Error: {str(e)}")
 
 if __name__ == "__main__":
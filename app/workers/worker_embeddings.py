@@ -12,6 +12,7 @@ from app.utils.extract_student_embedding import extract_student_embedding
 from app.core.database import init_db
 from app.schemas.student import Student
 from app.core.faiss_cache import faiss_cache, get_cache_key
+from app.utils.worker_metrics import WorkerMetrics
 
 # logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +25,8 @@ warnings.filterwarnings("ignore")
 
 MAX_RETRIES = 3
 
+metrics = WorkerMetrics("worker_embeddings", settings.embedding_queue)
+
 
 # ---------------- RABBITMQ CONNECTION ----------------
 async def connect_rabbitmq():
@@ -100,7 +103,7 @@ async def generate_embedding(student_id: str, image_paths: List[str]):
 
 # ---------------- MESSAGE PROCESSOR ----------------
 async def process_message(message: aio_pika.IncomingMessage):
-    async with message.process(ignore_processed=True):
+    async with message.process(ignore_processed=True), metrics.track():
         try:
             payload = json.loads(message.body.decode())
             data = payload.get("data", {})
@@ -116,6 +119,7 @@ async def process_message(message: aio_pika.IncomingMessage):
             await generate_embedding(student_id, image_paths)
 
         except Exception as e:
+            metrics.record_error()
             error_msg = str(e)
 
             logger.error(f"❌ Error processing message: {error_msg}", exc_info=True)
@@ -165,6 +169,7 @@ async def embedding_worker():
         )
 
         logger.info(f"👂 Listening on queue: {settings.embedding_queue}")
+        metrics.start(connection)
 
         async with queue.iterator() as messages:
             async for message in messages:
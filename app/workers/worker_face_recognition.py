@@ -15,6 +15,7 @@ from insightface.app import FaceAnalysis
 from app.core.rabbitmq_config import settings
 from app.core.redis import get_redis_client
 from app.utils.redis_pub_sub import publish_to_channel
+from app.utils.worker_metrics import WorkerMetrics
 from PIL import Image, ImageOps
 from app.core.faiss_cache import faiss_cache, get_cache_key
 import onnxruntime as ort
@@ -57,6 +58,8 @@ logger.info("[face_worker] Initialized ArcFace model with providers: %s", provid
 
 EMBEDDING_DIM = 512
 
+metrics = WorkerMetrics("worker_face", settings.face_recog_queue)
+
 # =========================
 # LOAD STUDENTS + FAISS CACHE
 # =========================
@@ -297,6 +300,8 @@ async def face_worker():
     channel = await connection.channel()
     logger.info("[face_worker] ✅ RabbitMQ connection and channel established")
 
+    metrics.start(connection)
+
     queue = await channel.declare_queue(
         "face_recog_queue",
         durable=True,
@@ -312,7 +317,7 @@ async def face_worker():
             
             recognized_ids = set()
             
-            async with message.process():
+            async with message.process(), metrics.track():
                 logger.info("[face_worker] 📨 Received message from queue")
                 student_data = None  # Initialize for cleanup
                 recognized_set_key = None
@@ -619,6 +624,7 @@ async def face_worker():
                                    attendance_id, len(unique_students), total_faces if 'total_faces' in locals() else 0)
 
                 except Exception as e:
+                    metrics.record_error()
                     logger.error("[face_worker] 💥 Unexpected error for attendance_id %s: %s", 
                                attendance_id if attendance_id else 'unknown', str(e))
                     logger.error("[face_worker] Traceback:", exc_info=True)
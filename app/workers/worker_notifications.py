@@ -4,6 +4,7 @@ import json
 import firebase_admin
 from firebase_admin import credentials, messaging
 from app.core.rabbitmq_config import settings
+from app.utils.worker_metrics import WorkerMetrics
 
 # ------------------- Firebase Init -------------------
 cred = credentials.Certificate(
@@ -13,6 +14,8 @@ firebase_admin.initialize_app(cred)
 
 CHUNK_SIZE = 500
 
+metrics = WorkerMetrics("worker_notifications", settings.notification_queue)
+
 async def connect_rabbitmq():
     while True:
         try:
@@ -78,15 +81,17 @@ async def notification_worker():
     )
 
     print(f"[Worker] Listening on queue: {settings.notification_queue}")
+    metrics.start(connection)
 
     async with queue.iterator() as messages:
         async for message in messages:
-            async with message.process():
+            async with message.process(), metrics.track():
                 try:
                     payload = json.loads(message.body)
                     print("[Worker] Received message:", payload)
                     await send_fcm_to_tokens(payload)
                 except Exception as e:
+                    metrics.record_error()
                     print(f"[Worker] Error: {str(e)}")
 
 
@@ -0,0 +1,153 @@
+import asyncio
+import aio_pika
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+from app.core.rabbitmq_config import settings
+from app.core.database import init_db
+from app.utils.class_report import ClassReportError, load_class_report, render_excel, render_pdf
+from app.utils.imagekit_uploader import upload_file_to_imagekit
+from app.utils.publisher import send_to_queue
+from app.utils.report_jobs import update_report_job
+from app.utils.worker_metrics import WorkerMetrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("report_worker")
+
+metrics = WorkerMetrics("worker_report", settings.report_queue)
+
+# spooled reports, shared temp volume in docker
+REPORT_TMP_DIR = os.getenv("REPORT_TMP_DIR", "temp")
+
+# uploaded reports are deleted after 24 hours
+REPORT_FILE_TTL_MS = 24 * 60 * 60 * 1000
+
+RENDERERS = {
+    "excel": (render_excel, "xlsx"),
+    "pdf": (render_pdf, "pdf"),
+}
+
+
+async def connect_rabbitmq():
+    while True:
+        try:
+            connection = await aio_pika.connect_robust(settings.rabbitmq_url)
+            print("[report_worker] Connected to RabbitMQ")
+            return connection
+        except Exception as e:
+            print(f"[report_worker] RabbitMQ not ready, retrying... {e}")
+            await asyncio.sleep(5)
+
+
+async def generate_report(job_id: str, params: dict):
+    loop = asyncio.get_running_loop()
+
+    await update_report_job(job_id, "running", 5, "Loading attendance")
+
+    rolls, names, reports = await load_class_report(
+        params["department"],
+        params["program"],
+        int(params["semester"]),
+        int(params["batch_year"])
+    )
+
+    renderer, extension = RENDERERS[params["file_type"]]
+    subject_count = max(len(reports), 1)
+
+    # called from the render thread, one event per finished subject
+    def progress(done: int, subject_name: str):
+        asyncio.run_coroutine_threadsafe(
+            update_report_job(
+                job_id, "running", 10 + int(done / subject_count * 75),
+                f"Rendered {subject_name} ({done}/{subject_count})"
+            ),
+            loop
+        )
+
+    os.makedirs(REPORT_TMP_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=f"report_{job_id}_", suffix=f".{extension}", dir=REPORT_TMP_DIR)
+    os.close(fd)
+
+    try:
+        await asyncio.to_thread(renderer, path, rolls, names, reports, progress)
+
+        await update_report_job(job_id, "running", 90, "Uploading report")
+
+        filename = f"ERP_Report_{int(datetime.now().timestamp())}.{extension}"
+        with open(path, "rb") as spool:
+            upload_result = await upload_file_to_imagekit(
+                file=spool,
+                filename=filename,
+                folder="reports",
+                tags=["erp", "attendance"]
+            )
+    finally:
+        os.remove(path)
+
+    await send_to_queue(
+        queue_name=settings.cleanup_queue,
+        payload={
+            "type": "delete_file",
+            "data": {
+                "file_id": upload_result["fileId"]
+            }
+        },
+        priority=10,
+        delay_ms=REPORT_FILE_TTL_MS
+    )
+
+    await update_report_job(
+        job_id, "complete", 100, "Report generated successfully",
+        file_url=upload_result["url"],
+        file_id=upload_result["fileId"]
+    )
+
+
+async def process_report(message: aio_pika.IncomingMessage):
+    async with message.process(), metrics.track():
+        job_id = None
+        try:
+            payload = json.loads(message.body.decode())
+            job_id = payload["job_id"]
+            logger.info(f"📥 Report job {job_id} → {payload.get('data')}")
+
+            await generate_report(job_id, payload["data"])
+            logger.info(f"✅ Report job {job_id} complete")
+
+        except ClassReportError as e:
+            await update_report_job(job_id, "failed", 100, str(e))
+
+        except Exception as e:
+            metrics.record_error()
+            logger.exception(f"❌ Report job {job_id} failed: {e}")
+            if job_id:
+                await update_report_job(job_id, "failed", 100, f"Report generation failed: {e}")
+
+
+async def report_worker():
+    await init_db()
+
+    connection = await connect_rabbitmq()
+    channel = await connection.channel()
+
+    # one report at a time per worker, they are CPU and memory heavy
+    await channel.set_qos(prefetch_count=1)
+
+    queue = await channel.declare_queue(
+        settings.report_queue,
+        durable=True,
+        arguments={"x-max-priority": 10}
+    )
+
+    print(f"[report_worker] Listening on {settings.report_queue}")
+    metrics.start(connection)
+
+    await queue.consume(process_report)
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(report_worker())
@@ -16,6 +16,8 @@ from app.core.rabbitmq_config import settings
 from app.core.config import settings as app_settings
 from app.core.database import init_db
 from app.core.redis import get_redis_client
+from app.utils.live_board import add_live_entry
+from app.utils.worker_metrics import WorkerMetrics
 
 IST = ZoneInfo("Asia/Kolkata")
 REDIS_SESSION_JOB_PREFIX = "attendance:job:"
@@ -23,6 +25,8 @@ REDIS_SESSION_JOB_PREFIX = "attendance:job:"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("session_worker")
 
+metrics = WorkerMetrics("worker_session", settings.session_queue)
+
 async def connect_rabbitmq():
     while True:
         try:
@@ -43,7 +47,7 @@ async def get_job_id_from_redis(redis, session_id: str, date_str: str):
 async def process_session(message: aio_pika.IncomingMessage):
 
     redis = await get_redis_client()
-    async with message.process():
+    async with message.process(), metrics.track():
         try:
             payload = json.loads(message.body.decode())
             logger.info(f"📥 Payload received → {payload}")
@@ -130,13 +134,6 @@ async def process_session(message: aio_pika.IncomingMessage):
             # attendance creation
             attendance_data = dict(
                 date=dt_date.fromisoformat(date_str),
-                day=payload.get("day"),
-                subject=ObjectId(subject_id) if subject_id else None,
-                program=payload.get("program"),
-                department=payload.get("department"),
-                semester=payload.get("semester"),
-                academic_year=payload.get("academic_year"),
-                students=""
             )
 
             if exception:
@@ -144,18 +141,35 @@ async def process_session(message: aio_pika.IncomingMessage):
                     exception_session=exception.id,
                     **attendance_data
                 )
+                attendance.set_context(
+                    session=exception.session,
+                    exception=exception,
+                    subject=exception.subject
+                )
+                board_subject = exception.subject
+                board_teacher = exception.teacher or getattr(exception.session, "teacher", None)
             else:
                 attendance = Attendance(
                     session=session_id,
                     **attendance_data
                 )
+                session = await Session.get(ObjectId(session_id), fetch_links=True)
+                attendance.set_context(session=session, subject=subject)
+                board_subject = subject or getattr(session, "subject", None)
+                board_teacher = getattr(session, "teacher", None)
 
             await attendance.insert()
             logger.info("✅ Attendance created")
 
+            try:
+                await add_live_entry(attendance, subject=board_subject, teacher=board_teacher)
+            except Exception as e:
+                logger.warning(f"⚠️ Live board entry not created: {e}")
+
             await redis.delete(f"{REDIS_SESSION_JOB_PREFIX}{session_id}:{date_str}")
 
         except Exception as e:
+            metrics.record_error()
             logger.error("💥 Worker error", exc_info=True)
 
 
@@ -174,6 +188,7 @@ async def start_worker():
         )
 
         logger.info("👷 Session worker running")
+        metrics.start(connection)
         await queue.consume(process_session)
         await asyncio.Future()
 